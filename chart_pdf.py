@@ -0,0 +1,291 @@
+"""Print-ready PDF of a SeatPlan: seating grid and attendance sheet for every room.
+
+Written with the standard library only, so it works offline without a PDF
+package or a spreadsheet application. The standard Helvetica fonts are used
+and not embedded; every PDF viewer and printer has them.
+
+Rooms are drawn in parallel worker processes, each returning its finished,
+compressed page streams; the main process appends them to the file as they
+arrive and keeps only the page offsets, so memory stays flat however many
+rooms there are. Seating grids are laid out in bands of benches stacked down
+landscape pages; attendance sheets run over as many portrait pages as they
+need, repeating the column headers.
+"""
+
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from seat_plan import MASK_LABELS, SEAT_POSITIONS
+
+LANDSCAPE = (842, 595)  # A4, in points
+PORTRAIT = (595, 842)
+MARGIN = 28
+MIN_CELL_WIDTH = 44
+MAX_ROW_HEIGHT = 18
+MIN_ROW_HEIGHT = 13
+ATTENDANCE_ROW_HEIGHT = 20
+ATTENDANCE_COLUMNS = [("Seat Position", 90), ("Serial Number", 90), ("Roll Number", 170), ("Signature", 189)]
+
+# Colours of the Excel sheets (chart_render), as PDF rgb
+TITLE_RGB = (0.247, 0.318, 0.710)
+ROW_RGB = (0.494, 0.341, 0.761)
+HEADER_RGB = (0.820, 0.769, 0.914)
+SHADE_RGB = (0.878, 0.969, 0.980)
+MASKED_RGB = (0.741, 0.741, 0.741)
+WHITE = (1, 1, 1)
+BLACK = (0, 0, 0)
+
+# Advance widths (1/1000 em) of printable ASCII, from the Helvetica AFM files
+_HELVETICA = [278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+              556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+              1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+              667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+              333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+              556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584]
+_HELVETICA_BOLD = [278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+                   556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+                   975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+                   667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+                   333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+                   611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584]
+
+
+def text_width(text, size, bold=False):
+    widths = _HELVETICA_BOLD if bold else _HELVETICA
+    return size * sum(widths[ord(c) - 32] if 32 <= ord(c) < 127 else 556 for c in text) / 1000
+
+
+def _pdf_string(text):
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return "(" + text.encode("cp1252", "replace").decode("latin-1") + ")"
+
+
+class _Page:
+    """Content stream of one page, built as a list of PDF operators."""
+
+    def __init__(self, size):
+        self.size = size
+        self.ops = ["0.5 w 0.6 G"]
+
+    def rect(self, x, y, w, h, fill=None, stroke=True):
+        # Callers measure y from the top of the page; PDF measures from the bottom.
+        y = self.size[1] - y - h
+        if fill:
+            self.ops.append(f"{fill[0]:.3f} {fill[1]:.3f} {fill[2]:.3f} rg")
+        paint = "B" if fill and stroke else ("f" if fill else "S")
+        self.ops.append(f"{x:.2f} {y:.2f} {w:.2f} {h:.2f} re {paint}")
+
+    def text(self, x, y, w, h, text, size, bold=False, color=BLACK):
+        """Text centred in the box at (x, y, w, h), shrunk to fit its width."""
+        text = str(text)
+        if not text:
+            return
+        width = text_width(text, size, bold)
+        if width > w - 2:
+            size *= (w - 2) / width
+            width = w - 2
+        tx = x + (w - width) / 2
+        ty = self.size[1] - y - h / 2 - size * 0.35
+        self.ops.append(f"BT /{'F2' if bold else 'F1'} {size:.2f} Tf {color[0]:.3f} {color[1]:.3f} {color[2]:.3f} rg "
+                        f"{tx:.2f} {ty:.2f} Td {_pdf_string(text)} Tj ET")
+
+    def finish(self):
+        return self.size, zlib.compress("\n".join(self.ops).encode("latin-1"))
+
+
+def room_payload(plan, room_index):
+    """What a worker needs to draw one room, as plain picklable values."""
+    room = plan.rooms[room_index]
+    labels = plan.seat_labels(room_index)
+    return {
+        'number': str(room.number),
+        'names': [str(n) if isinstance(n, str) else '' for n in plan.position_names(room_index)],
+        'width': room.seats_per_bench,
+        'benches': room.benches,
+        'rows': room.rows,
+        'labels': [[[str(v) for v in labels[p, b]] for b in range(room.benches)] for p in range(room.seats_per_bench)],
+        'heading': plan.section_heading,
+        'attendance': [(label, [str(v) for v in rolls]) for label, rolls in plan.attendance(room_index)],
+    }
+
+
+def seating_pages(room):
+    """Seating grid in bands of benches, stacked down landscape pages.
+
+    A band holds as many benches as fit across the page at MIN_CELL_WIDTH per
+    seat; rooms with too many rows for one page are also cut by row.
+    """
+    width, benches, rows = room['width'], room['benches'], room['rows']
+    page_w, page_h = LANDSCAPE
+    usable_w = page_w - 2 * MARGIN
+    gap = 0.3  # blank space between benches, in cells
+    names_h = 14 if any(room['names']) else 0
+    head_h = names_h + 32
+    body_top = MARGIN + 24 + 6
+    body_h = page_h - MARGIN - body_top
+
+    per_band = max(1, min(benches, int((usable_w / MIN_CELL_WIDTH + gap) // (width + gap))))
+    cell_w = min(110, usable_w / (per_band * width + (per_band - 1) * gap))
+    row_h = max(MIN_ROW_HEIGHT, min(MAX_ROW_HEIGHT, (body_h - head_h) / max(rows, 1)))
+    rows_per_band = max(1, int((body_h - head_h) // row_h))
+
+    bands = [(range(b0, min(benches, b0 + per_band)), range(r0, min(rows, r0 + rows_per_band)))
+             for r0 in range(0, max(rows, 1), rows_per_band) for b0 in range(0, benches, per_band)]
+    pages = [[]]
+    used = 0
+    for band in bands:
+        height = head_h + len(band[1]) * row_h + 10
+        if pages[-1] and used + height > body_h:
+            pages.append([])
+            used = 0
+        pages[-1].append((used, band))
+        used += height
+
+    finished = []
+    for n, page_bands in enumerate(pages):
+        page = _Page(LANDSCAPE)
+        title = f"ROOM {room['number']}"
+        if len(pages) > 1:
+            title += f"  (page {n + 1} of {len(pages)})"
+        page.rect(MARGIN, MARGIN, usable_w, 24, fill=TITLE_RGB, stroke=False)
+        page.text(MARGIN, MARGIN, usable_w, 24, title, 14, bold=True, color=WHITE)
+        for offset, (chunk, row_range) in page_bands:
+            y = body_top + offset
+            for k, b in enumerate(chunk):
+                x = MARGIN + k * (width + gap) * cell_w
+                for p, name in enumerate(room['names']):
+                    page.text(x + p * cell_w, y, cell_w, names_h, name, 8, bold=True)
+                hy = y + names_h
+                page.rect(x, hy, width * cell_w, 16, fill=ROW_RGB)
+                page.text(x, hy, width * cell_w, 16, f"Row {b + 1}", 9, bold=True, color=WHITE)
+                for p in range(width):
+                    page.rect(x + p * cell_w, hy + 16, cell_w, 16, fill=HEADER_RGB)
+                    page.text(x + p * cell_w, hy + 16, cell_w, 16, SEAT_POSITIONS[p], 8, bold=True)
+                    for k_r, r in enumerate(row_range):
+                        cy = y + head_h + k_r * row_h
+                        label = room['labels'][p][b][r]
+                        if label in MASK_LABELS:
+                            fill = MASKED_RGB
+                        else:
+                            fill = SHADE_RGB if (r + b) % 2 == 0 else WHITE
+                        page.rect(x + p * cell_w, cy, cell_w, row_h, fill=fill)
+                        page.text(x + p * cell_w, cy, cell_w, row_h, label, 8.5)
+        finished.append(page.finish())
+    return finished
+
+
+def attendance_pages(room):
+    page_w, page_h = PORTRAIT
+    entries = [(label, i + 1, roll) for label, rolls in room['attendance'] for i, roll in enumerate(rolls)]
+    per_page = int((page_h - 2 * MARGIN - 24 - 18) // ATTENDANCE_ROW_HEIGHT)
+    page_count = max(1, -(-len(entries) // per_page))
+    pages = []
+    for n in range(page_count):
+        page = _Page(PORTRAIT)
+        title = f"Attendance Sheet - Room {room['number']}"
+        if page_count > 1:
+            title += f"  (page {n + 1} of {page_count})"
+        page.text(MARGIN, MARGIN, page_w - 2 * MARGIN, 24, title, 14, bold=True)
+        x = MARGIN
+        for k, (header, w) in enumerate(ATTENDANCE_COLUMNS):
+            header = room['heading'] if k == 0 else header
+            page.rect(x, MARGIN + 24, w, 18, fill=HEADER_RGB)
+            page.text(x, MARGIN + 24, w, 18, header, 9, bold=True)
+            x += w
+        for k, values in enumerate(entries[n * per_page:(n + 1) * per_page]):
+            y = MARGIN + 42 + k * ATTENDANCE_ROW_HEIGHT
+            x = MARGIN
+            for (_, w), value in zip(ATTENDANCE_COLUMNS, values + ("",)):
+                page.rect(x, y, w, ATTENDANCE_ROW_HEIGHT)
+                page.text(x, y, w, ATTENDANCE_ROW_HEIGHT, value, 9)
+                x += w
+        pages.append(page.finish())
+    return pages
+
+
+def room_pages(room):
+    return seating_pages(room) + attendance_pages(room)
+
+
+class PdfWriter:
+    """Append-only PDF file: pages are written as they come, the page tree at close()."""
+
+    CATALOG, PAGES, FONT, FONT_BOLD = 1, 2, 3, 4
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.offsets = {}
+        self.pages = []
+        self.next_id = 5
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _object(self, obj_id, body):
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def add_page(self, size, stream):
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self._object(content_id, f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode()
+                     + stream + b"\nendstream")
+        self._object(page_id, (f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {size[0]} {size[1]}] "
+                               f"/Resources << /Font << /F1 {self.FONT} 0 R /F2 {self.FONT_BOLD} 0 R >> >> "
+                               f"/Contents {content_id} 0 R >>").encode())
+        self.pages.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page} 0 R" for page in self.pages)
+        self._object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>".encode())
+        self._object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode())
+        for obj_id, name in [(self.FONT, "Helvetica"), (self.FONT_BOLD, "Helvetica-Bold")]:
+            self._object(obj_id, f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} "
+                                 f"/Encoding /WinAnsiEncoding >>".encode())
+        xref = self.file.tell()
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[i]:010d} 00000 n \n" for i in range(1, self.next_id)]
+        lines.append(f"trailer\n<< /Size {self.next_id} /Root {self.CATALOG} 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+        self.file.write("".join(lines).encode())
+        self.file.close()
+
+
+def render_pdf(plan, output_path, workers=None, on_room=None):
+    """Write every room of the plan to one PDF at output_path.
+
+    workers is the number of rendering processes (default: one per CPU); with
+    1, rooms are drawn in this process. At most two rooms per worker are in
+    flight, so finished pages never pile up in memory. The PDF is written to
+    a temporary file and moved into place only once it is complete, so a
+    failed or interrupted render leaves no truncated file at output_path.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = len(plan.rooms)
+    tmp_path = output_path + ".tmp"
+    writer = PdfWriter(tmp_path)
+    try:
+        if workers <= 1 or total <= 1:
+            for i in range(total):
+                for size, stream in room_pages(room_payload(plan, i)):
+                    writer.add_page(size, stream)
+                if on_room:
+                    on_room(i + 1, total)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                submitted = 0
+                for done in range(1, total + 1):
+                    while submitted < total and len(pending) < 2 * workers:
+                        pending.append(pool.submit(room_pages, room_payload(plan, submitted)))
+                        submitted += 1
+                    for size, stream in pending.popleft().result():
+                        writer.add_page(size, stream)
+                    if on_room:
+                        on_room(done, total)
+        writer.close()
+    except BaseException:
+        writer.file.close()
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, output_path)
+    return output_path
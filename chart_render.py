@@ -0,0 +1,338 @@
+"""Excel rendering of a SeatPlan: one seating sheet and one attendance sheet per room.
+
+build_workbook() keeps the whole workbook in memory; stream_workbook() and
+save_sharded() write the same sheets through openpyxl's write-only mode for
+runs that are too large for that (see size_estimator).
+
+Any of them can add a "Master Index" sheet: every seated student sorted by
+roll number with their room and seat as the seating sheet labels it (the
+"Row" heading over the bench, the seat position, and the seat counted from
+the top of that bench column), in blocks of
+INDEX_BLOCK_ROWS that each start on a new printed page, for notice boards.
+write_index() writes it to a file of its own (.xlsx, or a flat .csv).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
+from openpyxl.worksheet.pagebreak import Break
+
+from seat_plan import MASK_LABELS, SEAT_POSITIONS
+
+TITLE_FILL = PatternFill(start_color="3f51b5", end_color="3f51b5", fill_type="solid")
+ROW_FILL = PatternFill(start_color="7e57c2", end_color="7e57c2", fill_type="solid")
+HEADER_FILL = PatternFill(start_color="D1C4E9", end_color="D1C4E9", fill_type="solid")
+SHADE_FILL = PatternFill(start_color="e0f7fa", end_color="e0f7fa", fill_type="solid")
+PLAIN_FILL = PatternFill(start_color="ffffff", end_color="ffffff", fill_type="solid")
+MASKED_FILL = PatternFill(start_color="bdbdbd", end_color="bdbdbd", fill_type="solid")
+BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
+                top=Side(style='thin'), bottom=Side(style='thin'))
+CENTER = Alignment(horizontal='center')
+INDEX_SHEET = "Master Index"
+INDEX_BLOCK_ROWS = 40
+# Same labels as the seating sheet: benches are headed "Row 1", "Row 2", ...
+INDEX_HEADERS = ["Roll Number", "Room", "Row", "Seat Position", "Seat"]
+
+
+def bench_columns(benches, seats_per_bench):
+    """First sheet column of each bench; benches are separated by one blank column."""
+    return [1 + b * (seats_per_bench + 1) for b in range(benches)]
+
+
+def write_seating_sheet(ws, plan, room_index):
+    room = plan.rooms[room_index]
+    width = room.seats_per_bench
+    columns = bench_columns(room.benches, width)
+
+    merge_end = openpyxl.utils.get_column_letter(room.benches * (width + 1))
+    ws.merge_cells(f"A1:{merge_end}1")
+    ws['A1'] = f"ROOM {room.number}"
+    ws['A1'].font = Font(size=16, bold=True, color="FFFFFF")
+    ws['A1'].fill = TITLE_FILL
+    ws['A1'].alignment = CENTER
+
+    # Seat position names (Left, Middle, Right) if provided
+    for col in columns:
+        for p, name in enumerate(plan.position_names(room_index)):
+            cell = ws.cell(row=2, column=col + p, value=name)
+            cell.alignment = CENTER
+            cell.font = Font(bold=True)
+
+    # Row headers (Row 1, Row 2, ...) and seat labels (F-1, S-1, T-1)
+    for b, col in enumerate(columns):
+        ws.merge_cells(start_row=3, start_column=col, end_row=3, end_column=col + width - 1)
+        cell = ws.cell(row=3, column=col, value=f"Row {b+1}")
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = ROW_FILL
+        cell.alignment = CENTER
+        for p in range(width):
+            cell = ws.cell(row=4, column=col + p, value=SEAT_POSITIONS[p])
+            cell.font = Font(bold=True, color="FFFFFF")
+            cell.fill = HEADER_FILL
+            cell.alignment = CENTER
+            cell.border = BORDER
+
+    # Roll numbers vertically under each seat column
+    labels = plan.seat_labels(room_index)
+    for b, col in enumerate(columns):
+        for p in range(width):
+            for r in range(room.rows):
+                cell = ws.cell(row=5 + r, column=col + p, value=labels[p, b, r])
+                cell.alignment = CENTER
+                cell.border = BORDER
+                if labels[p, b, r] in MASK_LABELS:
+                    cell.fill = MASKED_FILL
+                else:
+                    cell.fill = SHADE_FILL if (r + b) % 2 == 0 else PLAIN_FILL
+
+
+def write_attendance_sheet(ws, plan, room_index):
+    room = plan.rooms[room_index]
+    ws['A1'] = f"Attendance Sheet - Room {room.number}"
+    ws['A1'].font = Font(size=14, bold=True)
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=4)
+    for col, header in enumerate([plan.section_heading, "Serial Number", "Roll Number", "Signature"], start=1):
+        cell = ws.cell(row=2, column=col, value=header)
+        cell.font = Font(bold=True)
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER
+
+    current_row = 3
+    for label, rolls in plan.attendance(room_index):
+        for i, roll in enumerate(rolls):
+            values = (label, i + 1, roll, "")
+            for col, value in enumerate(values, start=1):
+                cell = ws.cell(row=current_row, column=col, value=value)
+                cell.alignment = CENTER
+                cell.border = BORDER
+            current_row += 1
+
+
+def index_rows(plan, block_rows=INDEX_BLOCK_ROWS):
+    """Rows of the master index sheet as (style, values).
+
+    Entries have no style (None): at 100k students, styling five cells per
+    entry would cost more than writing them. A "break" ends a printed block.
+    """
+    ids, rooms, positions, benches, rows = plan.master_index()
+    rolls = plan.roll_numbers[ids].tolist()
+    numbers = np.array([str(room.number) for room in plan.rooms], dtype=object)[rooms].tolist()
+    positions = np.array(SEAT_POSITIONS, dtype=object)[positions].tolist()
+    benches, rows = (benches + 1).tolist(), (rows + 1).tolist()
+    yield "title", ["Master Roll Number Index"]
+    for start in range(0, len(ids), block_rows):
+        stop = min(start + block_rows, len(ids))
+        yield "index_block", [f"{rolls[start]} to {rolls[stop - 1]}"]
+        yield "att_header", INDEX_HEADERS
+        for k in range(start, stop):
+            yield None, [rolls[k], numbers[k], benches[k], positions[k], rows[k]]
+        yield "break", []
+
+
+def _index_sheet_setup(ws):
+    for column, width in zip("ABCDE", [20, 12, 10, 14, 10]):
+        ws.column_dimensions[column].width = width
+
+
+def write_index_sheet(ws, plan, block_rows=INDEX_BLOCK_ROWS):
+    """In-memory twin of stream_index_sheet."""
+    _index_sheet_setup(ws)
+    written = 0
+    for style, values in index_rows(plan, block_rows):
+        if style == "break":
+            ws.row_breaks.append(Break(id=written))
+            continue
+        ws.append(values)
+        written += 1
+        if style is None:
+            continue
+        for column in range(1, len(values) + 1):
+            cell = ws.cell(row=written, column=column)
+            cell.alignment = CENTER
+            for attr, spec in STREAM_STYLES[style].items():
+                setattr(cell, attr, spec)
+        if style in ("title", "index_block"):
+            ws.merge_cells(start_row=written, start_column=1, end_row=written, end_column=len(INDEX_HEADERS))
+
+
+def build_workbook(plan, on_room=None, index=False):
+    """Render every room of the plan into a new workbook.
+
+    on_room(done, total) is called after each room, e.g. to move a progress bar.
+    index adds the master index sheet after the rooms.
+    """
+    wb = openpyxl.Workbook()
+    del wb['Sheet']
+    for i, room in enumerate(plan.rooms):
+        write_seating_sheet(wb.create_sheet(title=f"Room {room.number}"), plan, i)
+        write_attendance_sheet(wb.create_sheet(title=f"Attendance - Room {room.number}"), plan, i)
+        if on_room:
+            on_room(i + 1, len(plan.rooms))
+    if index:
+        write_index_sheet(wb.create_sheet(title=INDEX_SHEET), plan)
+    return wb
+
+
+# Every cell style the write-only renderers use, in a fixed order. prime_styles()
+# registers them up front so each write-only workbook gets identical style
+# indices, which lets checkpointed room parts be stitched together (checkpoint.py).
+STREAM_STYLES = {
+    "title": dict(font=Font(size=16, bold=True, color="FFFFFF"), fill=TITLE_FILL),
+    "name": dict(font=Font(bold=True)),
+    "row": dict(font=Font(bold=True, color="FFFFFF"), fill=ROW_FILL),
+    "label": dict(font=Font(bold=True, color="FFFFFF"), fill=HEADER_FILL, border=BORDER),
+    "shade": dict(fill=SHADE_FILL, border=BORDER),
+    "plain": dict(fill=PLAIN_FILL, border=BORDER),
+    "att_title": dict(font=Font(size=14, bold=True)),
+    "att_header": dict(font=Font(bold=True), fill=HEADER_FILL),
+    "att_cell": dict(border=BORDER),
+    "masked": dict(fill=MASKED_FILL, border=BORDER),
+    "index_block": dict(font=Font(bold=True, color="FFFFFF"), fill=ROW_FILL),
+}
+
+
+def _styled(ws, value, style):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.alignment = CENTER
+    for attr, spec in STREAM_STYLES[style].items():
+        setattr(cell, attr, spec)
+    return cell
+
+
+def prime_styles(ws):
+    """Register STREAM_STYLES with the workbook of ws in their fixed order."""
+    for style in STREAM_STYLES:
+        _styled(ws, None, style).style_id
+
+
+def stream_seating_sheet(ws, plan, room_index):
+    """Write-only twin of write_seating_sheet: rows are appended and flushed as they go."""
+    room = plan.rooms[room_index]
+    width = room.seats_per_bench
+    columns = bench_columns(room.benches, width)
+    total_cols = room.benches * (width + 1)
+    get_letter = openpyxl.utils.get_column_letter
+
+    ws.append([_styled(ws, f"ROOM {room.number}", "title")])
+    ws.merged_cells.add(f"A1:{get_letter(total_cols)}1")
+
+    names = [None] * total_cols
+    headers = [None] * total_cols
+    labels_row = [None] * total_cols
+    for b, col in enumerate(columns):
+        for p, name in enumerate(plan.position_names(room_index)):
+            names[col + p - 1] = _styled(ws, name, "name")
+        headers[col - 1] = _styled(ws, f"Row {b+1}", "row")
+        ws.merged_cells.add(f"{get_letter(col)}3:{get_letter(col + width - 1)}3")
+        for p in range(width):
+            labels_row[col + p - 1] = _styled(ws, SEAT_POSITIONS[p], "label")
+    ws.append(names)
+    ws.append(headers)
+    ws.append(labels_row)
+
+    labels = plan.seat_labels(room_index)
+    for r in range(room.rows):
+        values = [None] * total_cols
+        for b, col in enumerate(columns):
+            style = "shade" if (r + b) % 2 == 0 else "plain"
+            for p in range(width):
+                label = labels[p, b, r]
+                values[col + p - 1] = _styled(ws, label, "masked" if label in MASK_LABELS else style)
+        ws.append(values)
+
+
+def stream_attendance_sheet(ws, plan, room_index):
+    room = plan.rooms[room_index]
+    ws.append([_styled(ws, f"Attendance Sheet - Room {room.number}", "att_title")])
+    ws.merged_cells.add("A1:D1")
+    ws.append([_styled(ws, header, "att_header")
+               for header in [plan.section_heading, "Serial Number", "Roll Number", "Signature"]])
+    for label, rolls in plan.attendance(room_index):
+        for i, roll in enumerate(rolls):
+            ws.append([_styled(ws, value, "att_cell") for value in (label, i + 1, roll, "")])
+
+
+def stream_index_sheet(ws, plan, block_rows=INDEX_BLOCK_ROWS):
+    """Master index rows appended as they are sorted out of the plan's arrays."""
+    _index_sheet_setup(ws)
+    written = 0
+    for style, values in index_rows(plan, block_rows):
+        if style == "break":
+            ws.row_breaks.append(Break(id=written))
+            continue
+        ws.append(values if style is None else [_styled(ws, value, style) for value in values])
+        written += 1
+        if style in ("title", "index_block"):
+            ws.merged_cells.add(f"A{written}:E{written}")
+
+
+def stream_workbook(plan, output_path, room_indices=None, on_room=None, index=False):
+    """Render rooms straight to output_path with a write-only workbook.
+
+    Only the row being written is held in memory, so this is the path for
+    plans that build_workbook() could not hold. index adds the master index
+    sheet after the rooms.
+    """
+    if room_indices is None:
+        room_indices = range(len(plan.rooms))
+    wb = openpyxl.Workbook(write_only=True)
+    for done, i in enumerate(room_indices, start=1):
+        room = plan.rooms[i]
+        ws = wb.create_sheet(title=f"Room {room.number}")
+        if done == 1:
+            prime_styles(ws)
+        stream_seating_sheet(ws, plan, i)
+        stream_attendance_sheet(wb.create_sheet(title=f"Attendance - Room {room.number}"), plan, i)
+        if on_room:
+            on_room(done, len(room_indices))
+    if index:
+        ws = wb.create_sheet(title=INDEX_SHEET)
+        if not room_indices:
+            prime_styles(ws)
+        stream_index_sheet(ws, plan)
+    wb.save(output_path)
+    return output_path
+
+
+def write_index(plan, output_path):
+    """The master index on its own: a write-only workbook, or a flat table if output_path is a .csv."""
+    if output_path.lower().endswith(".csv"):
+        ids, rooms, positions, benches, rows = plan.master_index()
+        numbers = np.array([str(room.number) for room in plan.rooms], dtype=object)
+        pd.DataFrame({
+            "Roll Number": plan.roll_numbers[ids],
+            "Room": numbers[rooms],
+            "Row": benches + 1,
+            "Seat Position": np.asarray(SEAT_POSITIONS)[positions],
+            "Seat": rows + 1,
+        }).to_csv(output_path, index=False)
+        return output_path
+    return stream_workbook(plan, output_path, room_indices=[], index=True)
+
+
+def shard_path(output_path, part):
+    base, ext = os.path.splitext(output_path)
+    return f"{base}_part{part:02d}{ext}"
+
+
+def save_sharded(plan, output_path, shards, on_room=None, index=False):
+    """Stream each group of room indices in shards to its own numbered workbook.
+
+    The master index, if asked for, goes into the last one.
+    """
+    total = sum(len(rooms) for rooms in shards)
+    paths = []
+    done = 0
+    for part, room_indices in enumerate(shards, start=1):
+        def progress(n, _, offset=done):
+            if on_room:
+                on_room(offset + n, total)
+        paths.append(stream_workbook(plan, shard_path(output_path, part), room_indices, progress,
+                                     index=index and part == len(shards)))
+        done += len(room_indices)
+    return paths
@@ -0,0 +1,252 @@
+"""Check a generated seating workbook against the roll number lists it came from.
+
+    python chart_verify.py SeatingChart_Output.xlsx "Year 4.xlsx" "Year 2.xlsx" "Year 3.xlsx"
+
+The workbook is only read: each worksheet is taken from the .xlsx archive one
+at a time and scanned for its cell values. Every 'Room ...' sheet gives the
+seat of each roll number and every 'Attendance - Room ...' sheet the room and
+seat position it is listed under (its group, for plans seated with another
+group pattern); both are collected into dicts and compared with the rosters
+as sets. Sheets must be in the layout chart_render writes. A sharded output
+(name_part01.xlsx, ...) is verified as one workbook when given the
+unsharded name.
+
+Reported problems:
+    missing     on a roster but not seated anywhere
+    unknown     seated but on no roster
+    duplicated  seated more than once
+    misplaced   seated at a position other than its roster's (e.g. Left roll at S-1),
+                or on a seat of another group
+    mismatched  attendance sheet disagrees with the seating sheets
+"""
+
+import argparse
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from xml.sax.saxutils import unescape
+
+from chart_render import shard_path
+from seat_plan import GROUP_PATTERNS, MASK_LABELS, SEAT_POSITIONS, group_label, parse_pattern, seat_group
+
+SEATING_PREFIX = "Room "
+ATTENDANCE_PREFIX = "Attendance - Room "
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+CELL_PATTERN = re.compile(r'<c r="([A-Z]+)(\d+)"([^>]*)>(?:<f>[^<]*</f>)?'
+                          r'(?:<v>([^<]*)</v>|<is><t[^>]*>([^<]*)</t></is>)')
+ENTITIES = {"&quot;": '"', "&apos;": "'"}
+
+
+@dataclass
+class VerifyReport:
+    rooms: int = 0
+    seated: int = 0
+    missing: list = field(default_factory=list)
+    unknown: list = field(default_factory=list)
+    duplicated: dict = field(default_factory=dict)
+    misplaced: list = field(default_factory=list)
+    mismatched: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not (self.missing or self.unknown or self.duplicated or self.misplaced or self.mismatched)
+
+    def summary(self, limit=20):
+        lines = [f"Rooms: {self.rooms}  Seated: {self.seated}"]
+
+        def section(title, items):
+            if not items:
+                return
+            lines.append(f"{title}: {len(items)}")
+            for item in items[:limit]:
+                lines.append(f"  {item}")
+            if len(items) > limit:
+                lines.append(f"  ... and {len(items) - limit} more")
+
+        section("Missing", self.missing)
+        section("Unknown", self.unknown)
+        section("Duplicated", [f"{roll}: {', '.join(seats)}" for roll, seats in self.duplicated.items()])
+        section("Misplaced", self.misplaced)
+        section("Mismatched", self.mismatched)
+        if self.ok:
+            lines.append("OK: every roll number is seated exactly once and listed on its attendance sheet")
+        return "\n".join(lines)
+
+
+def _text(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _number_text(text):
+    """'221001' or '221001.0' as written for a numeric cell -> '221001'."""
+    try:
+        return _text(float(text)) if "." in text or "E" in text else text
+    except ValueError:
+        return text
+
+
+def read_cells(xml, shared):
+    """(column letters, row, text) of every non-empty cell of a worksheet, in sheet order.
+
+    Worksheet XML is matched with one regular expression instead of being
+    parsed into cells: openpyxl's read-only worksheets spend far longer
+    building a cell object per value than the comparison itself takes.
+    """
+    for column, row, attrs, number, inline in CELL_PATTERN.findall(xml):
+        if inline:
+            text = inline
+        elif 't="s"' in attrs:
+            text = shared[int(number)]
+        elif 't="str"' in attrs or 't="inlineStr"' in attrs:
+            text = number
+        else:
+            text = _number_text(number)
+        if text:
+            yield column, int(row), unescape(text, ENTITIES) if "&" in text else text
+
+
+def _section(key, pattern):
+    return SEAT_POSITIONS[key] if pattern == "positions" else group_label(key)
+
+
+def read_seating(cells, room, pattern="positions", groups=0):
+    """{roll: [(room, section, seat)]} for one seating sheet.
+
+    The section is the seat position, or with another pattern the group of the seat.
+    """
+    seats = defaultdict(list)
+    columns = {}  # column letters -> (position, bench)
+    bench = width = 0
+    for column, row, text in cells:
+        if row == 4 and text in SEAT_POSITIONS:
+            p = SEAT_POSITIONS.index(text)
+            if p == 0:
+                bench += 1
+            width = max(width, p + 1)
+            columns[column] = (p, bench)
+        elif row > 4 and column in columns and text not in MASK_LABELS:
+            p, b = columns[column]
+            key = p if pattern == "positions" else int(seat_group(pattern, groups, width, b - 1, row - 5, p))
+            seats[text].append((room, key, f"Room {room} bench {b} row {row - 4} {SEAT_POSITIONS[p]}"))
+    return seats
+
+
+def read_attendance(cells, room):
+    """{roll: [(room, section)]} for one attendance sheet; sections are seat positions or groups."""
+    listed = defaultdict(list)
+    labels = {}
+    for column, row, text in cells:
+        if row < 3:
+            continue
+        if column == "A":
+            if text in SEAT_POSITIONS:
+                labels[row] = SEAT_POSITIONS.index(text)
+            elif text.startswith("Group ") and text[6:].isdigit():
+                labels[row] = int(text[6:]) - 1
+            else:
+                labels[row] = None
+        elif column == "C":
+            listed[text].append((room, labels.pop(row, None)))
+    return listed
+
+
+def read_workbook(path):
+    """(sheet title, worksheet XML) for every sheet of the workbook at path, in tab order."""
+    with zipfile.ZipFile(path) as zf:
+        shared = []
+        if "xl/sharedStrings.xml" in zf.namelist():
+            for si in ET.fromstring(zf.read("xl/sharedStrings.xml")).iter(f"{MAIN_NS}si"):
+                shared.append("".join(t.text or "" for t in si.iter(f"{MAIN_NS}t")))
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+        for sheet in ET.fromstring(zf.read("xl/workbook.xml")).iter(f"{MAIN_NS}sheet"):
+            target = targets[sheet.get(f"{REL_NS}id")]
+            member = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            yield sheet.get("name"), zf.read(member).decode("utf-8"), shared
+
+
+def workbook_paths(path):
+    if os.path.exists(path):
+        return [path]
+    paths = []
+    while os.path.exists(shard_path(path, len(paths) + 1)):
+        paths.append(shard_path(path, len(paths) + 1))
+    if not paths:
+        raise FileNotFoundError(path)
+    return paths
+
+
+def verify(path, rosters, pattern="positions"):
+    """Verify the workbook at path (or its shards) against the rosters, in group order."""
+    pattern = parse_pattern(pattern)
+    seats = defaultdict(list)
+    listed = defaultdict(list)
+    report = VerifyReport()
+    for workbook_path in workbook_paths(path):
+        for title, xml, shared in read_workbook(workbook_path):
+            if title.startswith(ATTENDANCE_PREFIX):
+                found = read_attendance(read_cells(xml, shared), title[len(ATTENDANCE_PREFIX):])
+                target = listed
+            elif title.startswith(SEATING_PREFIX):
+                report.rooms += 1
+                found = read_seating(read_cells(xml, shared), title[len(SEATING_PREFIX):], pattern, len(rosters))
+                target = seats
+            else:
+                continue
+            for roll, places in found.items():
+                target[roll].extend(places)
+
+    expected = {}
+    for p, roster in enumerate(rosters):
+        for roll in roster:
+            expected.setdefault(_text(roll), p)
+
+    report.seated = sum(len(places) for places in seats.values())
+    report.missing = [roll for roll in expected if roll not in seats]
+    report.unknown = [roll for roll in seats if roll not in expected]
+    report.duplicated = {roll: [place for _, _, place in places]
+                         for roll, places in seats.items() if len(places) > 1}
+    for roll, places in seats.items():
+        p = expected.get(roll)
+        if p is not None and places[0][1] != p:
+            report.misplaced.append(f"{roll}: {places[0][2]}, roster is {_section(p, pattern)}")
+
+    for roll in seats.keys() | listed.keys():
+        seated_at = sorted(((room, p) for room, p, _ in seats.get(roll, ())), key=str)
+        listed_at = sorted(listed.get(roll, ()), key=str)
+        if seated_at != listed_at:
+            def where(places):
+                return ", ".join(f"Room {room} {_section(p, pattern) if p is not None else '?'}"
+                                 for room, p in places) or "nowhere"
+            report.mismatched.append(f"{roll}: seated {where(seated_at)}, attendance {where(listed_at)}")
+    report.mismatched.sort()
+    return report
+
+
+def main(argv=None):
+    from seating_cli import load_rolls
+
+    parser = argparse.ArgumentParser(description="Verify a generated seating workbook")
+    parser.add_argument("workbook", help="generated workbook, e.g. SeatingChart_Output.xlsx")
+    parser.add_argument("rolls", nargs="+", help="roll number files, one per seat position")
+    parser.add_argument("--pattern", default="positions",
+                        help=f"group pattern the workbook was generated with: {', '.join(GROUP_PATTERNS)} or a tile")
+    parser.add_argument("--limit", type=int, default=20, help="problems to list per kind")
+    args = parser.parse_args(argv)
+
+    report = verify(args.workbook, [load_rolls(path) for path in args.rolls], args.pattern)
+    print(report.summary(args.limit))
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Checkpointed generation that survives crashes and can be resumed.
+
+A checkpointed run keeps its progress in a run directory named after a
+fingerprint of the inputs (layout, rosters, fill strategy, seed and group
+pattern):
+
+    <root>/<fingerprint>/
+        plan.npz          the allocation, written before any rendering
+        rooms/00000.xlsx  one write-only workbook per finished room
+        index.xlsx        the master index sheet, when one is asked for
+
+Every file is written under a temporary name and renamed into place, so a
+file that exists is complete. Rerunning with the same inputs reuses the
+saved plan, skips rooms whose part already exists and renders the rest;
+assemble() then stitches the parts into the final workbook at the zip level
+without parsing them again.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import zipfile
+
+import numpy as np
+
+from chart_render import stream_workbook, write_index
+from seat_plan import SeatPlan, allocate, parse_pattern
+
+WORKSHEET_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+SHEET_PATTERN = re.compile(rb'<sheet name="([^"]*)"[^>]*r:id="([^"]+)"')
+REL_PATTERN = re.compile(rb'<Relationship[^>]*Target="([^"]+)"[^>]*Id="([^"]+)"')
+
+
+def fingerprint(rooms, rosters, strategy="column-major", seed=0, pattern="positions"):
+    digest = hashlib.sha256()
+    # The default pattern is left out so fingerprints from before patterns stay valid.
+    digest.update(f"{strategy}|{seed}\n".encode() if pattern == "positions" else f"{strategy}|{seed}|{pattern}\n".encode())
+    for room in rooms:
+        digest.update(repr((str(room.number), room.benches, room.rows, room.seats_per_bench,
+                            tuple(str(n) for n in room.names))).encode())
+        if room.mask:
+            digest.update(room.mask + b"|" + room.reserved)
+    for roster in rosters:
+        digest.update(b"\x1e")
+        digest.update("\x1f".join(map(str, roster)).encode())
+    return digest.hexdigest()
+
+
+def save_seats(plan, path):
+    sizes = np.array([s.size for s in plan.seats], dtype=np.int64)
+    flat = np.concatenate([s.ravel() for s in plan.seats]) if plan.seats else np.empty(0, np.int32)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, seats=flat, sizes=sizes, offsets=plan.offsets)
+    os.replace(tmp_path, path)
+
+
+def load_seats(path, rooms, rosters, strategy, seed, pattern="positions"):
+    with np.load(path) as data:
+        flat, sizes, offsets = data["seats"], data["sizes"], data["offsets"]
+    seats = []
+    start = 0
+    for room, size in zip(rooms, sizes):
+        seats.append(flat[start:start + size].reshape(room.seats_per_bench, room.capacity))
+        start += size
+    return SeatPlan(rooms=rooms, rosters=rosters, seats=seats, offsets=offsets, strategy=strategy, seed=seed,
+                    pattern=pattern)
+
+
+class CheckpointedRun:
+    def __init__(self, root, rooms, rosters, strategy="column-major", seed=0, pattern="positions"):
+        self.rooms = rooms
+        self.rosters = rosters
+        self.strategy = strategy
+        self.seed = seed
+        self.pattern = parse_pattern(pattern)
+        self.run_dir = os.path.join(root, fingerprint(rooms, rosters, strategy, seed, self.pattern)[:16])
+        self.parts_dir = os.path.join(self.run_dir, "rooms")
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+    def part_path(self, room_index):
+        return os.path.join(self.parts_dir, f"{room_index:05d}.xlsx")
+
+    def plan(self):
+        """The saved allocation if there is one, else a fresh one saved first."""
+        path = os.path.join(self.run_dir, "plan.npz")
+        if os.path.exists(path):
+            return load_seats(path, self.rooms, self.rosters, self.strategy, self.seed, self.pattern)
+        plan = allocate(self.rooms, self.rosters, strategy=self.strategy, seed=self.seed, pattern=self.pattern)
+        save_seats(plan, path)
+        return plan
+
+    def completed(self):
+        return [i for i in range(len(self.rooms)) if os.path.exists(self.part_path(i))]
+
+    def run(self, output_path, on_room=None, index=False):
+        """Render every room that has no part yet, then assemble output_path.
+
+        index adds the master index sheet, rendered once as a part of its own.
+        """
+        plan = self.plan()
+        done = set(self.completed())
+        for i in range(len(self.rooms)):
+            if i not in done:
+                tmp_path = self.part_path(i) + ".tmp"
+                stream_workbook(plan, tmp_path, [i])
+                os.replace(tmp_path, self.part_path(i))
+                done.add(i)
+            if on_room:
+                on_room(len(done), len(self.rooms))
+        self.finish(plan, output_path, index)
+        return plan
+
+    def finish(self, plan, output_path, index=False):
+        """Assemble output_path once every room has its part."""
+        parts = [self.part_path(i) for i in range(len(self.rooms))]
+        if index:
+            index_path = os.path.join(self.run_dir, "index.xlsx")
+            if not os.path.exists(index_path):
+                write_index(plan, index_path + ".tmp")
+                os.replace(index_path + ".tmp", index_path)
+            parts.append(index_path)
+        assemble(parts, output_path)
+
+    def clear(self):
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+def _sheets(part):
+    """(name, member) of every worksheet in a write-only part, in workbook order."""
+    targets = {rid: target.lstrip(b"/") for target, rid in REL_PATTERN.findall(part.read("xl/_rels/workbook.xml.rels"))}
+    return [(name.decode(), targets[rid].decode()) for name, rid in SHEET_PATTERN.findall(part.read("xl/workbook.xml"))]
+
+
+def assemble(part_paths, output_path):
+    """Concatenate the worksheets of several write-only parts into one workbook.
+
+    The parts must come from stream_workbook(): it primes the same styles in
+    the same order, and openpyxl writes strings inline, so worksheet XML can
+    be copied verbatim and only the workbook-level parts are rebuilt.
+    """
+    tmp_path = output_path + ".tmp"
+    names = []
+    styles = None
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out:
+        for path in part_paths:
+            with zipfile.ZipFile(path) as part:
+                part_styles = part.read("xl/styles.xml")
+                if styles is None:
+                    styles = part_styles
+                    for member in ["xl/styles.xml", "xl/theme/theme1.xml", "docProps/app.xml",
+                                   "docProps/core.xml", "_rels/.rels"]:
+                        out.writestr(member, part.read(member))
+                elif part_styles != styles:
+                    raise ValueError(f"{path} was rendered with different styles")
+                for name, member in _sheets(part):
+                    names.append(name)
+                    with part.open(member) as src, out.open(f"xl/worksheets/sheet{len(names)}.xml", "w") as dst:
+                        shutil.copyfileobj(src, dst)
+
+        count = len(names)
+        sheets = "".join(f'<sheet name="{name}" sheetId="{n}" state="visible" r:id="rId{n}" />'
+                         for n, name in enumerate(names, start=1))
+        out.writestr("xl/workbook.xml", (
+            '<workbook xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+            'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><workbookPr /><bookViews>'
+            '<workbookView activeTab="0" /></bookViews>'
+            f'<sheets>{sheets}</sheets><calcPr calcId="124519" fullCalcOnLoad="1" /></workbook>'))
+        rel = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+        rels = "".join(f'<Relationship Type="{rel}/worksheet" Target="/xl/worksheets/sheet{n}.xml" Id="rId{n}" />'
+                       for n in range(1, count + 1))
+        out.writestr("xl/_rels/workbook.xml.rels", (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{rels}<Relationship Type="{rel}/styles" Target="styles.xml" Id="rId{count + 1}" />'
+            f'<Relationship Type="{rel}/theme" Target="theme/theme1.xml" Id="rId{count + 2}" /></Relationships>'))
+        overrides = "".join(f'<Override PartName="/xl/worksheets/sheet{n}.xml" ContentType="{WORKSHEET_TYPE}" />'
+                            for n in range(1, count + 1))
+        out.writestr("[Content_Types].xml", (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml" />'
+            '<Default Extension="xml" ContentType="application/xml" />'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml" />'
+            '<Override PartName="/xl/theme/theme1.xml" ContentType="application/vnd.openxmlformats-officedocument.theme+xml" />'
+            '<Override PartName="/docProps/core.xml" ContentType="application/vnd.openxmlformats-package.core-properties+xml" />'
+            '<Override PartName="/docProps/app.xml" ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml" />'
+            f'{overrides}'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml" />'
+            '</Types>'))
+    os.replace(tmp_path, output_path)
+    return output_path
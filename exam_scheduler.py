@@ -0,0 +1,152 @@
+"""Plan several exam sittings against one shared room inventory.
+
+Each session brings its own rosters and time slot. Rooms are handed out in
+start-time order: a room booked by a session is not offered to any session
+that overlaps it in time, and every session gets the fewest, best fitting
+free rooms that seat all of its students. Within a session the rosters are
+spread evenly over the chosen rooms (seat_plan.balanced_limits).
+
+Command line:
+    python exam_scheduler.py "excel sheet.xlsx" sessions.xlsx --out-dir outputs
+
+All sessions of one scheduling run are published together as a new run
+directory under --out-dir (workspace), so a rerun never overwrites the
+workbooks of an earlier one.
+
+The sessions sheet needs 'Session', 'Start' and 'End' columns plus one
+'<Position> Path' column (Left Path, Middle Path, Right Path) per roster.
+"""
+
+import argparse
+import heapq
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from roster_ingest import read_roster
+from seat_plan import (FILL_STRATEGIES, ROSTER_POSITIONS, allocate, balanced_limits, max_seats_per_bench,
+                       position_capacity, rooms_from_layout)
+
+
+@dataclass
+class Session:
+    name: str
+    start: object
+    end: object
+    rosters: list
+
+    @property
+    def demand(self):
+        """Seats needed by each seat position."""
+        return np.array([len(r) for r in self.rosters], dtype=np.int64)
+
+
+@dataclass
+class SessionPlan:
+    session: Session
+    room_indices: list = field(default_factory=list)
+    plan: object = None
+    shortfall: int = 0
+
+
+def pick_rooms(free, seats, demand):
+    """Choose free rooms that seat demand[p] students at every position p, wasting few seats.
+
+    seats is (rooms, positions) as from seat_plan.position_capacity, so rooms
+    with narrower benches only count for the positions they have. While no
+    single free room closes the remaining gap, take the room that covers the
+    most of it; then finish with the smallest room that does.
+    """
+    deficit = np.asarray(demand, dtype=np.int64).copy()
+    free = np.array(sorted(free), dtype=np.int64)
+    chosen = []
+    while (deficit > 0).any() and len(free):
+        offered = seats[free]
+        closes = (offered >= deficit).all(axis=1)
+        if closes.any():
+            candidates = free[closes]
+            pick = candidates[np.argmin(seats[candidates].sum(axis=1))]
+        else:
+            gain = np.minimum(offered, deficit).sum(axis=1)
+            if gain.max() <= 0:
+                break
+            pick = free[np.argmax(gain)]
+        chosen.append(int(pick))
+        deficit = np.maximum(deficit - seats[pick], 0)
+        free = free[free != pick]
+    return chosen, int(deficit.max(initial=0))
+
+
+def schedule(sessions, rooms, strategy="column-major", seed=0):
+    """Assign rooms to every session without double booking and build each plan."""
+    width = max((len(session.rosters) for session in sessions), default=0)
+    seats = position_capacity(rooms, width)
+    order = sorted(range(len(sessions)), key=lambda i: (sessions[i].start, -sessions[i].demand.sum()))
+    free = set(range(len(rooms)))
+    busy = []
+    results = [None] * len(sessions)
+    for i in order:
+        session = sessions[i]
+        while busy and busy[0][0] <= session.start:
+            _, room_index = heapq.heappop(busy)
+            free.add(room_index)
+        chosen, shortfall = pick_rooms(free, seats[:, :len(session.rosters)], session.demand)
+        chosen.sort()
+        for room_index in chosen:
+            free.discard(room_index)
+            heapq.heappush(busy, (session.end, room_index))
+        session_rooms = [rooms[r] for r in chosen]
+        plan = allocate(session_rooms, session.rosters, strategy=strategy, seed=seed,
+                        limits=balanced_limits(session_rooms, session.rosters))
+        results[i] = SessionPlan(session=session, room_indices=chosen, plan=plan, shortfall=shortfall)
+    return results
+
+
+def load_sessions(path, students_per_bench):
+    """Read the sessions sheet and the roster files it points to."""
+    df = pd.read_excel(path)
+    df.columns = df.columns.str.strip()
+    sessions = []
+    for _, row in df.iterrows():
+        rosters = []
+        for pos in ROSTER_POSITIONS[:students_per_bench]:
+            rosters.append(read_roster(row[f"{pos} Path"]).rolls())
+        sessions.append(Session(name=str(row['Session']), start=pd.Timestamp(row['Start']),
+                                end=pd.Timestamp(row['End']), rosters=rosters))
+    return sessions
+
+
+def main():
+    from chart_render import build_workbook
+    from seating_cli import load_masks
+    from workspace import cleanup, publishing
+
+    parser = argparse.ArgumentParser(description="Plan every exam sitting against one room layout")
+    parser.add_argument("layout", help="room layout Excel file")
+    parser.add_argument("sessions", help="sessions Excel file")
+    parser.add_argument("--out-dir", default="outputs", help="root the run directory is published under")
+    parser.add_argument("--fill", choices=FILL_STRATEGIES, default=FILL_STRATEGIES[0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    layout = pd.read_excel(args.layout)
+    layout.columns = layout.columns.str.strip()
+    students_per_bench = max_seats_per_bench(layout)
+    rooms = rooms_from_layout(layout, masks=load_masks(args.layout))
+    sessions = load_sessions(args.sessions, students_per_bench)
+
+    with publishing(args.out_dir) as workspace:
+        for result in schedule(sessions, rooms, strategy=args.fill, seed=args.seed):
+            session = result.session
+            room_names = ", ".join(str(rooms[i].number) for i in result.room_indices)
+            print(f"{session.name} ({session.start} - {session.end}): {room_names or 'no rooms'}")
+            if result.shortfall:
+                print(f"  WARNING: short of {result.shortfall} seats")
+            build_workbook(result.plan).save(workspace.path(f"Seating_{session.name}.xlsx"))
+    print(f"Published the sessions to {workspace.directory}")
+    cleanup(args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
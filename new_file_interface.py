@@ -2,19 +2,105 @@
 # Enhancements:
 # - Unique attendance sheet per room
 # - Roll numbers assigned per seat position dynamically
+# - One seat plan per run feeds both the seating and attendance sheets
+# - The run is prepared in the background as soon as its inputs are loaded
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import pandas as pd
-import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
 import os
 import subprocess
+import sys
+import threading
+
+from chart_pdf import render_pdf
+from chart_render import write_index
+from plan_file import load_plan, save_plan, sidecar_path
+from plan_preview import PlanPreview
+from roster_check import check_rosters
+from roster_ingest import RosterFormatError, read_roster
+from seating_cli import load_masks
+from seat_plan import FILL_STRATEGIES, GROUP_PATTERNS, allocate, max_seats_per_bench, parse_pattern, rooms_from_layout
+from size_estimator import default_memory_limit, render
+from workspace import Workspace, cleanup, copy_out
+
+# Inputs have to stay unchanged this long before a background run starts
+SPECULATION_DELAY_MS = 500
+
+
+def prepare_run(layout, masks, rosters, strategy, seed, pattern, index, inputs, on_room=None):
+    """Allocate and render into a new, unpublished Workspace; returns (plan, workspace, paths)."""
+    rooms = rooms_from_layout(layout, masks=masks)
+    plan = allocate(rooms, rosters, strategy=strategy, seed=seed, pattern=pattern)
+    workspace = Workspace.create()
+    try:
+        output_path = workspace.path("SeatingChart_Output.xlsx")
+        paths, _ = render(plan, output_path, memory_limit=default_memory_limit(), on_room=on_room, index=index)
+        save_plan(plan, sidecar_path(output_path), inputs)
+    except BaseException:
+        workspace.discard()
+        raise
+    return plan, workspace, paths
+
+
+class SpeculationCancelled(Exception):
+    pass
+
+
+class Speculation:
+    """prepare_run for one set of inputs on a background thread, kept unpublished until Generate.
+
+    cancel() stops it at the next room and discards its workspace, whether
+    it is still rendering or already finished.
+    """
+
+    def __init__(self, key, run):
+        self.key = key
+        self.done_rooms = 0
+        self.total_rooms = 0
+        self.result = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, args=(run,), daemon=True)
+        self._thread.start()
+
+    def _run(self, run):
+        try:
+            self.result = prepare_run(**run, on_room=self.progress)
+        except SpeculationCancelled:
+            pass
+        except Exception as e:
+            self.error = e
+        with self._lock:
+            self._finished = True
+            drop = self._cancelled
+        if drop:
+            self._discard()
+
+    def progress(self, done, total):
+        if self._cancelled:
+            raise SpeculationCancelled
+        self.done_rooms, self.total_rooms = done, total
+
+    def wait(self, timeout=None):
+        """True once the run has finished, successfully or not."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            drop = self._finished
+        if drop:
+            self._discard()
+
+    def _discard(self):
+        if self.result is not None:
+            self.result[1].discard()
+            self.result = None
 
-SEAT_POSITIONS = ["F-1", "S-1", "T-1"]
-HEADER_FILL = PatternFill(start_color="D1C4E9", end_color="D1C4E9", fill_type="solid")
-BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin'))
 
 class SeatingChartApp:
     def __init__(self, master):
@@ -23,11 +109,21 @@ class SeatingChartApp:
         master.geometry("600x600")
         master.configure(bg="#f0f0f0")
         self.room_details_df = None
+        self.blocked_seats_df = None
         self.students_per_bench = None
         self.roll_numbers_lists = []
         self.roll_paths = {}
+        self.roll_columns = {}
         self.roll_files_selected = {}
+        self.roll_groups = ["Left", "Middle", "Right"]
+        self.input_files = {}
+        self.seat_plan = None
         self.generated_file_path = None
+        # Bumped whenever a layout or roster is loaded; part of the speculation key
+        self.input_version = 0
+        self.speculation = None
+        self.speculation_timer = None
+        master.protocol("WM_DELETE_WINDOW", self.close)
 
         # Color scheme
         self.button_bg = "#FFB300"
@@ -51,9 +147,13 @@ class SeatingChartApp:
 
         lbl_roll = tk.Label(frame_input, text="Roll Numbers Files:", font=("Helvetica", 12, "bold"), bg=self.frame_bg)
         lbl_roll.pack(anchor="w", pady=(10, 0), padx=10)
-        for pos in ["Left", "Middle", "Right"]:
+        self.frame_rolls = tk.Frame(frame_input, bg=self.frame_bg)
+        self.frame_rolls.pack(fill="x")
+        for pos in self.roll_groups:
             self.roll_files_selected[pos] = False
-            self.create_button(frame_input, f"🧾 Upload {pos} Roll Numbers", lambda p=pos: self.load_roll_file(p))
+            self.create_button(self.frame_rolls, f"🧾 Upload {pos} Roll Numbers", lambda p=pos: self.load_roll_file(p))
+        self.create_button(frame_input, "➕ Add Roll Number Group", self.add_roll_group)
+        self.create_button(frame_input, "📦 Load Existing Plan", self.load_existing_plan)
 
         frame_actions = tk.Frame(master, bg=self.frame_bg, bd=2, relief=tk.RIDGE)
         frame_actions.pack(padx=10, pady=10, fill="x")
@@ -61,12 +161,43 @@ class SeatingChartApp:
                                   font=("Helvetica", 16, "bold"))
         actions_header.pack(fill="x")
 
+        frame_fill = tk.Frame(frame_actions, bg=self.frame_bg)
+        frame_fill.pack(pady=(10, 0))
+        tk.Label(frame_fill, text="Fill Order:", font=("Helvetica", 12, "bold"),
+                 bg=self.frame_bg).pack(side="left", padx=5)
+        self.fill_strategy_var = tk.StringVar(value=FILL_STRATEGIES[0])
+        ttk.Combobox(frame_fill, textvariable=self.fill_strategy_var, values=FILL_STRATEGIES,
+                     state="readonly", width=14).pack(side="left", padx=5)
+        tk.Label(frame_fill, text="Seed:", font=("Helvetica", 12, "bold"),
+                 bg=self.frame_bg).pack(side="left", padx=5)
+        self.seed_var = tk.IntVar(value=0)
+        tk.Spinbox(frame_fill, from_=0, to=999999, textvariable=self.seed_var, width=8).pack(side="left", padx=5)
+
+        frame_pattern = tk.Frame(frame_actions, bg=self.frame_bg)
+        frame_pattern.pack(pady=(5, 0))
+        tk.Label(frame_pattern, text="Group Pattern:", font=("Helvetica", 12, "bold"),
+                 bg=self.frame_bg).pack(side="left", padx=5)
+        self.pattern_var = tk.StringVar(value=GROUP_PATTERNS[0])
+        pattern_box = ttk.Combobox(frame_pattern, textvariable=self.pattern_var, values=GROUP_PATTERNS, width=20)
+        pattern_box.pack(side="left", padx=5)
+        pattern_box.bind("<<ComboboxSelected>>", lambda e: self.update_generate_state())
+
+        self.index_sheet_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_actions, text="Add master roll number index sheet", variable=self.index_sheet_var,
+                       font=("Helvetica", 11), bg=self.frame_bg).pack(pady=(5, 0))
+
         self.generate_button = self.create_button(frame_actions, "✅ Generate Seating & Attendance",
                                                   self.generate_chart, active=False)
         self.download_button = self.create_button(frame_actions, "⬇️ Save File As...",
                                                   self.download_file, active=False)
         self.open_button = self.create_button(frame_actions, "📂 Open File",
                                               self.open_file, active=False)
+        self.pdf_button = self.create_button(frame_actions, "🖨️ Save PDF...",
+                                             self.save_pdf, active=False)
+        self.preview_button = self.create_button(frame_actions, "👁️ Preview Seating",
+                                                 self.show_preview, active=False)
+        self.index_button = self.create_button(frame_actions, "📋 Save Master Index...",
+                                               self.save_index, active=False)
 
         self.progress_var = tk.DoubleVar()
         style = ttk.Style(master)
@@ -79,6 +210,9 @@ class SeatingChartApp:
         self.status_label = tk.Label(frame_actions, text="", fg="green", bg=self.frame_bg, font=("Helvetica", 10))
         self.status_label.pack()
 
+        for var in (self.fill_strategy_var, self.seed_var, self.pattern_var, self.index_sheet_var):
+            var.trace_add("write", lambda *args: self.schedule_speculation())
+
     def create_button(self, parent, text, command, active=True):
         btn = tk.Button(parent, text=text, command=command, width=30, pady=5,
                         bg=self.button_bg, fg="white", font=("Helvetica", 12, "bold"),
@@ -104,11 +238,22 @@ class SeatingChartApp:
             if not all(col in df.columns for col in required):
                 messagebox.showerror("Error", "Room layout file is missing required columns.")
                 return
+            masks = load_masks(filepath)
+            rooms = rooms_from_layout(df, masks=masks)
             self.room_details_df = df
-            self.students_per_bench = int(df['Number of Student per Bench'].iloc[0])
-            self.status_label.config(text="Room layout loaded. Upload roll number files.")
+            self.blocked_seats_df = masks
+            self.input_files["Layout"] = filepath
+            self.input_version += 1
+            self.students_per_bench = max_seats_per_bench(df)
+            status = "Room layout loaded."
+            blocked = sum(room.seats_per_bench * room.capacity - room.usable_seats for room in rooms)
+            if blocked:
+                status += f" {blocked} seats blocked or reserved."
+            self.status_label.config(text=status + " Upload roll number files.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read room layout: {e}")
+            return
+        self.update_generate_state()
 
     def load_roll_file(self, position):
         filepath = filedialog.askopenfilename(title=f"Select {position} Roll Numbers File",
@@ -116,91 +261,224 @@ class SeatingChartApp:
         if not filepath:
             return
         try:
-            df = pd.read_excel(filepath)
-            if 'Roll Number' not in df.columns:
-                messagebox.showerror("Error", f"'{position}' file missing 'Roll Number' column.")
-                return
-            self.roll_paths[position] = df['Roll Number'].dropna().tolist()
+            roster = read_roster(filepath, on_chunk=lambda b: self.show_reading(position, b))
+            self.roll_paths[position] = roster.rolls()
+            self.roll_columns[position] = roster.column()
             self.roll_files_selected[position] = True
+            self.input_files[position] = filepath
+            self.input_version += 1
             self.status_label.config(text=f"{position} roll numbers loaded.")
+        except RosterFormatError:
+            messagebox.showerror("Error", f"'{position}' file missing 'Roll Number' column.")
+            return
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read {position} roll numbers: {e}")
 
-        if self.students_per_bench:
-            needed = ["Left", "Middle", "Right"][:self.students_per_bench]
-        else:
-            needed = []
-        if all(self.roll_files_selected.get(pos, False) for pos in needed):
+        self.update_generate_state(check=True)
+
+    def show_reading(self, position, roster):
+        self.status_label.config(text=f"Reading {position} roll numbers: {roster.rows} rows so far...")
+        self.master.update_idletasks()
+
+    def add_roll_group(self):
+        """Another roll number list, for patterns that interleave more groups than seats per bench."""
+        name = f"Group {len(self.roll_groups) + 1}"
+        self.roll_groups.append(name)
+        self.roll_files_selected[name] = False
+        self.create_button(self.frame_rolls, f"🧾 Upload {name} Roll Numbers", lambda: self.load_roll_file(name))
+        if self.pattern_var.get() == "positions":
+            self.pattern_var.set("cycle")
+        self.update_generate_state()
+
+    def selected_groups(self):
+        """Roll number lists to seat: one per seat position, or every loaded group with other patterns."""
+        if self.pattern_var.get().strip() == "positions":
+            return self.roll_groups[:self.students_per_bench or 0]
+        return [g for g in self.roll_groups if self.roll_files_selected.get(g)]
+
+    def update_generate_state(self, check=False):
+        needed = self.selected_groups()
+        if needed and all(self.roll_files_selected.get(pos, False) for pos in needed):
             self.roll_numbers_lists = [self.roll_paths[pos] for pos in needed]
+            if check:
+                self.check_rolls(needed)
             self.generate_button.config(state=tk.NORMAL)
             self.generate_button.config(bg=self.button_bg)
+        else:
+            self.generate_button.config(state=tk.DISABLED)
+        self.schedule_speculation()
 
-    def generate_chart(self):
+    def check_rolls(self, positions):
+        """Warn about duplicate, overlapping, blank or malformed roll numbers before generating."""
+        report = check_rosters({pos: self.roll_columns[pos] for pos in positions})
+        if not report.ok:
+            messagebox.showwarning("Roll Number Check", report.summary())
+
+    def current_run(self):
+        """(key, prepare_run arguments) of the run Generate would make now."""
+        groups = self.selected_groups()
+        run = dict(layout=self.room_details_df, masks=self.blocked_seats_df,
+                   rosters=[self.roll_paths[g] for g in groups], strategy=self.fill_strategy_var.get(),
+                   seed=self.seed_var.get(), pattern=parse_pattern(self.pattern_var.get()),
+                   index=self.index_sheet_var.get(), inputs=[self.input_files[k] for k in ["Layout"] + groups])
+        key = (self.input_version, tuple(groups), run["strategy"], run["seed"], run["pattern"], run["index"])
+        return key, run
+
+    def schedule_speculation(self):
+        """Start a background run once the inputs have settled; a run for other inputs is dropped now."""
+        if self.speculation_timer is not None:
+            self.master.after_cancel(self.speculation_timer)
+        self.speculation_timer = self.master.after(SPECULATION_DELAY_MS, self.speculate)
+
+    def speculate(self):
+        self.speculation_timer = None
+        groups = self.selected_groups()
+        ready = (self.room_details_df is not None and groups
+                 and all(self.roll_files_selected.get(g) for g in groups))
         try:
-            wb = openpyxl.Workbook()
-            for idx, row in self.room_details_df.iterrows():
-                room_number = row['Room Number']
-                benches = int(row['Number of Bench'])
-                rows = int(row['Number of Rows'])
-                total_seats = benches * rows
-
-                att_ws = wb.create_sheet(title=f"Attendance - Room {room_number}")
-                att_ws['A1'] = f"Attendance Sheet - Room {room_number}"
-                att_ws['A1'].font = Font(size=14, bold=True)
-                att_ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=4)
-                att_ws['A2'] = "Seat Position"
-                att_ws['B2'] = "Serial Number"
-                att_ws['C2'] = "Roll Number"
-                att_ws['D2'] = "Signature"
-                for cell in ['A2', 'B2', 'C2', 'D2']:
-                    att_ws[cell].font = Font(bold=True)
-                    att_ws[cell].fill = HEADER_FILL
-                    att_ws[cell].alignment = Alignment(horizontal='center')
-
-                current_row = 3
-                for pos_index in range(self.students_per_bench):
-                    pos_label = SEAT_POSITIONS[pos_index]
-                    rolls = self.roll_numbers_lists[pos_index]
-                    for i, roll in enumerate(rolls[:total_seats]):
-                        att_ws.cell(row=current_row, column=1, value=pos_label)
-                        att_ws.cell(row=current_row, column=2, value=i+1)
-                        att_ws.cell(row=current_row, column=3, value=roll)
-                        att_ws.cell(row=current_row, column=4, value="")
-                        for col in range(1, 5):
-                            att_ws.cell(row=current_row, column=col).alignment = Alignment(horizontal='center')
-                            att_ws.cell(row=current_row, column=col).border = BORDER
-                        current_row += 1
-
-                self.progress_var.set((idx + 1) / len(self.room_details_df) * 100)
+            key, run = self.current_run() if ready else (None, None)
+        except (tk.TclError, ValueError, KeyError):
+            key = None
+        if self.speculation is not None:
+            if key is not None and self.speculation.key == key:
+                return
+            self.speculation.cancel()
+            self.speculation = None
+        if key is not None:
+            self.speculation = Speculation(key, run)
+
+    def take_speculation(self, key):
+        """(plan, workspace, paths) of the background run for key, waiting for it if needed; None if there is none."""
+        if self.speculation_timer is not None:
+            self.master.after_cancel(self.speculation_timer)
+            self.speculation_timer = None
+        speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+        if speculation.key != key:
+            # Stops at its next room; wait so only one run renders at a time
+            speculation.cancel()
+            speculation.wait()
+            return None
+        while not speculation.wait(0.05):
+            if speculation.total_rooms:
+                self.update_progress(speculation.done_rooms, speculation.total_rooms)
+            else:
                 self.master.update_idletasks()
+        if speculation.result is None:
+            # Failed in the background: run again here so the error is reported as usual
+            return None
+        self.update_progress(1, 1)
+        return speculation.result
 
-            del wb['Sheet']
-            output_path = os.path.join(os.getcwd(), "SeatingChart_Output.xlsx")
-            wb.save(output_path)
-            self.generated_file_path = output_path
-            self.download_button.config(state=tk.NORMAL)
-            self.open_button.config(state=tk.NORMAL)
-            messagebox.showinfo("Success", f"Seating chart and attendance saved to:\n{output_path}")
+    def generate_chart(self):
+        try:
+            key, run = self.current_run()
+            result = self.take_speculation(key)
+            if result is None:
+                result = prepare_run(**run, on_room=self.update_progress)
+            self.seat_plan, workspace, paths = result
+            try:
+                workspace.publish()
+            except BaseException:
+                workspace.discard()
+                raise
+            paths = [workspace.published_path(path) for path in paths]
+            cleanup()
+            self.generated_file_path = paths[0]
+            self.enable_outputs()
+            unseated = self.seat_plan.total_students - self.seat_plan.seated_count
+            message = "Seating chart and attendance saved to:\n" + "\n".join(paths)
+            if unseated:
+                message += f"\n\n{unseated} students did not fit in the available rooms."
+            messagebox.showinfo("Success", message)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate charts: {e}")
 
+    def enable_outputs(self):
+        has_workbook = bool(self.generated_file_path) and os.path.exists(self.generated_file_path)
+        self.download_button.config(state=tk.NORMAL if has_workbook else tk.DISABLED)
+        self.open_button.config(state=tk.NORMAL if has_workbook else tk.DISABLED)
+        self.pdf_button.config(state=tk.NORMAL)
+        self.preview_button.config(state=tk.NORMAL)
+        self.index_button.config(state=tk.NORMAL)
+
+    def load_existing_plan(self):
+        """Reopen a plan saved next to an earlier workbook, without reading the workbook."""
+        filepath = filedialog.askopenfilename(title="Select Seat Plan File",
+                                              filetypes=[("Seat Plan Files", "*.seatplan")])
+        if not filepath:
+            return
+        try:
+            self.seat_plan = load_plan(filepath)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load seat plan: {e}")
+            return
+        workbook = os.path.splitext(filepath)[0] + ".xlsx"
+        self.generated_file_path = workbook if os.path.exists(workbook) else None
+        self.enable_outputs()
+        self.status_label.config(text=f"Loaded {self.seat_plan.seated_count} seated students "
+                                      f"in {len(self.seat_plan.rooms)} rooms.")
+
+    def update_progress(self, done, total):
+        self.progress_var.set(done / total * 100)
+        self.master.update_idletasks()
+
     def download_file(self):
         if self.generated_file_path:
             save_path = filedialog.asksaveasfilename(title="Save As", defaultextension=".xlsx",
                                                      filetypes=[("Excel Files", "*.xlsx")])
             if save_path:
-                with open(self.generated_file_path, 'rb') as src:
-                    with open(save_path, 'wb') as dst:
-                        dst.write(src.read())
+                copy_out(self.generated_file_path, save_path)
                 messagebox.showinfo("Saved", f"File saved to:\n{save_path}")
 
+    def save_pdf(self):
+        if self.seat_plan is None:
+            return
+        save_path = filedialog.asksaveasfilename(title="Save PDF As", defaultextension=".pdf",
+                                                 initialfile="SeatingChart_Output.pdf",
+                                                 filetypes=[("PDF Files", "*.pdf")])
+        if not save_path:
+            return
+        try:
+            render_pdf(self.seat_plan, save_path, on_room=self.update_progress)
+            messagebox.showinfo("Saved", f"PDF saved to:\n{save_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to write PDF: {e}")
+
+    def save_index(self):
+        """Every student by roll number with their room and seat, for the notice boards."""
+        if self.seat_plan is None:
+            return
+        save_path = filedialog.asksaveasfilename(title="Save Master Index As", defaultextension=".xlsx",
+                                                 initialfile="Master_Index.xlsx",
+                                                 filetypes=[("Excel Files", "*.xlsx"), ("CSV Files", "*.csv")])
+        if not save_path:
+            return
+        try:
+            write_index(self.seat_plan, save_path)
+            messagebox.showinfo("Saved", f"Master index saved to:\n{save_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to write the master index: {e}")
+
+    def show_preview(self):
+        if self.seat_plan is not None:
+            PlanPreview(self.master, self.seat_plan)
+
+    def close(self):
+        if self.speculation is not None:
+            self.speculation.cancel()
+        self.master.destroy()
+
     def open_file(self):
         if self.generated_file_path and os.path.exists(self.generated_file_path):
             try:
                 if os.name == 'nt':
                     os.startfile(self.generated_file_path)
-                elif os.name == 'posix':
+                elif sys.platform == 'darwin':
                     subprocess.call(['open', self.generated_file_path])
+                else:
+                    subprocess.call(['xdg-open', self.generated_file_path])
             except Exception as e:
                 messagebox.showerror("Error", f"Unable to open file: {e}")
 
@@ -2,14 +2,16 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import pandas as pd
 import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
+from openpyxl.styles import Alignment, Font, PatternFill
 import os
 import subprocess
 
-SEAT_POSITIONS = ["F-1", "S-1", "T-1"]
-HEADER_FILL = PatternFill(start_color="D1C4E9", end_color="D1C4E9", fill_type="solid")
-BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin'))
+from roster_check import check_rosters
+from roster_ingest import RosterFormatError, read_roster
+from seating_cli import load_masks
+from workspace import copy_out, save_published
+from seat_plan import GROUP_PATTERNS, SEAT_POSITIONS, allocate, max_seats_per_bench, parse_pattern, rooms_from_layout
+from chart_render import HEADER_FILL, write_seating_sheet
 
 class SeatingChartApp:
     def __init__(self, master):
@@ -18,10 +20,14 @@ class SeatingChartApp:
         master.geometry("600x600")
         master.configure(bg="#f0f0f0")
         self.room_details_df = None
+        self.blocked_seats_df = None
         self.students_per_bench = None
         self.roll_numbers_lists = []
         self.roll_paths = {}
+        self.roll_columns = {}
         self.roll_files_selected = {}
+        self.roll_groups = ["Left", "Middle", "Right"]
+        self.seat_plan = None
         self.generated_file_path = None
 
         # Set up color scheme
@@ -54,9 +60,12 @@ class SeatingChartApp:
         lbl_roll = tk.Label(frame_input, text="Roll Numbers Files:",
                             font=("Helvetica", 12, "bold"), bg=self.frame_bg)
         lbl_roll.pack(anchor="w", pady=(10, 0), padx=10)
-        for pos in ["Left", "Middle", "Right"]:
+        self.frame_rolls = tk.Frame(frame_input, bg=self.frame_bg)
+        self.frame_rolls.pack(fill="x")
+        for pos in self.roll_groups:
             self.roll_files_selected[pos] = False
-            self.create_button(frame_input, f"🧾 Upload {pos} Roll Numbers", lambda p=pos: self.load_roll_file(p))
+            self.create_button(self.frame_rolls, f"🧾 Upload {pos} Roll Numbers", lambda p=pos: self.load_roll_file(p))
+        self.create_button(frame_input, "➕ Add Roll Number Group", self.add_roll_group)
 
         # Actions frame (card style)
         frame_actions = tk.Frame(master, bg=self.frame_bg, bd=2, relief=tk.RIDGE)
@@ -66,6 +75,16 @@ class SeatingChartApp:
                                   font=("Helvetica", 16, "bold"))
         actions_header.pack(fill="x")
 
+        # How roll number groups are interleaved on the benches
+        frame_pattern = tk.Frame(frame_actions, bg=self.frame_bg)
+        frame_pattern.pack(pady=(5, 0))
+        tk.Label(frame_pattern, text="Group Pattern:", font=("Helvetica", 12, "bold"),
+                 bg=self.frame_bg).pack(side="left", padx=5)
+        self.pattern_var = tk.StringVar(value=GROUP_PATTERNS[0])
+        pattern_box = ttk.Combobox(frame_pattern, textvariable=self.pattern_var, values=GROUP_PATTERNS, width=20)
+        pattern_box.pack(side="left", padx=5)
+        pattern_box.bind("<<ComboboxSelected>>", lambda e: self.update_generate_state())
+
         # Generate, Save, Open buttons
         self.generate_button = self.create_button(frame_actions, "✅ Generate Seating & Attendance",
                                                  self.generate_chart, active=False)
@@ -115,11 +134,16 @@ class SeatingChartApp:
             if not all(col in df.columns for col in required):
                 messagebox.showerror("Error", "Room layout file is missing required columns.")
                 return
+            masks = load_masks(filepath)
+            rooms_from_layout(df, masks=masks)  # rejects blocked seats the layout does not have
             self.room_details_df = df
-            self.students_per_bench = int(df['Number of Student per Bench'].iloc[0])
+            self.blocked_seats_df = masks
+            self.students_per_bench = max_seats_per_bench(df)
             self.status_label.config(text="Room layout loaded. Upload roll number files.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read room layout: {e}")
+            return
+        self.update_generate_state()
 
     def load_roll_file(self, position):
         filepath = filedialog.askopenfilename(title=f"Select {position} Roll Numbers File",
@@ -127,183 +151,74 @@ class SeatingChartApp:
         if not filepath:
             return
         try:
-            df = pd.read_excel(filepath)
-            if 'Roll Number' not in df.columns:
+            try:
+                roster = read_roster(filepath)
+            except RosterFormatError:
                 messagebox.showerror("Error", f"'{position}' file missing 'Roll Number' column.")
                 return
-            self.roll_paths[position] = df['Roll Number'].dropna().tolist()
+            self.roll_paths[position] = roster.rolls()
+            self.roll_columns[position] = roster.column()
             self.roll_files_selected[position] = True
             self.status_label.config(text=f"{position} roll numbers loaded.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read {position} roll numbers: {e}")
 
+        self.update_generate_state(check=True)
+
+    def add_roll_group(self):
+        """Another roll number list, for patterns that interleave more groups than seats per bench."""
+        name = f"Group {len(self.roll_groups) + 1}"
+        self.roll_groups.append(name)
+        self.roll_files_selected[name] = False
+        self.create_button(self.frame_rolls, f"🧾 Upload {name} Roll Numbers", lambda: self.load_roll_file(name))
+        if self.pattern_var.get() == "positions":
+            self.pattern_var.set("cycle")
+        self.update_generate_state()
+
+    def selected_groups(self):
+        """Roll number lists to seat: one per seat position, or every loaded group with other patterns."""
+        if self.pattern_var.get().strip() == "positions":
+            return self.roll_groups[:self.students_per_bench or 0]
+        return [g for g in self.roll_groups if self.roll_files_selected.get(g)]
+
+    def update_generate_state(self, check=False):
         # Enable generate button if all necessary roll files are loaded
-        if self.students_per_bench:
-            needed = ["Left", "Middle", "Right"][:self.students_per_bench]
-        else:
-            needed = []
-        if all(self.roll_files_selected.get(pos, False) for pos in needed):
-            # Order lists by seat position
-            self.roll_numbers_lists = [self.roll_paths[pos] for pos in ["Left", "Middle", "Right"][:self.students_per_bench]]
+        needed = self.selected_groups()
+        if needed and all(self.roll_files_selected.get(pos, False) for pos in needed):
+            self.roll_numbers_lists = [self.roll_paths[pos] for pos in needed]
+            if check:
+                self.check_rolls(needed)
             self.generate_button.config(state=tk.NORMAL)
             self.generate_button.config(bg=self.button_bg)  # Ensure button shows active color
+        else:
+            self.generate_button.config(state=tk.DISABLED)
+
+    def check_rolls(self, positions):
+        """Warn about duplicate, overlapping, blank or malformed roll numbers before generating."""
+        report = check_rosters({pos: self.roll_columns[pos] for pos in positions})
+        if not report.ok:
+            messagebox.showwarning("Roll Number Check", report.summary())
 
     def generate_chart(self):
         try:
+            rooms = rooms_from_layout(self.room_details_df, masks=self.blocked_seats_df)
+            self.seat_plan = allocate(rooms, self.roll_numbers_lists, pattern=parse_pattern(self.pattern_var.get()))
             wb = openpyxl.Workbook()
-            for idx, row in self.room_details_df.iterrows():
-                room_number = row['Room Number']
-                benches = int(row['Number of Bench'])
-                rows = int(row['Number of Rows'])
-                ws = wb.create_sheet(title=f"Room {room_number}")
-
-                # Merge title across columns and center
-                total_cols = benches * (self.students_per_bench + 1)
-                merge_end = openpyxl.utils.get_column_letter(total_cols)
-                ws.merge_cells(f"A1:{merge_end}1")
-                ws['A1'] = f"ROOM {room_number}"
-                ws['A1'].font = Font(size=16, bold=True, color="FFFFFF")
-                ws['A1'].fill = PatternFill(start_color="3f51b5", end_color="3f51b5", fill_type="solid")
-                ws['A1'].alignment = Alignment(horizontal='center')
-                ws.append([''])  # blank row
-
-                # Seat position names (Left, Middle, Right) if provided
-                left_name = row.get('Left Name', '')
-                middle_name = row.get('Middle Name', '')
-                right_name = row.get('Right Name', '')
-                col_name = 1
-                for b in range(benches):
-                    if self.students_per_bench >= 1:
-                        cell = ws.cell(row=2, column=col_name, value=left_name)
-                        cell.alignment = Alignment(horizontal='center')
-                        cell.font = Font(bold=True)
-                    if self.students_per_bench >= 2:
-                        cell = ws.cell(row=2, column=col_name+1, value=middle_name)
-                        cell.alignment = Alignment(horizontal='center')
-                        cell.font = Font(bold=True)
-                    if self.students_per_bench >= 3:
-                        cell = ws.cell(row=2, column=col_name+2, value=right_name)
-                        cell.alignment = Alignment(horizontal='center')
-                        cell.font = Font(bold=True)
-                    if b < benches - 1:
-                        col_name += self.students_per_bench + 1
-                    else:
-                        col_name += self.students_per_bench
-
-                # Row headers (Row 1, Row 2, ...)
-                col = 1
-                for b in range(benches):
-                    ws.merge_cells(start_row=3, start_column=col,
-                                   end_row=3, end_column=col + self.students_per_bench - 1)
-                    cell = ws.cell(row=3, column=col, value=f"Row {b+1}")
-                    cell.font = Font(bold=True, color="FFFFFF")
-                    cell.fill = PatternFill(start_color="7e57c2", end_color="7e57c2", fill_type="solid")
-                    cell.alignment = Alignment(horizontal='center')
-                    if b < benches - 1:
-                        col += self.students_per_bench + 1
-                    else:
-                        col += self.students_per_bench
-
-                # Seat labels (F-1, S-1, T-1)
-                seat_label_row = 4
-                col = 1
-                for b in range(benches):
-                    for p in range(self.students_per_bench):
-                        cell = ws.cell(row=seat_label_row, column=col + p, value=SEAT_POSITIONS[p])
-                        cell.font = Font(bold=True, color="FFFFFF")
-                        cell.fill = HEADER_FILL
-                        cell.alignment = Alignment(horizontal='center')
-                        cell.border = BORDER
-                    if b < benches - 1:
-                        col += self.students_per_bench + 1
-                    else:
-                        col += self.students_per_bench
-
-                # Fill student roll numbers vertically under each seat column
-                data_start_row = 5
-                indices = [0] * self.students_per_bench
-                col = 1
-                for b in range(benches):
-                    for p in range(self.students_per_bench):
-                        for r in range(rows):
-                            data_list = self.roll_numbers_lists[p]
-                            idx_val = indices[p]
-                            value = data_list[idx_val] if idx_val < len(data_list) else ""
-                            cell = ws.cell(row=data_start_row + r, column=col + p, value=value)
-                            cell.alignment = Alignment(horizontal='center')
-                            cell.border = BORDER
-                            # Alternate row shading
-                            if (r + b) % 2 == 0:
-                                cell.fill = PatternFill(start_color="e0f7fa", end_color="e0f7fa", fill_type="solid")
-                            else:
-                                cell.fill = PatternFill(start_color="ffffff", end_color="ffffff", fill_type="solid")
-                            indices[p] += 1
-                    if b < benches - 1:
-                        col += self.students_per_bench + 1
-                    else:
-                        col += self.students_per_bench
+            for idx, room in enumerate(rooms):
+                ws = wb.create_sheet(title=f"Room {room.number}")
+                write_seating_sheet(ws, self.seat_plan, idx)
 
                 # Update progress bar
-                self.progress_var.set((idx + 1) / len(self.room_details_df) * 100)
+                self.progress_var.set((idx + 1) / len(rooms) * 100)
                 self.master.update_idletasks()
 
                 # Create Attendance worksheet for this room
-                att_ws = wb.create_sheet(title=f"Attendance - Room {room_number}")
-                blocks = self.students_per_bench
-                total_cols_att = blocks * self.students_per_bench + (blocks - 1)
-                merge_end_att = openpyxl.utils.get_column_letter(total_cols_att)
-                att_ws.merge_cells(f"A1:{merge_end_att}1")
-                att_ws['A1'] = f"Attendance - ROOM {room_number}"
-                att_ws['A1'].font = Font(size=16, bold=True, color="FFFFFF")
-                att_ws['A1'].fill = PatternFill(start_color="3f51b5", end_color="3f51b5", fill_type="solid")
-                att_ws['A1'].alignment = Alignment(horizontal='center')
-
-                # Section headers (F-1, S-1, T-1)
-                section_row = 2
-                col_att = 1
-                for p, label in enumerate(SEAT_POSITIONS[:self.students_per_bench]):
-                    att_ws.merge_cells(start_row=section_row, start_column=col_att,
-                                       end_row=section_row, end_column=col_att + self.students_per_bench - 1)
-                    cell = att_ws.cell(row=section_row, column=col_att, value=label)
-                    cell.font = Font(bold=True, color="FFFFFF")
-                    cell.fill = PatternFill(start_color="7e57c2", end_color="7e57c2", fill_type="solid")
-                    cell.alignment = Alignment(horizontal='center')
-                    col_att += self.students_per_bench + 1
-
-                # Attendance table headers
-                header_row = 3
-                col_att = 1
-                for p in range(self.students_per_bench):
-                    headers = ["Serial Number", "Student Roll Number", "Signature"]
-                    cell = att_ws.cell(row=header_row, column=col_att, value=headers[0])
-                    cell.font = Font(bold=True)
-                    cell.fill = HEADER_FILL
-                    cell.alignment = Alignment(horizontal='center')
-                    att_ws.cell(row=header_row, column=col_att+1, value=headers[1]).font = Font(bold=True)
-                    att_ws.cell(row=header_row, column=col_att+1).fill = HEADER_FILL
-                    att_ws.cell(row=header_row, column=col_att+1).alignment = Alignment(horizontal='center')
-                    att_ws.cell(row=header_row, column=col_att+2, value=headers[2]).font = Font(bold=True)
-                    att_ws.cell(row=header_row, column=col_att+2).fill = HEADER_FILL
-                    att_ws.cell(row=header_row, column=col_att+2).alignment = Alignment(horizontal='center')
-                    col_att += self.students_per_bench + 1
-
-                # Fill attendance data (only students actually seated)
-                start_data_row = 4
-                col_att = 1
-                for p in range(self.students_per_bench):
-                    total_seats = benches * rows
-                    rolls = self.roll_numbers_lists[p]
-                    count = min(len(rolls), total_seats)
-                    for j in range(count):
-                        att_ws.cell(row=start_data_row+j, column=col_att, value=j+1).alignment = Alignment(horizontal='center')
-                        att_ws.cell(row=start_data_row+j, column=col_att+1, value=rolls[j]).alignment = Alignment(horizontal='center')
-                        att_ws.cell(row=start_data_row+j, column=col_att+2, value="").alignment = Alignment(horizontal='center')
-                    col_att += self.students_per_bench + 1
+                att_ws = wb.create_sheet(title=f"Attendance - Room {room.number}")
+                self.write_attendance(att_ws, idx)
 
             # Remove default sheet and save output
             del wb['Sheet']
-            output_path = os.path.join(os.getcwd(), "SeatingChart_Output.xlsx")
-            wb.save(output_path)
+            output_path = save_published(wb.save, "SeatingChart_Output.xlsx")
             self.generated_file_path = output_path
             self.download_button.config(state=tk.NORMAL)
             self.open_button.config(state=tk.NORMAL)
@@ -311,14 +226,58 @@ class SeatingChartApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate charts: {e}")
 
+    def write_attendance(self, att_ws, room_index):
+        """Attendance blocks side by side, one per seat position, from the seat plan."""
+        room = self.seat_plan.rooms[room_index]
+        blocks = room.seats_per_bench
+        total_cols_att = blocks * room.seats_per_bench + (blocks - 1)
+        merge_end_att = openpyxl.utils.get_column_letter(total_cols_att)
+        att_ws.merge_cells(f"A1:{merge_end_att}1")
+        att_ws['A1'] = f"Attendance - ROOM {room.number}"
+        att_ws['A1'].font = Font(size=16, bold=True, color="FFFFFF")
+        att_ws['A1'].fill = PatternFill(start_color="3f51b5", end_color="3f51b5", fill_type="solid")
+        att_ws['A1'].alignment = Alignment(horizontal='center')
+
+        # Section headers (F-1, S-1, T-1)
+        section_row = 2
+        col_att = 1
+        for p, label in enumerate(SEAT_POSITIONS[:room.seats_per_bench]):
+            att_ws.merge_cells(start_row=section_row, start_column=col_att,
+                               end_row=section_row, end_column=col_att + room.seats_per_bench - 1)
+            cell = att_ws.cell(row=section_row, column=col_att, value=label)
+            cell.font = Font(bold=True, color="FFFFFF")
+            cell.fill = PatternFill(start_color="7e57c2", end_color="7e57c2", fill_type="solid")
+            cell.alignment = Alignment(horizontal='center')
+            col_att += room.seats_per_bench + 1
+
+        # Attendance table headers
+        header_row = 3
+        col_att = 1
+        headers = ["Serial Number", "Student Roll Number", "Signature"]
+        for p in range(room.seats_per_bench):
+            for offset, header in enumerate(headers):
+                cell = att_ws.cell(row=header_row, column=col_att + offset, value=header)
+                cell.font = Font(bold=True)
+                cell.fill = HEADER_FILL
+                cell.alignment = Alignment(horizontal='center')
+            col_att += room.seats_per_bench + 1
+
+        # Fill attendance data (only students actually seated)
+        start_data_row = 4
+        col_att = 1
+        for p in range(room.seats_per_bench):
+            for j, roll in enumerate(self.seat_plan.seated(room_index, p)):
+                att_ws.cell(row=start_data_row+j, column=col_att, value=j+1).alignment = Alignment(horizontal='center')
+                att_ws.cell(row=start_data_row+j, column=col_att+1, value=roll).alignment = Alignment(horizontal='center')
+                att_ws.cell(row=start_data_row+j, column=col_att+2, value="").alignment = Alignment(horizontal='center')
+            col_att += room.seats_per_bench + 1
+
     def download_file(self):
         if self.generated_file_path:
             save_path = filedialog.asksaveasfilename(title="Save As", defaultextension=".xlsx",
                                                      filetypes=[("Excel Files", "*.xlsx")])
             if save_path:
-                with open(self.generated_file_path, 'rb') as src:
-                    with open(save_path, 'wb') as dst:
-                        dst.write(src.read())
+                copy_out(self.generated_file_path, save_path)
                 messagebox.showinfo("Saved", f"File saved to:\n{save_path}")
 
     def open_file(self):
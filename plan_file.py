@@ -0,0 +1,192 @@
+"""Compact binary sidecar of a SeatPlan, written next to the generated workbook.
+
+    SeatingChart_Output.xlsx
+    SeatingChart_Output.seatplan
+
+Reopening a plan from the workbook means parsing every styled cell again;
+the sidecar holds the plan itself. Layout, all little-endian:
+
+    8 bytes   magic b"SEATPLAN"
+    4 bytes   format version (uint32)
+    4 bytes   header length n (uint32)
+    n bytes   JSON header: rooms (with their packed seat masks), strategy, seed, group pattern, fingerprint
+              of the inputs (checkpoint.fingerprint), digests of the input
+              files, and the dtype, shape and offset of every array
+    arrays    seats of all rooms (int32), roster offsets (int64) and one
+              array per roster, each starting on a 64-byte boundary
+
+load_plan() maps the file and wraps the arrays with np.frombuffer, so only
+the header is parsed; seats and roll numbers are paged in as they are read.
+
+    python plan_file.py SeatingChart_Output.seatplan
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from checkpoint import fingerprint
+from seat_plan import Room, SeatPlan
+
+MAGIC = b"SEATPLAN"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<8sII")
+ALIGN = 64
+SUFFIX = ".seatplan"
+
+
+class PlanFileError(ValueError):
+    pass
+
+
+def sidecar_path(workbook_path):
+    """Where the sidecar of the workbook requested at workbook_path goes."""
+    return os.path.splitext(workbook_path)[0] + SUFFIX
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _aligned(position):
+    return -(-position // ALIGN) * ALIGN
+
+
+def _roster_array(roster):
+    """Numbers stay numbers (Excel wrote them as such); anything else is stored as text."""
+    values = np.asarray(roster)
+    if values.dtype.kind in "iuf":
+        return values.astype(values.dtype.newbyteorder("<"))
+    return values.astype(str)
+
+
+def save_plan(plan, path, inputs=()):
+    """Write plan to path; inputs are the layout and roll number files it came from."""
+    arrays = {
+        "seats": np.concatenate([s.ravel() for s in plan.seats]).astype("<i4") if plan.seats
+        else np.empty(0, "<i4"),
+        "offsets": np.asarray(plan.offsets, dtype="<i8"),
+    }
+    for p, roster in enumerate(plan.rosters):
+        arrays[f"roster{p}"] = _roster_array(roster)
+
+    header = {
+        "rooms": [{"number": str(room.number), "benches": room.benches, "rows": room.rows,
+                   "seats_per_bench": room.seats_per_bench, "names": [str(n) for n in room.names],
+                   "mask": base64.b64encode(room.mask).decode(),
+                   "reserved": base64.b64encode(room.reserved).decode()}
+                  for room in plan.rooms],
+        "strategy": plan.strategy,
+        "seed": int(plan.seed),
+        "pattern": plan.pattern,
+        "fingerprint": fingerprint(plan.rooms, plan.rosters, plan.strategy, plan.seed, plan.pattern),
+        "inputs": {os.path.basename(p): file_digest(p) for p in inputs},
+        "arrays": {},
+    }
+    entries = {name: {"dtype": a.dtype.str, "shape": list(a.shape), "offset": 0} for name, a in arrays.items()}
+    header["arrays"] = entries
+    # The arrays start after the header, whose length depends on their offsets:
+    # grow the reserved header space until it fits.
+    first = 0
+    while True:
+        position = first
+        for name, a in arrays.items():
+            entries[name]["offset"] = position
+            position = _aligned(position + a.nbytes)
+        encoded = json.dumps(header).encode()
+        needed = _aligned(PREAMBLE.size + len(encoded))
+        if needed <= first:
+            break
+        first = needed
+    encoded = encoded.ljust(first - PREAMBLE.size)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        f.write(encoded)
+        for name, a in arrays.items():
+            f.seek(entries[name]["offset"])
+            f.write(np.ascontiguousarray(a).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise PlanFileError(f"{path}: not a seat plan file")
+        magic, version, length = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise PlanFileError(f"{path}: not a seat plan file")
+        if version != FORMAT_VERSION:
+            raise PlanFileError(f"{path}: seat plan format {version}, this version reads {FORMAT_VERSION}")
+        encoded = f.read(length)
+    try:
+        if len(encoded) < length:
+            raise ValueError
+        return json.loads(encoded)
+    except ValueError:
+        raise PlanFileError(f"{path}: truncated seat plan file") from None
+
+
+def load_plan(path):
+    """SeatPlan backed by a read-only memory map of path."""
+    header = read_header(path)
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def array(name):
+        entry = header["arrays"][name]
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        if entry["offset"] + count * dtype.itemsize > len(mapped):
+            raise PlanFileError(f"{path}: truncated seat plan file")
+        return np.frombuffer(mapped, dtype=dtype, count=count, offset=entry["offset"]).reshape(entry["shape"])
+
+    rooms = [Room(number=r["number"], benches=r["benches"], rows=r["rows"],
+                  seats_per_bench=r["seats_per_bench"], names=tuple(r["names"]),
+                  mask=base64.b64decode(r.get("mask", "")), reserved=base64.b64decode(r.get("reserved", "")))
+             for r in header["rooms"]]
+    flat = array("seats")
+    seats = []
+    start = 0
+    for room in rooms:
+        size = room.seats_per_bench * room.capacity
+        seats.append(flat[start:start + size].reshape(room.seats_per_bench, room.capacity))
+        start += size
+    offsets = array("offsets")
+    rosters = [array(f"roster{p}") for p in range(len(offsets) - 1)]
+    return SeatPlan(rooms=rooms, rosters=rosters, seats=seats, offsets=offsets,
+                    strategy=header["strategy"], seed=header["seed"], pattern=header.get("pattern", "positions"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show what a seat plan file holds")
+    parser.add_argument("plan", help="seat plan file, e.g. SeatingChart_Output.seatplan")
+    args = parser.parse_args(argv)
+    try:
+        header = read_header(args.plan)
+        plan = load_plan(args.plan)
+    except PlanFileError as e:
+        raise SystemExit(str(e))
+    print(f"{len(plan.rooms)} rooms, {plan.seated_count} of {plan.total_students} students seated "
+          f"({plan.strategy}, seed {plan.seed})")
+    print(f"Fingerprint: {header['fingerprint']}")
+    for name, digest in header["inputs"].items():
+        print(f"  {name}: {digest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""In-app preview of a SeatPlan: any room's seat grid and attendance list.
+
+Both views are VirtualGrids: a Canvas whose scroll region has the size of
+the whole table but which only holds items for the cells currently in view.
+Scrolling or resizing redraws that window from the plan, so a room with
+thousands of seats costs the same to show as a small one, and nothing is
+written to disk.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from seat_plan import BLOCKED_LABEL, RESERVED_LABEL, SEAT_POSITIONS
+
+ROW_BG = "#7e57c2"
+HEADER_BG = "#D1C4E9"
+SHADE_BG = "#e0f7fa"
+PLAIN_BG = "#ffffff"
+GAP_BG = "#f5f5f5"
+MASKED_BG = "#bdbdbd"
+
+
+class VirtualGrid(tk.Frame):
+    """Scrollable table that draws only its visible cells.
+
+    cell(row, col) returns (text, background, bold) or None for a blank cell;
+    col_widths gives each column's width in pixels.
+    """
+
+    def __init__(self, master, row_height=24, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.rows = 0
+        self.col_widths = []
+        self.col_starts = [0]
+        self.cell = lambda row, col: None
+        self.canvas = tk.Canvas(self, bg=GAP_BG, highlightthickness=0)
+        xbar = ttk.Scrollbar(self, orient="horizontal", command=self._xview)
+        ybar = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.canvas.configure(xscrollcommand=xbar.set, yscrollcommand=ybar.set)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        ybar.grid(row=0, column=1, sticky="ns")
+        xbar.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        for sequence, step in [("<MouseWheel>", None), ("<Button-4>", -3), ("<Button-5>", 3)]:
+            self.canvas.bind(sequence, lambda e, s=step: self._wheel(e, s))
+
+    def set_table(self, rows, col_widths, cell):
+        self.rows = rows
+        self.col_widths = list(col_widths)
+        self.col_starts = [0]
+        for w in self.col_widths:
+            self.col_starts.append(self.col_starts[-1] + w)
+        self.cell = cell
+        self.canvas.configure(scrollregion=(0, 0, self.col_starts[-1], rows * self.row_height))
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self.redraw()
+
+    def _xview(self, *args):
+        self.canvas.xview(*args)
+        self.redraw()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.redraw()
+
+    def _wheel(self, event, step):
+        if step is None:
+            step = -1 if event.delta > 0 else 1
+            step *= 3
+        self.canvas.yview_scroll(step, "units")
+        self.redraw()
+
+    def _first_col(self, x):
+        lo, hi = 0, len(self.col_widths)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.col_starts[mid + 1] <= x:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete("cell")
+        if not self.rows or not self.col_widths:
+            return
+        x0, y0 = canvas.canvasx(0), canvas.canvasy(0)
+        x1, y1 = x0 + canvas.winfo_width(), y0 + canvas.winfo_height()
+        first_row = max(0, int(y0 // self.row_height))
+        last_row = min(self.rows, int(y1 // self.row_height) + 1)
+        first_col = self._first_col(x0)
+        h = self.row_height
+        for row in range(first_row, last_row):
+            col = first_col
+            while col < len(self.col_widths) and self.col_starts[col] < x1:
+                value = self.cell(row, col)
+                if value is not None:
+                    text, bg, bold = value
+                    left, top = self.col_starts[col], row * h
+                    canvas.create_rectangle(left, top, left + self.col_widths[col], top + h,
+                                            fill=bg, outline="#999999", tags="cell")
+                    if text:
+                        canvas.create_text(left + self.col_widths[col] / 2, top + h / 2, text=text,
+                                           font=("Helvetica", 10, "bold" if bold else "normal"), tags="cell")
+                col += 1
+
+
+class PlanPreview(tk.Toplevel):
+    """Window with a room picker and the room's seating grid and attendance list."""
+
+    def __init__(self, master, plan, cell_width=120):
+        super().__init__(master)
+        self.title("Seating Preview")
+        self.geometry("900x600")
+        self.plan = plan
+        self.cell_width = cell_width
+
+        top = tk.Frame(self)
+        top.pack(fill="x", padx=10, pady=5)
+        tk.Label(top, text="Room:", font=("Helvetica", 12, "bold")).pack(side="left")
+        self.room_names = [str(room.number) for room in plan.rooms]
+        self.room_var = tk.StringVar(value=self.room_names[0] if self.room_names else "")
+        picker = ttk.Combobox(top, textvariable=self.room_var, values=self.room_names, state="readonly", width=12)
+        picker.pack(side="left", padx=5)
+        picker.bind("<<ComboboxSelected>>", lambda e: self.show_room(self.room_names.index(self.room_var.get())))
+        self.summary_label = tk.Label(top, text="", font=("Helvetica", 10))
+        self.summary_label.pack(side="left", padx=10)
+
+        tabs = ttk.Notebook(self)
+        tabs.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.seating_grid = VirtualGrid(tabs)
+        self.attendance_grid = VirtualGrid(tabs)
+        tabs.add(self.seating_grid, text="Seating")
+        tabs.add(self.attendance_grid, text="Attendance")
+        if self.room_names:
+            self.show_room(0)
+
+    def show_room(self, room_index):
+        plan = self.plan
+        room = plan.rooms[room_index]
+        width = room.seats_per_bench
+        labels = plan.seat_labels(room_index)
+        span = width + 1  # seats of one bench and a gap column
+
+        def seating_cell(row, col):
+            b, p = divmod(col, span)
+            if p == width:
+                return None
+            if row == 0:
+                return (f"Row {b + 1}" if p == 0 else "", ROW_BG, True)
+            if row == 1:
+                return (SEAT_POSITIONS[p], HEADER_BG, True)
+            r = row - 2
+            label = labels[p, b, r]
+            if label in (BLOCKED_LABEL, RESERVED_LABEL):
+                return (label, MASKED_BG, False)
+            return (label, SHADE_BG if (r + b) % 2 == 0 else PLAIN_BG, False)
+
+        col_widths = [self.cell_width if c % span != width else 12 for c in range(room.benches * span)]
+        self.seating_grid.set_table(room.rows + 2, col_widths, seating_cell)
+
+        attendance = plan.attendance(room_index)
+        sections = len(attendance)
+        starts = [0]
+        for _, rolls in attendance:
+            starts.append(starts[-1] + len(rolls))
+        headers = [plan.section_heading, "Serial Number", "Roll Number", "Signature"]
+
+        def attendance_cell(row, col):
+            if row == 0:
+                return (headers[col], HEADER_BG, True)
+            k = row - 1
+            p = next(p for p in range(sections) if k < starts[p + 1])
+            i = k - starts[p]
+            return ((attendance[p][0], i + 1, attendance[p][1][i], "")[col], PLAIN_BG, False)
+
+        self.attendance_grid.set_table(starts[-1] + 1, [110, 110, 160, 200], attendance_cell)
+        seated = starts[-1]
+        self.summary_label.config(text=f"{room.benches} benches x {room.rows} rows x {width} seats, "
+                                       f"{seated} of {room.usable_seats} usable seats taken")
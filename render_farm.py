@@ -0,0 +1,271 @@
+"""Render the rooms of one run on several machines.
+
+The coordinator allocates once, keeps its progress in a checkpoint run
+directory (checkpoint.CheckpointedRun) and hands out batches of room
+indices over TCP. A worker receives the plan as a .seatplan file
+(plan_file), renders each room of its batch to a write-only part and sends
+the part back; the coordinator stores it under the run directory and, when
+every room has a part, assembles the workbook exactly as a checkpointed run
+does. Rooms a worker was given but never returned, because it died, hung
+for longer than the lease timeout or lost its connection, go back to the
+queue for the next worker that asks.
+
+    python seating_cli.py layout.xlsx L.xlsx M.xlsx R.xlsx --farm 0.0.0.0:5750 --local-workers 4
+    python render_farm.py coordinator-host:5750 --token <token printed by the coordinator>
+
+Messages are a struct header (JSON length, payload length), a JSON object
+and an optional binary payload. Workers authenticate with a shared token.
+"""
+
+import argparse
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+from chart_render import stream_workbook
+from plan_file import load_plan, save_plan
+
+HEADER = struct.Struct("<II")
+DEFAULT_PORT = 5750
+DEFAULT_BATCH = 4
+LEASE_TIMEOUT = 300
+IDLE_TIMEOUT = 300
+
+
+class FarmError(RuntimeError):
+    pass
+
+
+def parse_address(text, default_host="127.0.0.1"):
+    host, _, port = text.rpartition(":")
+    return host or default_host, int(port) if port else DEFAULT_PORT
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock, message, payload=b""):
+    body = json.dumps(message).encode()
+    sock.sendall(HEADER.pack(len(body), len(payload)) + body + payload)
+
+
+def recv_message(sock):
+    """(message, payload) of the next message on sock."""
+    length, size = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+    return json.loads(_recv_exactly(sock, length)), _recv_exactly(sock, size)
+
+
+class RoomQueue:
+    """Rooms still to render, and which connection holds which of them."""
+
+    def __init__(self, rooms, done=()):
+        self.done = set(done)
+        self.pending = deque(i for i in rooms if i not in self.done)
+        self.total = len(self.pending) + len(self.done)
+        self.leases = {}
+        self.connected = 0
+        self.changed = threading.Condition()
+
+    @property
+    def finished(self):
+        return len(self.done) == self.total
+
+    def take(self, worker, count):
+        """Up to count rooms for worker; waits while other workers hold the rest, [] when all are done."""
+        with self.changed:
+            while not self.pending and not self.finished:
+                self.changed.wait(1)
+            batch = [self.pending.popleft() for _ in range(min(count, len(self.pending)))]
+            self.leases.setdefault(worker, set()).update(batch)
+            return batch
+
+    def complete(self, worker, room):
+        with self.changed:
+            self.leases.get(worker, set()).discard(room)
+            self.done.add(room)
+            self.changed.notify_all()
+
+    def release(self, worker):
+        """Requeue whatever worker held but did not return; returns those rooms."""
+        with self.changed:
+            lost = sorted(self.leases.pop(worker, set()) - self.done)
+            self.pending.extendleft(reversed(lost))
+            self.changed.notify_all()
+            return lost
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        farm = self.server.farm
+        queue = farm.queue
+        worker = f"{self.client_address[0]}:{self.client_address[1]}"
+        self.request.settimeout(farm.lease_timeout)
+        with queue.changed:
+            queue.connected += 1
+        try:
+            message, _ = recv_message(self.request)
+            if not hmac.compare_digest(str(message.get("token", "")), farm.token):
+                send_message(self.request, {"type": "refused"})
+                return
+            send_message(self.request, {"type": "plan"}, farm.plan_bytes)
+            while True:
+                batch = queue.take(worker, farm.batch_size)
+                if not batch:
+                    send_message(self.request, {"type": "done"})
+                    return
+                send_message(self.request, {"type": "batch", "rooms": batch})
+                for _ in batch:
+                    message, payload = recv_message(self.request)
+                    room = int(message["room"])
+                    farm.store_part(room, payload)
+                    queue.complete(worker, room)
+                    farm.progress()
+        except (OSError, ConnectionError, ValueError, KeyError):
+            pass
+        finally:
+            lost = queue.release(worker)
+            if lost:
+                farm.log(f"Worker {worker} dropped out; requeued rooms {', '.join(map(str, lost))}")
+            with queue.changed:
+                queue.connected -= 1
+                queue.changed.notify_all()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Farm:
+    """Coordinator side of one distributed run over a CheckpointedRun."""
+
+    def __init__(self, run, address, token=None, batch_size=DEFAULT_BATCH, lease_timeout=LEASE_TIMEOUT,
+                 on_room=None, log=print):
+        self.run = run
+        self.address = address
+        self.token = token or secrets.token_hex(16)
+        self.batch_size = batch_size
+        self.lease_timeout = lease_timeout
+        self.on_room = on_room
+        self.log = log
+        self.plan = run.plan()
+        plan_path = os.path.join(run.run_dir, "plan.seatplan")
+        save_plan(self.plan, plan_path)
+        with open(plan_path, "rb") as f:
+            self.plan_bytes = f.read()
+        self.queue = RoomQueue(range(len(run.rooms)), run.completed())
+
+    def store_part(self, room, payload):
+        path = self.run.part_path(room)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def progress(self):
+        if self.on_room:
+            self.on_room(len(self.queue.done), self.queue.total)
+
+    def start_local_workers(self, count, port):
+        return [subprocess.Popen([sys.executable, os.path.abspath(__file__), f"127.0.0.1:{port}"],
+                                 env=dict(os.environ, SEATING_FARM_TOKEN=self.token))
+                for _ in range(count)]
+
+    def serve(self, output_path, local_workers=0, index=False, idle_timeout=IDLE_TIMEOUT):
+        """Hand out every room without a part, then assemble output_path; returns the plan."""
+        queue = self.queue
+        if queue.finished:
+            self.run.finish(self.plan, output_path, index)
+            return self.plan
+        server = _Server(self.address, _Handler)
+        server.farm = self
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.log(f"Coordinating {queue.total - len(queue.done)} rooms on {host}:{port}; start workers with:\n"
+                 f"  python {os.path.basename(__file__)} {socket.gethostname()}:{port} --token {self.token}")
+        workers = self.start_local_workers(local_workers, port)
+        idle_since = None
+        try:
+            with queue.changed:
+                while not queue.finished:
+                    queue.changed.wait(1)
+                    running = any(w.poll() is None for w in workers)
+                    if queue.connected or running:
+                        idle_since = None
+                    elif idle_since is None:
+                        idle_since = time.monotonic()
+                    elif time.monotonic() - idle_since > idle_timeout:
+                        raise FarmError(f"No workers for {idle_timeout}s with {queue.total - len(queue.done)} "
+                                        f"rooms left; rerun to resume from {self.run.run_dir}")
+        finally:
+            server.shutdown()
+            server.server_close()
+            for w in workers:
+                if w.poll() is None:
+                    w.terminate()
+                w.wait()
+        self.run.finish(self.plan, output_path, index)
+        return self.plan
+
+
+def work(address, token):
+    """Worker loop: render the batches the coordinator at address hands out until it is done."""
+    with socket.create_connection(address) as sock, tempfile.TemporaryDirectory() as workdir:
+        send_message(sock, {"type": "hello", "token": token})
+        message, payload = recv_message(sock)
+        if message["type"] != "plan":
+            raise FarmError(f"Coordinator {address[0]}:{address[1]} refused the token")
+        plan_path = os.path.join(workdir, "plan.seatplan")
+        with open(plan_path, "wb") as f:
+            f.write(payload)
+        plan = load_plan(plan_path)
+        rendered = 0
+        while True:
+            message, _ = recv_message(sock)
+            if message["type"] != "batch":
+                return rendered
+            for room in message["rooms"]:
+                part_path = os.path.join(workdir, f"{room:05d}.xlsx")
+                stream_workbook(plan, part_path, [room])
+                with open(part_path, "rb") as f:
+                    send_message(sock, {"type": "part", "room": room}, f.read())
+                os.remove(part_path)
+                rendered += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render rooms for a coordinator (seating_cli.py --farm)")
+    parser.add_argument("coordinator", help="host:port the coordinator listens on")
+    parser.add_argument("--token", default=os.environ.get("SEATING_FARM_TOKEN"),
+                        help="token the coordinator printed; defaults to $SEATING_FARM_TOKEN")
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("--token is required")
+    try:
+        rendered = work(parse_address(args.coordinator), args.token)
+    except (OSError, ConnectionError, FarmError) as e:
+        raise SystemExit(f"Worker stopped: {e}")
+    print(f"Rendered {rendered} rooms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
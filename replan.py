@@ -0,0 +1,221 @@
+"""Re-plan a published seating after late roster changes, moving as few students as possible.
+
+allocate() seats students by their place in the roll number lists, so one
+withdrawal early in a list shifts everybody after it. replan() starts from
+the previous plan instead:
+
+    kept       students still on the same list keep their seat
+    withdrawn  students no longer on any list free their seat
+    moved      students now on another list (e.g. Left -> Right) change seat
+    added      new students, and students that had no seat before, take the
+               free seats in fill order, room by room
+    unseated   students that still find no free seat
+
+Matching is by roll number through dicts and the seats are updated with numpy
+index arrays, so a whole-session re-plan takes time linear in the rosters.
+
+The previous plan is the .seatplan published next to the workbook
+(plan_file), so a hand-edited plan or an earlier re-plan is the baseline.
+The new workbook, its plan and the change list are published together as
+a new run (workspace).
+
+    python replan.py outputs/Seating_20250515_122119_4f2a9c/SeatingChart_Output.seatplan --new L2.xlsx M2.xlsx R2.xlsx
+"""
+
+import argparse
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from seat_plan import SEAT_POSITIONS, SeatPlan, room_group_seats
+
+CHANGE_ORDER = ["withdrawn", "moved", "added", "unseated"]
+
+
+@dataclass
+class SeatChange:
+    roll: str
+    change: str
+    old_seat: tuple = None  # (room number, position, bench, row)
+    new_seat: tuple = None
+
+
+def describe_seat(seat):
+    if seat is None:
+        return ""
+    room, p, b, r = seat
+    return f"Room {room} Row {b + 1} {SEAT_POSITIONS[p]} seat {r + 1}"
+
+
+def _seat_index(plan):
+    """(room, position, slot) of every student id in plan; -1 where unseated."""
+    where = np.full((plan.total_students, 3), -1, dtype=np.int64)
+    for i, seats in enumerate(plan.seats):
+        p, slot = np.nonzero(seats >= 0)
+        where[seats[p, slot], 0] = i
+        where[seats[p, slot], 1] = p
+        where[seats[p, slot], 2] = slot
+    return where
+
+
+def _seat(plan, where):
+    i, p, slot = (int(v) for v in where)
+    if i < 0:
+        return None
+    rows = plan.rooms[i].rows
+    return plan.rooms[i].number, p, slot // rows, slot % rows
+
+
+def replan(previous, rosters):
+    """New SeatPlan for rosters over previous.rooms, and the SeatChanges from previous."""
+    rooms = previous.rooms
+    offsets = np.zeros(len(rosters) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(r) for r in rosters])
+
+    # Old student id -> new student id on the same seat position list, or -1
+    old_to_new = np.full(previous.total_students, -1, dtype=np.int64)
+    for p, roster in enumerate(rosters[:len(previous.rosters)]):
+        index = {str(roll): k for k, roll in enumerate(roster)}
+        old = previous.rosters[p]
+        found = np.fromiter((index.get(str(roll), -1) for roll in old), dtype=np.int64, count=len(old))
+        old_to_new[previous.offsets[p]:previous.offsets[p + 1]] = np.where(found >= 0, found + offsets[p], -1)
+
+    seats = []
+    for old in previous.seats:
+        new = np.where(old >= 0, old_to_new[old], -1).astype(np.int32)
+        seats.append(new)
+    # A roll number listed twice in the old roster must not keep two seats.
+    flat = np.concatenate([s.ravel() for s in seats]) if seats else np.empty(0, np.int32)
+    _, first = np.unique(flat, return_index=True)
+    repeated = np.ones(flat.size, dtype=bool)
+    repeated[first] = False
+    repeated &= flat >= 0
+    if repeated.any():
+        flat[repeated] = -1
+        start = 0
+        for k, s in enumerate(seats):
+            seats[k] = flat[start:start + s.size].reshape(s.shape)
+            start += s.size
+
+    seated = np.zeros(int(offsets[-1]), dtype=bool)
+    seated[flat[flat >= 0]] = True
+    waiting = [np.flatnonzero(~seated[offsets[p]:offsets[p + 1]]) + offsets[p] for p in range(len(rosters))]
+    taken = [0] * len(rosters)
+    for i, room in enumerate(rooms):
+        index, bounds = room_group_seats(room, len(rosters), previous.pattern, previous.strategy, previous.seed)
+        room_seats = seats[i].reshape(-1)
+        for p in range(len(rosters)):
+            left = len(waiting[p]) - taken[p]
+            if not left:
+                continue
+            targets = index[bounds[p]:bounds[p + 1]]
+            free = targets[room_seats[targets] < 0][:left]
+            room_seats[free] = waiting[p][taken[p]:taken[p] + len(free)]
+            taken[p] += len(free)
+
+    plan = SeatPlan(rooms=rooms, rosters=rosters, seats=seats, offsets=offsets,
+                    strategy=previous.strategy, seed=previous.seed, pattern=previous.pattern)
+    return plan, seat_changes(previous, plan, old_to_new)
+
+
+def seat_changes(previous, plan, old_to_new):
+    """SeatChanges between two plans; students on the same seat are skipped without a Python loop."""
+    old_where = _seat_index(previous)
+    new_where = _seat_index(plan)
+    old_rolls = previous.roll_numbers
+    new_rolls = plan.roll_numbers
+
+    old_seated = old_where[:, 0] >= 0
+    same = old_seated & (old_to_new >= 0)
+    same[same] = (new_where[old_to_new[same]] == old_where[same]).all(axis=1)
+    stayed = np.zeros(plan.total_students, dtype=bool)
+    stayed[old_to_new[same]] = True
+
+    changes = []
+    was_seated = set()
+    changed = np.flatnonzero(old_seated & ~same)
+    if len(changed):
+        new_ids = {str(roll): k for k, roll in enumerate(new_rolls)}
+    for old_id in changed:
+        roll = str(old_rolls[old_id])
+        was_seated.add(roll)
+        new_id = new_ids.get(roll, -1)
+        old_seat = _seat(previous, old_where[old_id])
+        if new_id < 0:
+            changes.append(SeatChange(roll, "withdrawn", old_seat, None))
+        elif new_where[new_id, 0] >= 0:
+            changes.append(SeatChange(roll, "moved", old_seat, _seat(plan, new_where[new_id])))
+        else:
+            changes.append(SeatChange(roll, "unseated", old_seat, None))
+
+    was_unseated = {str(old_rolls[k]) for k in np.flatnonzero(~old_seated)}
+    for new_id in np.flatnonzero(~stayed):
+        roll = str(new_rolls[new_id])
+        if roll in was_seated:
+            continue
+        if new_where[new_id, 0] >= 0:
+            changes.append(SeatChange(roll, "added", None, _seat(plan, new_where[new_id])))
+        elif roll not in was_unseated:
+            changes.append(SeatChange(roll, "unseated", None, None))
+    changes.sort(key=lambda c: CHANGE_ORDER.index(c.change))
+    return changes
+
+
+def changes_frame(changes):
+    return pd.DataFrame({
+        'Roll Number': [c.roll for c in changes],
+        'Change': [c.change for c in changes],
+        'Old Seat': [describe_seat(c.old_seat) for c in changes],
+        'New Seat': [describe_seat(c.new_seat) for c in changes],
+    })
+
+
+def main(argv=None):
+    from plan_file import PlanFileError, SUFFIX, load_plan, save_plan, sidecar_path
+    from seating_cli import load_rolls
+    from size_estimator import default_memory_limit, render
+    from workspace import DEFAULT_ROOT, cleanup, publishing
+
+    parser = argparse.ArgumentParser(description="Re-plan a published seating after roster changes")
+    parser.add_argument("previous", help=f"the published plan ({SUFFIX}), or the workbook it was saved next to")
+    parser.add_argument("--new", nargs="+", required=True, help="updated roll number files, same order")
+    parser.add_argument("--workspace", default=DEFAULT_ROOT, metavar="ROOT",
+                        help=f"publish the new run in a directory of its own under ROOT (default {DEFAULT_ROOT})")
+    parser.add_argument("-o", "--output", default="SeatingChart_Output.xlsx", help="workbook name in the run")
+    parser.add_argument("--changes", default="Seating_Changes.csv", help="change list name in the run, .csv or .xlsx")
+    args = parser.parse_args(argv)
+
+    path = args.previous if args.previous.endswith(SUFFIX) else sidecar_path(args.previous)
+    try:
+        previous = load_plan(path)
+    except (OSError, PlanFileError) as e:
+        raise SystemExit(f"Cannot load the published plan {path}: {e}")
+    if len(args.new) < len(previous.rosters):
+        raise SystemExit(f"The published plan has {len(previous.rosters)} roll number lists; "
+                         f"got {len(args.new)} with --new")
+    rolls = args.new[:len(previous.rosters)]
+    plan, changes = replan(previous, [load_rolls(roll_path) for roll_path in rolls])
+    frame = changes_frame(changes)
+
+    with publishing(args.workspace) as workspace:
+        changes_path = workspace.path(os.path.basename(args.changes))
+        if changes_path.endswith(".xlsx"):
+            frame.to_excel(changes_path, index=False)
+        else:
+            frame.to_csv(changes_path, index=False)
+        output_path = workspace.path(os.path.basename(args.output))
+        paths, _ = render(plan, output_path, memory_limit=default_memory_limit())
+        save_plan(plan, sidecar_path(output_path), [path] + rolls)
+    cleanup(args.workspace)
+
+    counts = frame['Change'].value_counts()
+    print(", ".join(f"{counts.get(kind, 0)} {kind}" for kind in CHANGE_ORDER))
+    print(f"Change list: {workspace.published_path(changes_path)}")
+    for seating_path in paths:
+        print(f"Seating: {workspace.published_path(seating_path)}")
+    print(f"Plan: {workspace.published_path(sidecar_path(output_path))} (re-plan from this next time)")
+
+if __name__ == "__main__":
+    main()
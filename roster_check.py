@@ -0,0 +1,108 @@
+"""Integrity checks over the roll number lists of one run, before anything is seated.
+
+check_rosters() indexes every loaded 'Roll Number' column at once and reports
+
+    duplicates  the same roll number more than once in one list
+    overlaps    the same roll number in two or more lists (e.g. Left and Right)
+    blanks      empty cells, which are otherwise dropped silently
+    malformed   roll numbers that do not look like the others
+
+Roll numbers are compared after trimming spaces and ignoring case, so
+'0808cs211001 ' and '0808CS211001' count as the same student; numbers read
+as floats (1001.0, as pandas reads .xls cells) are compared as integers. A
+roll number is malformed when it has characters other than letters, digits,
+'/' and '-', or when its shape (digits -> 9, letters -> A) is rare: no
+other roll number has it, or fewer than RARE_SHAPE_FRACTION of the run do.
+Regular series such as the 0808CS223D01 lateral entries keep their own
+shape and pass. Runs of fewer than MIN_SHAPE_ROWS roll numbers are too
+small to tell a usual shape from a rare one, so shapes are not checked.
+All of it is done with pandas column operations, in time linear in the row
+count.
+"""
+
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+# A shape is rare when only one roll number has it, e.g. a typo among
+# 0808CS211001s, or when fewer than this fraction of the run share it.
+RARE_SHAPE_FRACTION = 0.001
+MIN_SHAPE_ROWS = 20
+VALID_CHARS = r'[A-Z0-9/-]+'
+
+
+@dataclass
+class RosterReport:
+    rows: int = 0
+    duplicates: list = field(default_factory=list)
+    overlaps: list = field(default_factory=list)
+    blanks: list = field(default_factory=list)
+    malformed: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not (self.duplicates or self.overlaps or self.blanks or self.malformed)
+
+    def summary(self, limit=10):
+        lines = [f"Checked {self.rows} roll numbers."]
+
+        def section(title, items):
+            if not items:
+                return
+            lines.append(f"{title}: {len(items)}")
+            for item in items[:limit]:
+                lines.append(f"  {item}")
+            if len(items) > limit:
+                lines.append(f"  ... and {len(items) - limit} more")
+
+        section("Repeated within a list", self.duplicates)
+        section("In more than one list", self.overlaps)
+        section("Blank cells", self.blanks)
+        section("Malformed roll numbers", self.malformed)
+        if self.ok:
+            lines.append("No duplicate, overlapping, blank or malformed roll numbers.")
+        return "\n".join(lines)
+
+
+def _roll_text(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _where(position, rows):
+    return f"{position} rows {', '.join(str(r) for r in rows)}" if len(rows) > 1 else f"{position} row {rows[0]}"
+
+
+def check_rosters(columns):
+    """Check {position: 'Roll Number' column} as read from each file, blanks included.
+
+    Row numbers in the report are Excel rows (the header is row 1).
+    """
+    frames = [pd.DataFrame({'position': position, 'row': pd.RangeIndex(2, len(column) + 2),
+                            'value': pd.Series(column, dtype=object).to_numpy()})
+              for position, column in columns.items()]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['position', 'row', 'value'])
+    report = RosterReport(rows=len(df))
+
+    text = df['value'].map(_roll_text).str.strip()
+    blank = df['value'].isna() | (text == '') | text.str.lower().isin(['nan', 'none'])
+    report.blanks = [f"{p} row {r}" for p, r in zip(df['position'][blank], df['row'][blank])]
+
+    df = df[~blank].assign(key=text[~blank].str.upper())
+    repeated = df[df['key'].duplicated(keep=False)]
+    for key, group in repeated.groupby('key', sort=False):
+        places = group.groupby('position', sort=False)['row'].agg(list)
+        where = "; ".join(_where(p, rows) for p, rows in places.items())
+        if len(places) > 1:
+            report.overlaps.append(f"{key}: {where}")
+        else:
+            report.duplicates.append(f"{key}: {where}")
+
+    bad = ~df['key'].str.fullmatch(VALID_CHARS)
+    if len(df) >= MIN_SHAPE_ROWS:
+        shape = df['key'].str.replace(r'\d', '9', regex=True).str.replace(r'[A-Z]', 'A', regex=True)
+        shared = shape.map(shape.value_counts())
+        bad |= (shared < 2) | (shared < RARE_SHAPE_FRACTION * len(df))
+    report.malformed = [f"{p} row {r}: {v!r}" for p, r, v in zip(df['position'][bad], df['row'][bad], df['value'][bad])]
+    return report
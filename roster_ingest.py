@@ -0,0 +1,119 @@
+"""Streaming read of the 'Roll Number' column of a roster workbook.
+
+pd.read_excel loads every sheet of the workbook and every column of the
+sheet just to keep one column. Registrar exports carry many of both, so
+this reads the workbook with openpyxl in read-only mode instead: the first
+sheet whose header row has a 'Roll Number' cell is iterated row by row,
+only that column is materialized, and the values flow through a generator
+pipeline into a RosterBuffer in chunks of CHUNK_ROWS:
+
+    roll_cells(path)  ->  chunked(cells)  ->  RosterBuffer.extend(chunk)
+
+Memory follows the roster, not the sheet, and read_roster(path, on_chunk)
+hands the buffer to on_chunk after every chunk, so callers can report
+progress or look at the first rows before the rest is read. Legacy .xls
+files, which openpyxl cannot read, go through pd.read_excel with only the
+one column; pandas hands back a numeric column as floats there, so whole
+floats are turned back into the integers the sheet shows (1001.0 -> 1001).
+"""
+
+import os
+from itertools import islice
+
+import openpyxl
+import pandas as pd
+
+ROLL_HEADER = "Roll Number"
+CHUNK_ROWS = 4096
+
+
+class RosterFormatError(ValueError):
+    pass
+
+
+def _header_column(ws, header):
+    for row in ws.iter_rows(min_row=1, max_row=1, values_only=True):
+        for column, value in enumerate(row, start=1):
+            if isinstance(value, str) and value.strip() == header:
+                return column
+    return None
+
+
+def _roll_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def roll_cells(path, header=ROLL_HEADER):
+    """(Excel row, value) of every cell under the header, None for blanks; trailing blanks are dropped."""
+    if os.path.splitext(path)[1].lower() not in (".xlsx", ".xlsm"):
+        try:
+            column = pd.read_excel(path, usecols=[header])[header]
+        except ValueError:
+            raise RosterFormatError(f"{os.path.basename(path)}: missing '{header}' column") from None
+        for row, value in enumerate(column.tolist(), start=2):
+            yield row, None if pd.isna(value) else _roll_value(value)
+        return
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            column = _header_column(ws, header)
+            if column is not None:
+                break
+        else:
+            raise RosterFormatError(f"{os.path.basename(path)}: missing '{header}' column")
+        blanks = []
+        for row, (value,) in enumerate(ws.iter_rows(min_row=2, min_col=column, max_col=column, values_only=True),
+                                       start=2):
+            if value is None:
+                blanks.append(row)
+                continue
+            for blank in blanks:
+                yield blank, None
+            blanks.clear()
+            yield row, _roll_value(value)
+    finally:
+        wb.close()
+
+
+def chunked(cells, size=CHUNK_ROWS):
+    cells = iter(cells)
+    while True:
+        chunk = list(islice(cells, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class RosterBuffer:
+    """The cells of one 'Roll Number' column, blanks included, as they arrive."""
+
+    def __init__(self, path):
+        self.path = path
+        self.cells = []
+
+    def extend(self, chunk):
+        self.cells.extend(value for _, value in chunk)
+
+    @property
+    def rows(self):
+        return len(self.cells)
+
+    def rolls(self):
+        """The roll numbers, blanks dropped (what the allocator seats)."""
+        return [value for value in self.cells if value is not None]
+
+    def column(self):
+        """The column as read, blanks included, for roster_check.check_rosters."""
+        return pd.Series(self.cells, dtype=object, name=ROLL_HEADER)
+
+
+def read_roster(path, on_chunk=None, chunk_rows=CHUNK_ROWS):
+    buffer = RosterBuffer(path)
+    for chunk in chunked(roll_cells(path), chunk_rows):
+        buffer.extend(chunk)
+        if on_chunk:
+            on_chunk(buffer)
+    return buffer
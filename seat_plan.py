@@ -0,0 +1,519 @@
+"""Seat assignment shared by every output of a generation run.
+
+allocate() places the roll number lists onto the room layout once. The seating
+sheet, the attendance sheet and any other export read the resulting SeatPlan
+instead of walking the roll number lists again, so they always agree.
+
+Each roll number list is a group (one paper). A group pattern decides which
+group every seat belongs to:
+
+    positions  group p sits at seat position p of every bench (F-1, S-1, ...);
+               at most as many groups as seats per bench
+    cycle      groups repeat along each row of the hall, bench after bench
+    diagonal   like cycle, shifted by one seat on every row, so nobody has
+               their own paper in front of or beside them
+    "1 2 3/3 1 2"  a tile of group numbers repeated over the hall: "/"
+               separates tile rows (hall rows), "-" leaves a seat empty
+
+Seats can be masked per room (broken benches, invigilator desks, seats
+reserved for students who need accommodations): a 'Blocked Seats' sheet
+lists them, and rooms_from_layout() stores them on each Room as a packed
+bitmap. Masked seats are dropped from the index maps, so the allocator,
+the capacity counts and every renderer skip them without per-seat checks.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+SEAT_POSITIONS = ["F-1", "S-1", "T-1"]
+ROSTER_POSITIONS = ["Left", "Middle", "Right"]
+FILL_STRATEGIES = ["column-major", "row-major", "serpentine", "shuffle"]
+GROUP_PATTERNS = ["positions", "cycle", "diagonal"]
+MASK_SHEET = "Blocked Seats"
+BLOCKED_LABEL = "Blocked"
+RESERVED_LABEL = "Reserved"
+MASK_LABELS = (BLOCKED_LABEL, RESERVED_LABEL)
+
+
+def group_label(group):
+    return f"Group {group + 1}"
+
+
+def group_names(count):
+    """Names of count roll number lists: Left, Middle, Right while they fit, else Group 1 ... n."""
+    if count <= len(ROSTER_POSITIONS):
+        return ROSTER_POSITIONS[:count]
+    return [group_label(g) for g in range(count)]
+
+
+def parse_pattern(text):
+    """Canonical pattern text; a tile is normalised to "1 2 3/3 1 2" form."""
+    text = str(text).strip()
+    if text in GROUP_PATTERNS:
+        return text
+    tile = _tile(text)
+    return "/".join(" ".join("-" if g < 0 else str(g + 1) for g in row) for row in tile)
+
+
+def _tile(text):
+    rows = []
+    for line in text.split("/"):
+        row = []
+        for token in line.replace(",", " ").split():
+            if token == "-":
+                row.append(-1)
+            elif token.isdigit() and int(token) > 0:
+                row.append(int(token) - 1)
+            else:
+                raise ValueError(f"Bad group {token!r} in pattern {text!r}; use group numbers from 1, or -")
+        rows.append(row)
+    if not rows or any(len(row) != len(rows[0]) or not row for row in rows):
+        raise ValueError(f"Unknown group pattern {text!r}; expected {', '.join(GROUP_PATTERNS)} "
+                         f"or equal-length rows of group numbers such as '1 2 3/3 1 2'")
+    return rows
+
+
+@dataclass
+class Room:
+    number: object
+    benches: int
+    rows: int
+    seats_per_bench: int
+    names: tuple = ()
+    mask: bytes = b""  # packed bits over (seat position, slot): seat cannot be used
+    reserved: bytes = b""  # the masked seats that are reserved rather than blocked
+
+    @property
+    def capacity(self):
+        """Seats of each seat position (F-1, S-1, ...), masked ones included."""
+        return self.benches * self.rows
+
+    def _bits(self, packed):
+        size = self.seats_per_bench * self.capacity
+        if not packed:
+            return np.zeros((self.seats_per_bench, self.capacity), dtype=bool)
+        bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=size)
+        return bits.view(bool).reshape(self.seats_per_bench, self.capacity)
+
+    def masked(self):
+        """(seats_per_bench, benches * rows) bool array of the seats that cannot be used."""
+        return self._bits(self.mask)
+
+    def reserved_seats(self):
+        return self._bits(self.reserved)
+
+    @property
+    def usable_seats(self):
+        return self.seats_per_bench * self.capacity - int(np.count_nonzero(self.masked()))
+
+
+def rooms_from_layout(df, students_per_bench=None, masks=None):
+    """Build Room entries from a loaded room layout DataFrame.
+
+    Every room keeps its own 'Number of Student per Bench'; students_per_bench
+    is only used for rooms that leave it blank. masks, a loaded 'Blocked Seats'
+    sheet, is applied with apply_masks().
+    """
+    rooms = []
+    for _, row in df.iterrows():
+        names = tuple(row.get(f"{pos} Name", '') for pos in ROSTER_POSITIONS)
+        width = row.get('Number of Student per Bench')
+        rooms.append(Room(number=row['Room Number'],
+                          benches=int(row['Number of Bench']),
+                          rows=int(row['Number of Rows']),
+                          seats_per_bench=int(width) if pd.notna(width) else students_per_bench,
+                          names=names))
+    if masks is not None:
+        apply_masks(rooms, masks)
+    return rooms
+
+
+def _mask_values(column, count, what):
+    """0-based indices selected by a 1-based mask column entry; blank selects all."""
+    if column is None or pd.isna(column) or str(column).strip() == "":
+        return np.arange(count)
+    text = str(column).strip()
+    if text in SEAT_POSITIONS:
+        value = SEAT_POSITIONS.index(text) + 1
+    else:
+        try:
+            value = int(float(text))
+        except ValueError:
+            raise ValueError(f"Bad {what} {text!r} in the {MASK_SHEET} sheet") from None
+    if not 1 <= value <= count:
+        raise ValueError(f"{what} {text} is outside 1..{count} in the {MASK_SHEET} sheet")
+    return np.array([value - 1])
+
+
+def _room_key(number):
+    """A room number as text for matching, so 101, 101.0 and ' 101' are the same room."""
+    text = str(number).strip()
+    return text[:-2] if text.endswith(".0") else text
+
+
+def apply_masks(rooms, df):
+    """Set each Room's mask from a 'Blocked Seats' sheet.
+
+    Columns: 'Room Number', 'Bench', 'Row', 'Seat Position' (F-1, S-1, ... or
+    1, 2, ...) and an optional 'Reason'. A blank Bench, Row or Seat Position
+    masks all of them, e.g. a blank Seat Position blocks the whole bench at
+    that row. Reasons containing "reserv" mark the seats as reserved.
+    """
+    df = df.rename(columns=lambda c: str(c).strip())
+    if 'Room Number' not in df.columns:
+        raise ValueError(f"The {MASK_SHEET} sheet needs a 'Room Number' column")
+    by_number = {_room_key(room.number): room for room in rooms}
+    bits = {}
+    for _, row in df.iterrows():
+        if pd.isna(row['Room Number']):
+            continue
+        number = _room_key(row['Room Number'])
+        room = by_number.get(number)
+        if room is None:
+            raise ValueError(f"Room {number} in the {MASK_SHEET} sheet is not in the layout")
+        positions = _mask_values(row.get('Seat Position'), room.seats_per_bench, "Seat Position")
+        benches = _mask_values(row.get('Bench'), room.benches, "Bench")
+        rows = _mask_values(row.get('Row'), room.rows, "Row")
+        slots = (benches[:, None] * room.rows + rows[None, :]).ravel()
+        flat = (positions[:, None] * room.capacity + slots[None, :]).ravel()
+        masked, reserved = bits.setdefault(number, (np.zeros(room.seats_per_bench * room.capacity, dtype=bool),
+                                                    np.zeros(room.seats_per_bench * room.capacity, dtype=bool)))
+        masked[flat] = True
+        if "reserv" in str(row.get('Reason', '')).lower():
+            reserved[flat] = True
+    for number, (masked, reserved) in bits.items():
+        room = by_number[number]
+        room.mask = np.packbits(masked).tobytes()
+        room.reserved = np.packbits(reserved).tobytes() if reserved.any() else b""
+    return rooms
+
+
+def load_layout(path):
+    """The room layout sheet, with surrounding spaces stripped from its column names."""
+    df = pd.read_excel(path)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def load_masks(layout_path, mask_path=None):
+    """The blocked seats of mask_path, else of the layout's 'Blocked Seats' sheet; None if there are none."""
+    path = mask_path or layout_path
+    sheets = pd.ExcelFile(path).sheet_names
+    if MASK_SHEET in sheets:
+        return pd.read_excel(path, sheet_name=MASK_SHEET)
+    if mask_path:
+        return pd.read_excel(mask_path)
+    return None
+
+
+def max_seats_per_bench(df):
+    """Widest bench in a layout, i.e. how many roll number lists it needs."""
+    return int(df['Number of Student per Bench'].max())
+
+
+def position_capacity(rooms, positions, pattern="positions"):
+    """(rooms, groups) seats each room offers each group; 0 where its benches are narrower.
+
+    With the default pattern a group is a seat position. Other patterns, and
+    rooms with masked seats, count the seats of each group from the index maps
+    (room_group_seats).
+    """
+    if pattern == "positions" and not any(room.mask for room in rooms):
+        capacity = np.array([room.capacity for room in rooms], dtype=np.int64)
+        width = np.array([room.seats_per_bench for room in rooms], dtype=np.int64)
+        return np.where(width[:, None] > np.arange(positions)[None, :], capacity[:, None], 0)
+    seats = np.zeros((len(rooms), positions), dtype=np.int64)
+    for i, room in enumerate(rooms):
+        _, starts = room_group_seats(room, positions, pattern)
+        seats[i] = np.diff(starts)
+    return seats
+
+
+@lru_cache(maxsize=None)
+def seat_order(benches, rows, strategy="column-major", seed=0):
+    """Slots of a benches x rows room in the order a seat position is filled.
+
+    Slot b * rows + r is bench b, row r. The result is cached per room shape
+    and read-only; allocate() scatters roster ids through it in one step.
+
+    column-major  down each bench, bench after bench
+    row-major     across all benches, row after row
+    serpentine    row-major, reversing direction on every other row
+    shuffle       a permutation that is reproducible for a given seed
+    """
+    slots = np.arange(benches * rows, dtype=np.int64)
+    if strategy == "column-major":
+        order = slots
+    elif strategy == "row-major":
+        order = slots.reshape(benches, rows).T.ravel()
+    elif strategy == "serpentine":
+        by_row = slots.reshape(benches, rows).T.copy()
+        by_row[1::2] = by_row[1::2, ::-1]
+        order = by_row.ravel()
+    elif strategy == "shuffle":
+        order = np.random.default_rng([seed, benches, rows]).permutation(slots)
+    else:
+        raise ValueError(f"Unknown fill strategy {strategy!r}; expected one of {', '.join(FILL_STRATEGIES)}")
+    order.flags.writeable = False
+    return order
+
+
+def seat_group(pattern, groups, width, bench, row, position):
+    """Group of seat position p of bench b, row r (numbers or arrays); -1 for none."""
+    bench, row, position = (np.asarray(v, dtype=np.int64) for v in (bench, row, position))
+    column = bench * width + position
+    if pattern == "positions":
+        group = np.where(position < groups, position, -1)
+    elif not groups:
+        group = np.full(np.broadcast(column, row).shape, -1)
+    elif pattern == "cycle":
+        group = column % groups
+    elif pattern == "diagonal":
+        group = (column + row) % groups
+    else:
+        tile = np.array(_tile(pattern), dtype=np.int64)
+        group = tile[row % tile.shape[0], column % tile.shape[1]]
+        group = np.where(group < groups, group, -1)
+    return np.broadcast_to(group, np.broadcast(column, row).shape)
+
+
+@lru_cache(maxsize=None)
+def group_grid(benches, rows, width, groups, pattern="positions"):
+    """Group of every seat of a room as (seats_per_bench, benches * rows); -1 for none.
+
+    Hall column b * width + p is seat position p of bench b. Cached per room
+    shape and read-only.
+    """
+    bench = np.repeat(np.arange(benches, dtype=np.int64), rows)
+    row = np.tile(np.arange(rows, dtype=np.int64), benches)
+    position = np.arange(width, dtype=np.int64)[:, None]
+    grid = seat_group(pattern, groups, width, bench[None, :], row[None, :], position).astype(np.int16)
+    grid.flags.writeable = False
+    return grid
+
+
+@lru_cache(maxsize=None)
+def group_seats(benches, rows, width, groups, pattern="positions", strategy="column-major", seed=0):
+    """Index map from groups to seats of a room shape.
+
+    Returns (seats, starts): group g owns seats[starts[g]:starts[g + 1]], flat
+    indices p * benches * rows + slot into a room's seat array, in fill
+    order (seat_order, and seat positions left to right within a slot). The
+    grouping is a stable sort on 16-bit group numbers, i.e. a radix sort, so
+    building the map stays linear in seats however many groups there are.
+    """
+    order = seat_order(benches, rows, strategy, seed)
+    flat = (order[:, None] + np.arange(width, dtype=np.int64)[None, :] * (benches * rows)).ravel()
+    owner = group_grid(benches, rows, width, groups, pattern).ravel()[flat]
+    flat, owner = flat[owner >= 0], owner[owner >= 0]
+    seats = flat[np.argsort(owner, kind="stable")]
+    starts = np.zeros(groups + 1, dtype=np.int64)
+    starts[1:] = np.cumsum(np.bincount(owner, minlength=groups))
+    seats.flags.writeable = False
+    starts.flags.writeable = False
+    return seats, starts
+
+
+def room_group_seats(room, groups, pattern="positions", strategy="column-major", seed=0):
+    """group_seats() of a room's shape without its masked seats."""
+    index, starts = group_seats(room.benches, room.rows, room.seats_per_bench, groups, pattern, strategy, seed)
+    if not room.mask:
+        return index, starts
+    keep = ~room.masked().ravel()[index]
+    kept = np.zeros(len(index) + 1, dtype=np.int64)
+    np.cumsum(keep, out=kept[1:])
+    return index[keep], kept[starts]
+
+
+@dataclass
+class SeatPlan:
+    """Result of one allocation pass.
+
+    Students are identified by an integer id: the rosters are laid end to end,
+    so roster p owns ids offsets[p] .. offsets[p + 1] - 1. seats[i] holds the
+    ids seated in room i with shape (seats_per_bench, benches * rows), slot
+    b * rows + r being bench b, row r; -1 marks an empty seat. allocate()
+    hands ids out in fill order, so sorting a room's ids gives its fill order
+    back; plans from replan.replan() keep roster order instead. pattern is
+    the group pattern the rosters were seated with.
+    """
+    rooms: list
+    rosters: list
+    seats: list
+    offsets: np.ndarray
+    strategy: str = "column-major"
+    seed: int = 0
+    pattern: str = "positions"
+    _roll_numbers: np.ndarray = field(default=None, repr=False)
+
+    @property
+    def roll_numbers(self):
+        if self._roll_numbers is None:
+            rolls = np.empty(int(self.offsets[-1]), dtype=object)
+            for p, roster in enumerate(self.rosters):
+                rolls[self.offsets[p]:self.offsets[p + 1]] = roster
+            self._roll_numbers = rolls
+        return self._roll_numbers
+
+    def _sort_keys(self):
+        """Roll numbers by student id in a sortable array: numeric if every roster is, else text."""
+        rosters = [np.asarray(roster) for roster in self.rosters]
+        if all(roster.dtype.kind in "iuf" for roster in rosters):
+            return np.concatenate(rosters) if rosters else np.empty(0)
+        return np.concatenate([roster.astype(str) for roster in rosters])
+
+    def master_index(self):
+        """Every seated student sorted by roll number, as (ids, room, position, bench, row) arrays."""
+        parts = [[np.empty(0, dtype=np.int64)] for _ in range(5)]
+        for i, (room, seats) in enumerate(zip(self.rooms, self.seats)):
+            position, slot = np.nonzero(seats >= 0)
+            for part, values in zip(parts, (seats[position, slot], np.full(len(slot), i), position,
+                                            slot // room.rows, slot % room.rows)):
+                part.append(values)
+        ids, rooms, positions, benches, rows = (np.concatenate(part).astype(np.int64) for part in parts)
+        order = np.argsort(self._sort_keys()[ids], kind="stable")
+        return ids[order], rooms[order], positions[order], benches[order], rows[order]
+
+    @property
+    def total_students(self):
+        return int(self.offsets[-1])
+
+    @property
+    def seated_count(self):
+        return int(sum(np.count_nonzero(s >= 0) for s in self.seats))
+
+    def grid(self, room_index):
+        """Student ids of a room as (seat position, bench, row)."""
+        room = self.rooms[room_index]
+        return self.seats[room_index].reshape(room.seats_per_bench, room.benches, room.rows)
+
+    def seat_labels(self, room_index):
+        """Roll numbers of a room as (seat position, bench, row); '' for empty seats.
+
+        Masked seats read BLOCKED_LABEL or RESERVED_LABEL.
+        """
+        ids = self.grid(room_index)
+        labels = np.full(ids.shape, '', dtype=object)
+        taken = ids >= 0
+        labels[taken] = self.roll_numbers[ids[taken]]
+        room = self.rooms[room_index]
+        if room.mask:
+            labels[room.masked().reshape(ids.shape)] = BLOCKED_LABEL
+            labels[room.reserved_seats().reshape(ids.shape)] = RESERVED_LABEL
+        return labels
+
+    def seated(self, room_index, position):
+        """Roll numbers seated at one seat position of a room, in roster (for allocate(): fill) order."""
+        ids = self.seats[room_index][position]
+        return self.roll_numbers[np.sort(ids[ids >= 0])]
+
+    @property
+    def section_heading(self):
+        """Heading of the attendance sheet's label column (see attendance())."""
+        return "Seat Position" if self.pattern == "positions" else "Group"
+
+    def position_names(self, room_index):
+        """Paper names shown above each seat position; blank unless groups sit by position."""
+        room = self.rooms[room_index]
+        if self.pattern == "positions":
+            return room.names[:room.seats_per_bench]
+        return ('',) * room.seats_per_bench
+
+    def attendance(self, room_index):
+        """(label, roll numbers) sections of a room's attendance sheet.
+
+        One section per seat position (F-1, S-1, ...) when groups sit by
+        position, otherwise one per group seated in the room.
+        """
+        room = self.rooms[room_index]
+        if self.pattern == "positions":
+            return [(SEAT_POSITIONS[p], self.seated(room_index, p)) for p in range(room.seats_per_bench)]
+        ids = self.seats[room_index].ravel()
+        ids = np.sort(ids[ids >= 0])
+        bounds = np.searchsorted(ids, self.offsets)
+        return [(group_label(g), self.roll_numbers[ids[bounds[g]:bounds[g + 1]]])
+                for g in range(len(self.rosters)) if bounds[g + 1] > bounds[g]]
+
+
+def balanced_limits(rooms, rosters, pattern="positions"):
+    """Per-room, per-position seat counts that spread each roster evenly.
+
+    Each roster is split across the rooms in proportion to their capacity
+    (largest remainder first), so a session that does not need every seat
+    leaves the rooms evenly filled instead of packing the first ones full.
+    """
+    seats = position_capacity(rooms, len(rosters), pattern)
+    limits = np.zeros((len(rooms), len(rosters)), dtype=np.int64)
+    for p, roster in enumerate(rosters):
+        capacity = seats[:, p]
+        total = capacity.sum()
+        if not total:
+            continue
+        n = min(len(roster), total)
+        share = n * capacity / total
+        base = np.minimum(np.floor(share).astype(np.int64), capacity)
+        extra = n - base.sum()
+        if extra:
+            room_left = base < capacity
+            ranked = np.argsort(-(share - base), kind="stable")
+            base[ranked[room_left[ranked]][:extra]] += 1
+        limits[:, p] = base
+    return limits
+
+
+def room_takes(rooms, rosters, limits=None, pattern="positions"):
+    """How many students of each roster every room seats, and where each room's run starts.
+
+    Returns (takes, starts), both (rooms, positions): room i seats roster p's
+    students starts[i, p] .. starts[i, p] + takes[i, p] - 1 (roster indices).
+    """
+    seats = position_capacity(rooms, len(rosters), pattern)
+    if limits is not None:
+        seats = np.minimum(seats, np.asarray(limits, dtype=np.int64))
+    sizes = np.array([len(r) for r in rosters], dtype=np.int64)
+    before = np.cumsum(seats, axis=0) - seats
+    takes = np.clip(sizes[None, :] - before, 0, seats)
+    return takes, np.cumsum(takes, axis=0) - takes
+
+
+def allocate(rooms, rosters, strategy="column-major", seed=0, limits=None, pattern="positions"):
+    """Seat every roster across the rooms in one pass.
+
+    Each roster is a group; the seats of group p in every room come from the
+    index map group_seats(pattern), in the slot order given by
+    seat_order(strategy). With the default pattern that is seat position p
+    of each bench. Rooms are filled in layout order and each roster carries
+    on where the previous room stopped, so nobody is seated twice. Students
+    that do not fit stay unseated. limits[i][p], when given, caps how many
+    students of roster p room i takes (see balanced_limits).
+
+    Rooms may differ in benches, rows and seats per bench; rooms of the same
+    shape and mask are filled together with one scatter per group. Masked
+    seats are not in the index map and stay empty.
+    """
+    pattern = parse_pattern(pattern)
+    offsets = np.zeros(len(rosters) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(r) for r in rosters])
+    takes, starts = room_takes(rooms, rosters, limits, pattern)
+
+    shapes = defaultdict(list)
+    for i, room in enumerate(rooms):
+        shapes[(room.benches, room.rows, room.seats_per_bench, room.mask)].append(i)
+
+    seats = [None] * len(rooms)
+    for (benches, rows, width, _), members in shapes.items():
+        index, bounds = room_group_seats(rooms[members[0]], len(rosters), pattern, strategy, seed)
+        block = np.full((len(members), width * benches * rows), -1, dtype=np.int32)
+        for p in range(len(rosters)):
+            targets = index[bounds[p]:bounds[p + 1]]
+            k = np.arange(len(targets))
+            first = offsets[p] + starts[members, p]
+            block[:, targets] = np.where(k[None, :] < takes[members, p][:, None], first[:, None] + k[None, :], -1)
+        for j, i in enumerate(members):
+            seats[i] = block[j].reshape(width, benches * rows)
+    return SeatPlan(rooms=rooms, rosters=rosters, seats=seats, offsets=offsets,
+                    strategy=strategy, seed=seed, pattern=pattern)
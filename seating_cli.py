@@ -0,0 +1,207 @@
+"""Command-line generation of seating and attendance sheets, without the GUI.
+
+    python seating_cli.py "excel sheet.xlsx" "Year 4.xlsx" "Year 2.xlsx" "Year 3.xlsx"
+    python seating_cli.py layout.xlsx left.xlsx middle.xlsx --dry-run --memory-limit 2G
+    python seating_cli.py --load SeatingChart_Output.seatplan --pdf SeatingChart_Output.pdf
+    python seating_cli.py --load SeatingChart_Output.seatplan --index Notice_Board.xlsx
+
+Roll number files are given in seat position order (Left, Middle, Right).
+With --pattern cycle, diagonal or a tile such as "1 2 3/4 5 6" any number of
+roll number files (groups) are interleaved instead, e.g. five or six papers
+in one hall.
+With --checkpoint-dir every finished room is kept on disk, and rerunning the
+same command after a crash only renders the rooms that are missing.
+With --farm the rooms are rendered by workers on other machines (render_farm).
+Every run saves the plan next to the workbook (plan_file); --load reopens
+that plan instead of allocating, and only writes the outputs asked for.
+With --workspace the run gets its own output directory (workspace), so
+several runs can write at once.
+"""
+
+import argparse
+import os
+import tempfile
+
+from chart_pdf import render_pdf
+from chart_render import write_index
+from checkpoint import CheckpointedRun
+from plan_file import PlanFileError, load_plan, save_plan, sidecar_path
+from render_farm import DEFAULT_BATCH, Farm, FarmError, parse_address
+from roster_check import check_rosters
+from roster_ingest import RosterFormatError, read_roster
+from seat_plan import (FILL_STRATEGIES, GROUP_PATTERNS, MASK_SHEET, allocate, group_names, load_layout, load_masks,
+                       max_seats_per_bench, parse_pattern, rooms_from_layout)
+from size_estimator import (DEFAULT_MAX_FILE_BYTES, ENGINES, MemoryLimitExceeded, default_memory_limit,
+                            estimate, parse_size, render)
+from workspace import DEFAULT_ROOT, cleanup, publishing
+
+
+def load_roster(path):
+    try:
+        return read_roster(path)
+    except RosterFormatError as e:
+        raise SystemExit(str(e))
+
+
+def load_roll_column(path):
+    """The 'Roll Number' column as read, blank cells included (see roster_check)."""
+    return load_roster(path).column()
+
+
+def load_rolls(path):
+    return load_roster(path).rolls()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate seating and attendance sheets")
+    parser.add_argument("layout", nargs="?", help="room layout Excel file")
+    parser.add_argument("rolls", nargs="*", help="roll number files, one per seat position (or group)")
+    parser.add_argument("--load", metavar="PLAN", help="reuse a saved .seatplan instead of a layout and rolls")
+    parser.add_argument("-o", "--output", help="workbook to write; defaults to SeatingChart_Output.xlsx here, "
+                                               "and with --load to none (so --workspace needs it)")
+    parser.add_argument("--workspace", nargs="?", const=DEFAULT_ROOT, metavar="ROOT",
+                        help=f"write the run into a directory of its own under ROOT (default {DEFAULT_ROOT}), "
+                             f"published when complete; old runs are cleaned up (workspace.py)")
+    parser.add_argument("--mask", help=f"blocked and reserved seats; defaults to the layout's "
+                                       f"'{MASK_SHEET}' sheet, if it has one")
+    parser.add_argument("--fill", choices=FILL_STRATEGIES, default=FILL_STRATEGIES[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pattern", type=parse_pattern, default="positions",
+                        help=f"how groups share the seats: {', '.join(GROUP_PATTERNS)}, or a tile of group "
+                             f"numbers such as '1 2 3/4 5 6'")
+    parser.add_argument("--engine", choices=["auto"] + ENGINES, default="auto")
+    parser.add_argument("--memory-limit", type=parse_size,
+                        help="e.g. 2G; also traces rendering memory and falls back to a leaner engine past it "
+                             "(slower); without it the engine is picked for half of physical memory")
+    parser.add_argument("--max-file-size", type=parse_size, default=DEFAULT_MAX_FILE_BYTES,
+                        help="largest workbook to write before sharding, e.g. 200M")
+    parser.add_argument("--dry-run", action="store_true", help="print the size estimate and exit")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop if the roll number files have duplicate, blank or malformed entries")
+    parser.add_argument("--index-sheet", action="store_true",
+                        help="add a master index sheet: every student by roll number with room, row, "
+                             "seat position and seat")
+    parser.add_argument("--index", help="write the master index to its own file here (.xlsx or .csv)")
+    parser.add_argument("--pdf", help="also write a print-ready PDF of every room here")
+    parser.add_argument("--workers", type=int, help="PDF rendering processes; defaults to one per CPU")
+    parser.add_argument("--checkpoint-dir", help="save progress here room by room; rerun to resume")
+    parser.add_argument("--farm", metavar="HOST:PORT",
+                        help="hand rooms out to render_farm.py workers connecting here, e.g. 0.0.0.0:5750")
+    parser.add_argument("--local-workers", type=int, default=0, help="with --farm, also start this many workers here")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="with --farm, rooms per batch")
+    parser.add_argument("--farm-token", default=os.environ.get("SEATING_FARM_TOKEN"),
+                        help="with --farm, token workers must present; random if not given")
+    return parser
+
+
+def load_inputs(args):
+    layout = load_layout(args.layout)
+    if args.pattern == "positions":
+        groups = max_seats_per_bench(layout)
+        if len(args.rolls) < groups:
+            raise SystemExit(f"Layout seats {groups} students per bench; got {len(args.rolls)} roll number files")
+    else:
+        groups = len(args.rolls)
+    try:
+        rooms = rooms_from_layout(layout, masks=load_masks(args.layout, args.mask))
+    except ValueError as e:
+        raise SystemExit(str(e))
+    buffers = [load_roster(path) for path in args.rolls[:groups]]
+    columns = [buffer.column() for buffer in buffers]
+    rosters = [buffer.rolls() for buffer in buffers]
+
+    report = check_rosters(dict(zip(group_names(groups), columns)))
+    if not report.ok:
+        print(report.summary())
+        if args.strict:
+            raise SystemExit("Aborted: fix the roll number files or rerun without --strict")
+    return rooms, rosters, [args.layout] + ([args.mask] if args.mask else []) + args.rolls[:groups]
+
+
+def generate(args, plan, rooms, rosters, inputs):
+    """Allocate unless a plan was loaded, then write every output asked for."""
+    if args.farm and not args.load:
+        root = args.checkpoint_dir or os.path.join(tempfile.gettempdir(), "seating_farm")
+        run = CheckpointedRun(root, rooms, rosters, strategy=args.fill, seed=args.seed, pattern=args.pattern)
+        farm = Farm(run, parse_address(args.farm, "0.0.0.0"), token=args.farm_token, batch_size=args.batch)
+        try:
+            plan = farm.serve(args.output, local_workers=args.local_workers, index=args.index_sheet)
+        except FarmError as e:
+            raise SystemExit(f"Aborted: {e}")
+        if not args.checkpoint_dir:
+            run.clear()
+        print(f"Wrote {plan.seated_count} of {plan.total_students} students to {args.output}")
+    elif args.checkpoint_dir and not args.load:
+        run = CheckpointedRun(args.checkpoint_dir, rooms, rosters, strategy=args.fill, seed=args.seed,
+                              pattern=args.pattern)
+        finished = len(run.completed())
+        if finished:
+            print(f"Resuming: {finished} of {len(rooms)} rooms already rendered in {run.run_dir}")
+        plan = run.run(args.output, index=args.index_sheet)
+        print(f"Wrote {plan.seated_count} of {plan.total_students} students to {args.output}")
+    else:
+        if not args.load:
+            plan = allocate(rooms, rosters, strategy=args.fill, seed=args.seed, pattern=args.pattern)
+        if args.output:
+            try:
+                paths, engine = render(plan, args.output, engine=args.engine,
+                                       memory_limit=args.memory_limit or default_memory_limit(),
+                                       max_file_bytes=args.max_file_size, index=args.index_sheet,
+                                       guard=args.memory_limit is not None)
+            except MemoryLimitExceeded as e:
+                raise SystemExit(f"Aborted: {e}")
+            print(f"Wrote {plan.seated_count} of {plan.total_students} students with the {engine} engine:")
+            for path in paths:
+                print(f"  {path}")
+
+    if not args.load:
+        save_plan(plan, sidecar_path(args.output), inputs)
+        print(f"Saved the plan to {sidecar_path(args.output)}")
+    if args.index:
+        write_index(plan, args.index)
+        print(f"Wrote the master index to {args.index}")
+    if args.pdf:
+        render_pdf(plan, args.pdf, workers=args.workers)
+        print(f"Wrote {args.pdf}")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    plan = inputs = None
+    if args.load:
+        if args.workspace and not args.output:
+            parser.error("--workspace with --load needs -o: a loaded plan writes no workbook by default")
+        try:
+            plan = load_plan(args.load)
+        except (OSError, PlanFileError) as e:
+            raise SystemExit(f"Cannot load {args.load}: {e}")
+        rooms, rosters = plan.rooms, plan.rosters
+        print(f"Loaded {plan.seated_count} of {plan.total_students} students in {len(rooms)} rooms "
+              f"from {args.load}")
+    elif not args.layout or not args.rolls:
+        parser.error("give a layout and roll number files, or --load a saved plan")
+    else:
+        rooms, rosters, inputs = load_inputs(args)
+        if not args.workspace:
+            args.output = args.output or os.path.join(os.getcwd(), "SeatingChart_Output.xlsx")
+
+    estimated = estimate(rooms, rosters, args.memory_limit or default_memory_limit(), args.max_file_size,
+                         plan.pattern if args.load else args.pattern, args.index_sheet)
+    print(estimated.summary())
+    if args.dry_run:
+        return
+
+    if args.workspace:
+        with publishing(args.workspace) as workspace:
+            args.output = workspace.path(os.path.basename(args.output or "SeatingChart_Output.xlsx"))
+            generate(args, plan, rooms, rosters, inputs)
+        print(f"Published the run to {workspace.directory}")
+        for name in cleanup(args.workspace):
+            print(f"Removed old run {name}")
+    else:
+        generate(args, plan, rooms, rosters, inputs)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,25 +5,40 @@ import openpyxl
 from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
 import os
 import subprocess
+import sys
+import argparse
 
-SEAT_POSITIONS = ["F-1", "S-1", "T-1"]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from roster_check import check_rosters
+from roster_ingest import RosterFormatError, read_roster
+from workspace import copy_out, save_published
+from seat_plan import (MASK_LABELS, SEAT_POSITIONS, FILL_STRATEGIES, GROUP_PATTERNS, allocate, max_seats_per_bench,
+                       parse_pattern, rooms_from_layout)
+from seating_cli import load_masks
+
+DEFAULT_FILL_STRATEGY = "row-major"
 BG_COLOR = "#f0f6ff"
 BTN_COLOR = "#7e57c2"
 BTN_HOVER = "#9575cd"
 BTN_FONT = ("Helvetica Neue", 11, "bold")
 LABEL_FONT = ("Helvetica Neue", 11)
 HEADER_FILL = PatternFill(start_color="D1C4E9", end_color="D1C4E9", fill_type="solid")
+MASKED_FILL = PatternFill(start_color="bdbdbd", end_color="bdbdbd", fill_type="solid")
 BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
                 top=Side(style='thin'), bottom=Side(style='thin'))
 
 class SeatingChartApp:
-    def __init__(self, master):
+    def __init__(self, master, fill_strategy=DEFAULT_FILL_STRATEGY, seed=0, pattern="positions"):
         self.master = master
+        self.fill_strategy = fill_strategy
+        self.seed = seed
+        self.pattern = pattern
         master.title("🎓 Colorful Seating Chart Generator")
         master.geometry("700x750")
         master.configure(bg=BG_COLOR)
 
         self.room_details_df = None
+        self.blocked_seats_df = None
         self.students_per_bench = None
         self.roll_numbers_lists = []
         self.roll_number_indices = []
@@ -37,9 +52,15 @@ class SeatingChartApp:
         self.status_label.pack(pady=5)
 
         self.roll_paths = {}
-        self.roll_files_selected = {pos: False for pos in ["Left", "Middle", "Right"]}
-        for pos in ["Left", "Middle", "Right"]:
-            self.create_button(f"🧾 Select {pos} Roll Numbers File", lambda p=pos: self.load_roll_file(p))
+        self.roll_columns = {}
+        self.roll_groups = ["Left", "Middle", "Right"]
+        self.roll_files_selected = {pos: False for pos in self.roll_groups}
+        self.frame_rolls = tk.Frame(master, bg=BG_COLOR)
+        self.frame_rolls.pack()
+        for pos in self.roll_groups:
+            self.create_button(f"🧾 Select {pos} Roll Numbers File", lambda p=pos: self.load_roll_file(p),
+                               parent=self.frame_rolls)
+        self.create_button("➕ Add Roll Number Group", self.add_roll_group)
 
         self.generate_button = self.create_button("✅ Generate Seating Chart", self.generate_chart, active=False)
 
@@ -61,8 +82,8 @@ class SeatingChartApp:
         self.progress = ttk.Progressbar(master, orient="horizontal", length=500, mode="determinate", variable=self.progress_var)
         self.progress.pack(pady=20)
 
-    def create_button(self, text, command, active=True):
-        btn = tk.Button(self.master, text=text, command=command,
+    def create_button(self, text, command, active=True, parent=None):
+        btn = tk.Button(parent or self.master, text=text, command=command,
                         bg=BTN_COLOR, fg="white", font=BTN_FONT,
                         activebackground=BTN_HOVER, activeforeground="white",
                         relief="raised", bd=2, padx=10, pady=5)
@@ -82,9 +103,13 @@ class SeatingChartApp:
             if not all(col in df.columns for col in required):
                 messagebox.showerror("Error", f"Missing columns: {', '.join(required)}")
                 return
+            masks = load_masks(filepath)
+            rooms_from_layout(df, masks=masks)  # rejects blocked seats the layout does not have
             self.room_details_df = df
-            self.students_per_bench = int(df['Number of Student per Bench'].iloc[0])
+            self.blocked_seats_df = masks
+            self.students_per_bench = max_seats_per_bench(df)
             self.roll_number_indices = [0] * self.students_per_bench
+            self.update_generate_state()
             self.status_label.config(text="✅ Room details loaded. Now select roll number files.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read Excel file: {e}")
@@ -94,29 +119,67 @@ class SeatingChartApp:
         if not filepath:
             return
         try:
-            df = pd.read_excel(filepath)
-            if 'Roll Number' not in df.columns:
+            try:
+                roster = read_roster(filepath)
+            except RosterFormatError:
                 messagebox.showerror("Error", f"'Roll Number' column missing in {position} file.")
                 return
-            self.roll_paths[position] = df['Roll Number'].dropna().tolist()
+            self.roll_paths[position] = roster.rolls()
+            self.roll_columns[position] = roster.column()
             self.roll_files_selected[position] = True
-            if all(self.roll_files_selected[pos] for pos in ["Left", "Middle", "Right"][:self.students_per_bench]):
-                self.roll_numbers_lists = [self.roll_paths[pos] for pos in ["Left", "Middle", "Right"][:self.students_per_bench]]
-                self.generate_button.config(state=tk.NORMAL)
+            self.update_generate_state(check=True)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read {position} file: {e}")
 
+    def add_roll_group(self):
+        """Another roll number list, for patterns that interleave more groups than seats per bench."""
+        name = f"Group {len(self.roll_groups) + 1}"
+        self.roll_groups.append(name)
+        self.roll_files_selected[name] = False
+        self.create_button(f"🧾 Select {name} Roll Numbers File", lambda: self.load_roll_file(name),
+                           parent=self.frame_rolls)
+        if self.pattern == "positions":
+            self.pattern = "cycle"
+            self.status_label.config(text="Group pattern set to cycle to seat every group.")
+        self.update_generate_state()
+
+    def selected_groups(self):
+        """Roll number lists to seat: one per seat position, or every loaded group with other patterns."""
+        if self.pattern == "positions":
+            return self.roll_groups[:self.students_per_bench or 0]
+        return [g for g in self.roll_groups if self.roll_files_selected[g]]
+
+    def update_generate_state(self, check=False):
+        needed = self.selected_groups()
+        if needed and all(self.roll_files_selected[pos] for pos in needed):
+            self.roll_numbers_lists = [self.roll_paths[pos] for pos in needed]
+            if check:
+                self.check_rolls(needed)
+            self.generate_button.config(state=tk.NORMAL)
+        else:
+            self.generate_button.config(state=tk.DISABLED)
+
+    def check_rolls(self, positions):
+        """Warn about duplicate, overlapping, blank or malformed roll numbers before generating."""
+        report = check_rosters({pos: self.roll_columns[pos] for pos in positions})
+        if not report.ok:
+            messagebox.showwarning("Roll Number Check", report.summary())
+
     def generate_chart(self):
         try:
+            rooms = rooms_from_layout(self.room_details_df, masks=self.blocked_seats_df)
+            plan = allocate(rooms, self.roll_numbers_lists, strategy=self.fill_strategy, seed=self.seed,
+                            pattern=self.pattern)
             wb = openpyxl.Workbook()
             for idx, row in self.room_details_df.iterrows():
                 room_number = row['Room Number']
                 benches = int(row['Number of Bench'])
                 rows = int(row['Number of Rows'])
+                spb = rooms[idx].seats_per_bench
                 ws = wb.create_sheet(title=f"Room {idx+1}")
 
                 # Calculate total columns (each bench = 3, plus 1 gap column in between)
-                total_cols = benches * (self.students_per_bench + 1) - 1
+                total_cols = benches * (spb + 1) - 1
                 merge_end = openpyxl.utils.get_column_letter(total_cols)
                 ws.merge_cells(f"A1:{merge_end}1")
                 ws['A1'] = f"ROOM {room_number}"
@@ -127,11 +190,11 @@ class SeatingChartApp:
                 # Create headers
                 col = 1
                 for b in range(benches):
-                    ws.merge_cells(start_row=2, start_column=col, end_row=2, end_column=col + 2)
+                    ws.merge_cells(start_row=2, start_column=col, end_row=2, end_column=col + spb - 1)
                     ws.cell(row=2, column=col, value=f"Row {b+1}").alignment = Alignment(horizontal='center')
                     ws.cell(row=2, column=col).font = Font(bold=True, color="FFFFFF")
                     ws.cell(row=2, column=col).fill = PatternFill(start_color="7e57c2", end_color="7e57c2", fill_type="solid")
-                    for p in range(self.students_per_bench):
+                    for p in range(spb):
                         seat_label = SEAT_POSITIONS[p]
                         ws.cell(row=3, column=col + p, value=seat_label)
                         cell = ws.cell(row=3, column=col + p)
@@ -140,39 +203,37 @@ class SeatingChartApp:
                         cell.alignment = Alignment(horizontal='center')
                         cell.border = BORDER
                     if b < benches - 1:
-                        col += self.students_per_bench + 1
+                        col += spb + 1
                     else:
-                        col += self.students_per_bench
+                        col += spb
 
-                # Fill data row-wise with alternating colors
-                indices = [0] * self.students_per_bench
+                # Fill data with alternating colors (row-wise by default)
+                labels = plan.seat_labels(idx)
                 for r in range(rows):
                     col = 1
                     for b in range(benches):
-                        for p in range(self.students_per_bench):
-                            data_list = self.roll_numbers_lists[p]
-                            value = data_list[indices[p]] if indices[p] < len(data_list) else ""
-                            ws.cell(row=4 + r, column=col + p, value=value)
+                        for p in range(spb):
+                            ws.cell(row=4 + r, column=col + p, value=labels[p, b, r])
                             cell = ws.cell(row=4 + r, column=col + p)
                             cell.alignment = Alignment(horizontal='center')
                             cell.border = BORDER
                             # Alternate row colors
-                            if (r + b) % 2 == 0:
+                            if labels[p, b, r] in MASK_LABELS:
+                                cell.fill = MASKED_FILL
+                            elif (r + b) % 2 == 0:
                                 cell.fill = PatternFill(start_color="e0f7fa", end_color="e0f7fa", fill_type="solid")
                             else:
                                 cell.fill = PatternFill(start_color="ffffff", end_color="ffffff", fill_type="solid")
-                            indices[p] += 1
                         if b < benches - 1:
-                            col += self.students_per_bench + 1
+                            col += spb + 1
                         else:
-                            col += self.students_per_bench
+                            col += spb
 
                 self.progress_var.set((idx + 1) / len(self.room_details_df) * 100)
                 self.master.update_idletasks()
 
             del wb['Sheet']
-            output_path = os.path.join(os.getcwd(), "Seating_Chart_Output.xlsx")
-            wb.save(output_path)
+            output_path = save_published(wb.save, "Seating_Chart_Output.xlsx")
             self.generated_file_path = output_path
             self.download_label.config(text=f"✔️ File generated: {output_path}")
             self.download_button.config(state=tk.NORMAL)
@@ -185,9 +246,7 @@ class SeatingChartApp:
         if self.generated_file_path:
             save_path = filedialog.asksaveasfilename(title="Save Seating Chart As", defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")])
             if save_path:
-                with open(self.generated_file_path, 'rb') as src:
-                    with open(save_path, 'wb') as dst:
-                        dst.write(src.read())
+                copy_out(self.generated_file_path, save_path)
                 messagebox.showinfo("Downloaded", f"File saved to:\n{save_path}")
 
     def open_file(self):
@@ -201,6 +260,14 @@ class SeatingChartApp:
                 messagebox.showerror("Error", f"Unable to open file: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seating chart generator")
+    parser.add_argument("--fill", choices=FILL_STRATEGIES, default=DEFAULT_FILL_STRATEGY,
+                        help="order in which seats are filled")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the shuffle fill order")
+    parser.add_argument("--pattern", type=parse_pattern, default="positions",
+                        help=f"how groups share the seats: {', '.join(GROUP_PATTERNS)}, or a tile of group "
+                             f"numbers such as '1 2 3/4 5 6'; adding a roll number group switches positions to cycle")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = SeatingChartApp(root)
+    app = SeatingChartApp(root, fill_strategy=args.fill, seed=args.seed, pattern=args.pattern)
     root.mainloop()
\ No newline at end of file
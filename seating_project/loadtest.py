@@ -0,0 +1,411 @@
+"""Load test of the seating web app against a local server and synthetic data.
+
+Writes a synthetic room layout and roll number files, starts the app on them
+(manage.py runserver by default, or any --server command such as gunicorn),
+and replays a weighted mix of requests at each concurrency level:
+
+    generate   POST run-script (the generation job runs seating_cli.py on
+               the synthetic files, through the worker pool if enabled)
+    download   GET api/plan/?all=1, the whole plan as one streamed response
+    lookup     GET api/rooms/<room>/ of a random room, revalidated by ETag
+               once the client has seen it
+    seat-map   GET seat-map/<room>.svg, revalidated the same way
+
+Every level reports throughput, p50/p95/p99 latency, error and throttled
+(429) rates per operation, and the peak resident memory of the server and
+its worker processes. A generation whose JSON body carries an "error"
+counts as failed even though run-script answered 200.
+
+    python loadtest.py --concurrency 1 4 16 --duration 30 --rooms 200
+    python loadtest.py --mix lookup=80,download=20 --json today.json --baseline last-week.json
+
+With --baseline the run exits with status 1 if any level's throughput fell,
+or its p95 latency grew, by more than --tolerance.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BASE_DIR)
+DEFAULT_MIX = "lookup=70,seat-map=15,download=10,generate=5"
+OPERATIONS = ["generate", "download", "lookup", "seat-map"]
+
+JOB_SCRIPT = '''import sys
+sys.path.insert(0, {repo_root!r})
+from seating_cli import main
+main([{layout!r}, *{rolls!r}, "--workspace", {work_dir!r}])
+'''
+
+
+def synthetic_inputs(directory, rooms=50, benches=6, rows=10, width=3, fill=0.9, seed=0):
+    """Layout and roll number files for rooms of one shape, fill of the seats taken."""
+    rng = random.Random(seed)
+    layout = pd.DataFrame({
+        'Room Number': [f"{100 + i}" for i in range(rooms)],
+        'Number of Rows': rows,
+        'Number of Bench': benches,
+        'Number of Student per Bench': width,
+        'Left Name': "Year 4", 'Middle Name': "Year 2", 'Right Name': "Year 3",
+    })
+    layout_path = os.path.join(directory, "layout.xlsx")
+    layout.to_excel(layout_path, index=False)
+
+    students = int(rooms * benches * rows * fill)
+    roll_paths = []
+    for p in range(width):
+        year = 21 + p
+        rolls = [f"0808CS{year}{k:05d}" for k in range(students)]
+        rng.shuffle(rolls)
+        path = os.path.join(directory, f"rolls_{p}.xlsx")
+        pd.DataFrame({'Roll Number': rolls}).to_excel(path, index=False)
+        roll_paths.append(path)
+    return layout_path, roll_paths, list(layout['Room Number'])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(command, env, base_url, timeout=60):
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, shell=isinstance(command, str))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with status {process.returncode}: {command}")
+        try:
+            status = Client(base_url).request("GET", "/seating/api/plan/?page_size=1")[0]
+            if status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.25)
+    process.kill()
+    raise SystemExit(f"Server did not answer within {timeout}s: {command}")
+
+
+class Client:
+    """One simulated user with its own cookies and ETags, like one browser tab.
+
+    Each request opens a new connection unless keep_alive is set: runserver
+    writes headers and body separately, and over a kept-alive connection
+    Nagle's algorithm and delayed ACKs add a flat ~40 ms to every response
+    that production servers do not have.
+    """
+
+    def __init__(self, base_url, keep_alive=False):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.keep_alive = keep_alive
+        self.connection = None
+        self.cookies = {}
+        self.etags = {}
+
+    def request(self, method, path, revalidate=False):
+        headers = {}
+        if self.cookies:
+            headers['Cookie'] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        if method == "POST" and 'csrftoken' in self.cookies:
+            headers['X-CSRFToken'] = self.cookies['csrftoken']
+        if revalidate and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=300)
+            try:
+                self.connection.request(method, path, headers=headers)
+                response = self.connection.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for key, morsel in SimpleCookie(header).items():
+                self.cookies[key] = morsel.value
+        if response.headers.get('ETag'):
+            self.etags[path] = response.headers['ETag']
+        if not self.keep_alive or response.headers.get('Connection', '').lower() == 'close':
+            self.connection.close()
+            self.connection = None
+        return response.status, body
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+def reported_error(body):
+    """Whether a JSON body carries an error; run-script reports a failed generation with 200 and {"error": ...}."""
+    try:
+        return bool(json.loads(body).get('error'))
+    except (ValueError, AttributeError):
+        return False
+
+
+def perform(client, operation, rng, rooms):
+    """Run one operation; returns its status and whether the response body reported an error."""
+    if operation == "generate":
+        if 'csrftoken' not in client.cookies:
+            client.request("GET", "/seating/")
+        status, body = client.request("POST", "/seating/run-script/")
+        return status, reported_error(body)
+    if operation == "download":
+        path, revalidate = "/seating/api/plan/?all=1", False
+    else:
+        room = rng.choice(rooms)
+        if operation == "lookup":
+            path, revalidate = f"/seating/api/rooms/{room}/", True
+        else:
+            path, revalidate = f"/seating/seat-map/{room}.svg", True
+    status, _ = client.request("GET", path, revalidate=revalidate)
+    return status, False
+
+
+def parse_mix(text):
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def process_tree_rss(pid):
+    """Resident bytes of pid and all its descendants (Linux /proc); None elsewhere."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            return sum(p.memory_info().rss for p in [root] + root.children(recursive=True))
+        except psutil.Error:
+            return None
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            continue
+        children.setdefault(int(fields['PPid']), []).append(int(entry))
+        rss[int(entry)] = int(fields.get('VmRSS', '0 kB').split()[0]) * 1024
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        total += rss.get(p, 0)
+        stack.extend(children.get(p, []))
+    return total
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.peak
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    seconds: float
+    peak_rss: object
+    operations: dict = field(default_factory=dict)
+
+    @property
+    def total(self):
+        return self.operations["all"]
+
+
+def summarize(samples, seconds):
+    """samples: (latency seconds, status, body reported an error) triples of one operation."""
+    latencies = np.array([s[0] for s in samples]) * 1000
+    statuses = np.array([s[1] for s in samples])
+    failed = np.array([s[2] for s in samples], dtype=bool)
+    errors = int(np.count_nonzero((statuses == 0) | ((statuses >= 400) & (statuses != 429)) | failed))
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(samples) else (0, 0, 0)
+    return {'requests': len(samples), 'throughput': len(samples) / seconds if seconds else 0,
+            'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+            'error_rate': errors / len(samples) if len(samples) else 0,
+            'throttled': int(np.count_nonzero(statuses == 429))}
+
+
+def run_level(base_url, concurrency, duration, mix, rooms, seed=0, server_pid=None, keep_alive=False):
+    names, weights = list(mix), list(mix.values())
+    samples = [[] for _ in range(concurrency)]
+    deadline = time.monotonic() + duration
+
+    def user(k):
+        rng = random.Random(f"{seed}-{concurrency}-{k}")
+        client = Client(base_url, keep_alive)
+        try:
+            while time.monotonic() < deadline:
+                operation = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    status, failed = perform(client, operation, rng, rooms)
+                except OSError:
+                    status, failed = 0, True
+                samples[k].append((operation, time.perf_counter() - started, status, failed))
+        finally:
+            client.close()
+
+    sampler = MemorySampler(server_pid) if server_pid else None
+    if sampler:
+        sampler.start()
+    started = time.monotonic()
+    threads = [threading.Thread(target=user, args=(k,)) for k in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds = time.monotonic() - started
+    peak = sampler.stop() if sampler else None
+
+    every = [s for per_user in samples for s in per_user]
+    result = LevelResult(concurrency, seconds, peak)
+    for operation in names:
+        result.operations[operation] = summarize([s[1:] for s in every if s[0] == operation], seconds)
+    result.operations["all"] = summarize([s[1:] for s in every], seconds)
+    return result
+
+
+def report(result):
+    memory = f"{result.peak_rss / 2**20:.0f} MB" if result.peak_rss else "n/a"
+    lines = [f"Concurrency {result.concurrency}: {result.seconds:.1f}s, server peak memory {memory}",
+             f"  {'operation':<10} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+             f"{'errors':>7} {'429s':>5}"]
+    for name, s in result.operations.items():
+        lines.append(f"  {name:<10} {s['requests']:>8} {s['throughput']:>8.1f} {s['p50_ms']:>8.1f} "
+                     f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['error_rate']:>6.1%} {s['throttled']:>5}")
+    return "\n".join(lines)
+
+
+def regressions(results, baseline, tolerance):
+    """Levels whose throughput fell or p95 latency grew by more than tolerance against baseline."""
+    before = {level['concurrency']: level['operations']['all'] for level in baseline['levels']}
+    found = []
+    for result in results:
+        old = before.get(result.concurrency)
+        if old is None:
+            continue
+        new = result.total
+        if new['throughput'] < old['throughput'] * (1 - tolerance):
+            found.append(f"concurrency {result.concurrency}: throughput "
+                         f"{old['throughput']:.1f} -> {new['throughput']:.1f} req/s")
+        if new['p95_ms'] > old['p95_ms'] * (1 + tolerance):
+            found.append(f"concurrency {result.concurrency}: p95 {old['p95_ms']:.1f} -> {new['p95_ms']:.1f} ms")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the seating web app")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="simulated users per level")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per level")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"operation weights, default {DEFAULT_MIX}")
+    parser.add_argument("--rooms", type=int, default=50, help="rooms in the synthetic layout")
+    parser.add_argument("--benches", type=int, default=6)
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--server", help="server command; {port} is replaced, default manage.py runserver")
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--keep-alive", action="store_true",
+                        help="reuse one connection per user (behind runserver this adds ~40 ms per request)")
+    parser.add_argument("--pool-size", type=int, help="SEATING_WORKER_POOL_SIZE for the started server")
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--baseline", help="results of an earlier --json run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression against --baseline")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="seating-loadtest-") as work_dir:
+        layout, rolls, rooms = synthetic_inputs(work_dir, args.rooms, args.benches, args.rows, seed=args.seed)
+        server = None
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            job_script = os.path.join(work_dir, "generate.py")
+            with open(job_script, "w") as f:
+                f.write(JOB_SCRIPT.format(repo_root=REPO_ROOT, work_dir=work_dir, layout=layout, rolls=rolls))
+            env = dict(os.environ, SEATING_LAYOUT_FILE=layout, SEATING_ROLL_FILES=os.pathsep.join(rolls),
+                       SEATING_SCRIPT=job_script)
+            if args.pool_size is not None:
+                env['SEATING_WORKER_POOL_SIZE'] = str(args.pool_size)
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            command = (args.server.format(port=port) if args.server else
+                       [sys.executable, "manage.py", "runserver", f"127.0.0.1:{port}", "--noreload"])
+            server = start_server(command, env, base_url)
+            print(f"Server on {base_url}: {len(rooms)} rooms, {len(rolls)} roll number files")
+
+        results = []
+        try:
+            for concurrency in args.concurrency:
+                result = run_level(base_url, concurrency, args.duration, args.mix, rooms, args.seed,
+                                   server.pid if server else None, args.keep_alive)
+                print(report(result))
+                results.append(result)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(10)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'mix': args.mix, 'rooms': args.rooms,
+                       'levels': [{'concurrency': r.concurrency, 'seconds': r.seconds, 'peak_rss': r.peak_rss,
+                                   'operations': r.operations} for r in results]}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"Regression: {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# seating/admission.py
+"""Admission control for generation requests.
+
+At most SEATING_MAX_CONCURRENT_JOBS generations run at once, and the summed
+estimated cost of running jobs stays under SEATING_MAX_RUNNING_COST. Other
+requests wait in one queue per user, served round-robin so a coordinator
+who fires twenty requests does not starve everyone else. When the queue is
+full, or a request waits longer than SEATING_QUEUE_TIMEOUT, the caller gets
+QueueFull with its queue position and a Retry-After hint instead.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+
+class QueueFull(Exception):
+    def __init__(self, position, retry_after, message="Generation queue is full"):
+        super().__init__(message)
+        self.position = position
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ("id", "user", "cost", "granted", "started")
+
+    def __init__(self, ticket_id, user, cost):
+        self.id = ticket_id
+        self.user = user
+        self.cost = cost
+        self.granted = False
+        self.started = None
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent=2, max_cost=None, max_queue=50, max_queue_per_user=5):
+        self.max_concurrent = max_concurrent
+        self.max_cost = max_cost
+        self.max_queue = max_queue
+        self.max_queue_per_user = max_queue_per_user
+        self._queues = OrderedDict()  # user -> deque of tickets, in round-robin order
+        self._running = 0
+        self._running_cost = 0
+        self._queued = 0
+        self._avg_seconds = 5.0
+        self._ids = itertools.count()
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def admit(self, user, cost=1, timeout=None):
+        """Hold a generation slot for the duration of the with block."""
+        ticket = self._enqueue(user, cost)
+        try:
+            self._wait(ticket, timeout)
+            yield
+        finally:
+            self._release(ticket)
+
+    def status(self):
+        with self._cond:
+            return {'running': self._running, 'running_cost': self._running_cost,
+                    'queued': self._queued, 'users_waiting': len(self._queues)}
+
+    def _enqueue(self, user, cost):
+        with self._cond:
+            waiting = self._queues.get(user)
+            user_waiting = len(waiting) if waiting else 0
+            if self._queued >= self.max_queue or user_waiting >= self.max_queue_per_user:
+                position = self._position(user, user_waiting)
+                raise QueueFull(position, self._retry_after(position))
+            ticket = _Ticket(next(self._ids), user, cost)
+            self._queues.setdefault(user, deque()).append(ticket)
+            self._queued += 1
+            self._dispatch()
+            return ticket
+
+    def _wait(self, ticket, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    position = self._position(ticket.user, self._queues[ticket.user].index(ticket))
+                    raise QueueFull(position, self._retry_after(position),
+                                    "Timed out waiting for a generation slot")
+                self._cond.wait(remaining)
+
+    def _release(self, ticket):
+        with self._cond:
+            if ticket.granted:
+                self._running -= 1
+                self._running_cost -= ticket.cost
+                elapsed = time.monotonic() - ticket.started
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+            else:
+                waiting = self._queues.get(ticket.user)
+                if waiting and ticket in waiting:
+                    waiting.remove(ticket)
+                    self._queued -= 1
+                    if not waiting:
+                        del self._queues[ticket.user]
+            self._dispatch()
+
+    def _dispatch(self):
+        """Grant slots round-robin across users while capacity allows."""
+        granted = False
+        while self._queues and self._running < self.max_concurrent:
+            user, waiting = next(iter(self._queues.items()))
+            ticket = waiting[0]
+            # A job costlier than the whole budget may still run alone.
+            over_budget = (self.max_cost is not None and self._running
+                           and self._running_cost + ticket.cost > self.max_cost)
+            if over_budget:
+                break
+            waiting.popleft()
+            self._queued -= 1
+            del self._queues[user]
+            if waiting:
+                self._queues[user] = waiting  # back of the round-robin order
+            ticket.granted = True
+            ticket.started = time.monotonic()
+            self._running += 1
+            self._running_cost += ticket.cost
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _position(self, user, index):
+        """1-based place in the round-robin order of the index-th waiting ticket of user."""
+        ahead = index
+        before_user = True
+        for other, waiting in self._queues.items():
+            if other == user:
+                before_user = False
+                continue
+            ahead += min(len(waiting), index + 1 if before_user else index)
+        return ahead + 1
+
+    def _retry_after(self, position):
+        slots = max(self.max_concurrent, 1)
+        return max(1, int(round(self._avg_seconds * (position / slots + 1))))
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    global _controller
+    from django.conf import settings
+
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                max_concurrent=settings.SEATING_MAX_CONCURRENT_JOBS,
+                max_cost=settings.SEATING_MAX_RUNNING_COST,
+                max_queue=settings.SEATING_MAX_QUEUE,
+                max_queue_per_user=settings.SEATING_MAX_QUEUE_PER_USER)
+        return _controller
@@ -0,0 +1,179 @@
+# seating/seat_map.py
+"""Server-side seat maps for the web app.
+
+The plan is allocated from SEATING_LAYOUT_FILE and SEATING_ROLL_FILES and
+kept in memory until one of those files changes; its version is the
+fingerprint of the inputs (checkpoint.fingerprint), so it only changes when
+the seating does. Each room renders to a standalone SVG, built by joining
+strings, and is stored in Django's cache under the plan version, so a room
+is rendered once per plan no matter how many invigilators open it. The
+JSON API serves rooms the same way (room_json / cached_room_json).
+job_cost() sizes a generation of the same inputs for admission control.
+Inputs that cannot be read raise PlanUnavailable, which views answer with
+a 503 instead of letting the error take the request down.
+"""
+
+import json
+import math
+import os
+import threading
+import zipfile
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+CELL_WIDTH = 96
+CELL_HEIGHT = 26
+BENCH_GAP = 14
+HEADER_HEIGHT = 26
+ROW_LABEL_WIDTH = 44
+FONT = "font-family='Arial, sans-serif' font-size='11' text-anchor='middle'"
+
+_plan = None
+_plan_key = None
+_plan_modified = None
+_plan_lock = threading.Lock()
+_job_cost = (None, None)
+
+
+class PlanUnavailable(Exception):
+    """The configured layout or roll number files cannot be read into a plan."""
+
+
+def _input_files():
+    from django.conf import settings
+
+    return [str(settings.SEATING_LAYOUT_FILE)] + [str(path) for path in settings.SEATING_ROLL_FILES]
+
+
+def current_plan():
+    """(plan, version) for the configured inputs, reallocated when any input file changes.
+
+    Raises PlanUnavailable when an input is missing or malformed.
+    """
+    global _plan, _plan_key, _plan_modified
+    from django.conf import settings
+
+    files = _input_files()
+    try:
+        key = tuple((path, os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in files)
+    except OSError as e:
+        raise PlanUnavailable(f"Cannot read the seating inputs: {e}") from e
+    with _plan_lock:
+        if key != _plan_key:
+            from checkpoint import fingerprint
+            from roster_ingest import read_roster
+            from seat_plan import (allocate, load_layout, load_masks, max_seats_per_bench, parse_pattern,
+                                   rooms_from_layout)
+
+            try:
+                layout = load_layout(files[0])
+                rooms = rooms_from_layout(layout, masks=load_masks(files[0]))
+                pattern = parse_pattern(settings.SEATING_GROUP_PATTERN)
+                groups = max_seats_per_bench(layout) if pattern == "positions" else len(files) - 1
+                rosters = [read_roster(path).rolls() for path in files[1:1 + groups]]
+            except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+                raise PlanUnavailable(f"Cannot read the seating inputs: {e}") from e
+            strategy, seed = settings.SEATING_FILL_STRATEGY, settings.SEATING_SEED
+            plan = allocate(rooms, rosters, strategy=strategy, seed=seed, pattern=pattern)
+            _plan = (plan, fingerprint(rooms, rosters, strategy, seed, pattern)[:16])
+            _plan_key = key
+            _plan_modified = datetime.fromtimestamp(max(mtime for _, mtime, _ in key) / 1e9, tz=timezone.utc)
+        return _plan
+
+
+def plan_modified():
+    """When the newest input file of the current plan was last changed."""
+    current_plan()
+    return _plan_modified
+
+
+def job_cost():
+    """Estimated peak memory, in MiB, of generating the configured inputs (size_estimator.estimate)."""
+    global _job_cost
+    plan, version = current_plan()
+    if _job_cost[0] != version:
+        from size_estimator import estimate
+
+        estimated = estimate(plan.rooms, plan.rosters, pattern=plan.pattern)
+        _job_cost = (version, max(1, math.ceil(estimated.peak_bytes[estimated.engine] / 1024 ** 2)))
+    return _job_cost[1]
+
+
+def room_svg(plan, room_index):
+    """SVG of one room: benches side by side, seat positions across, rows down."""
+    from seat_plan import MASK_LABELS, SEAT_POSITIONS
+
+    room = plan.rooms[room_index]
+    width = room.seats_per_bench
+    labels = plan.seat_labels(room_index)
+    bench_width = width * CELL_WIDTH
+    total_width = ROW_LABEL_WIDTH + room.benches * (bench_width + BENCH_GAP)
+    total_height = 2 * HEADER_HEIGHT + room.rows * CELL_HEIGHT + 2
+
+    parts = [f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {total_width} {total_height}' "
+             f"width='100%' role='img' aria-label='Seat map of room {escape(str(room.number))}'>"]
+    for r in range(room.rows):
+        y = 2 * HEADER_HEIGHT + r * CELL_HEIGHT
+        parts.append(f"<text x='{ROW_LABEL_WIDTH // 2}' y='{y + 17}' {FONT} fill='#555'>{r + 1}</text>")
+    for b in range(room.benches):
+        x0 = ROW_LABEL_WIDTH + b * (bench_width + BENCH_GAP)
+        parts.append(f"<rect x='{x0}' y='0' width='{bench_width}' height='{HEADER_HEIGHT}' fill='#7e57c2'/>"
+                     f"<text x='{x0 + bench_width // 2}' y='17' {FONT} fill='#fff' font-weight='bold'>"
+                     f"Row {b + 1}</text>")
+        for p in range(width):
+            x = x0 + p * CELL_WIDTH
+            parts.append(f"<rect x='{x}' y='{HEADER_HEIGHT}' width='{CELL_WIDTH}' height='{HEADER_HEIGHT}' "
+                         f"fill='#D1C4E9' stroke='#999'/><text x='{x + CELL_WIDTH // 2}' y='{HEADER_HEIGHT + 17}' "
+                         f"{FONT} font-weight='bold'>{SEAT_POSITIONS[p]}</text>")
+            for r in range(room.rows):
+                y = 2 * HEADER_HEIGHT + r * CELL_HEIGHT
+                if labels[p, b, r] in MASK_LABELS:
+                    fill = "#bdbdbd"
+                else:
+                    fill = "#e0f7fa" if (r + b) % 2 == 0 else "#ffffff"
+                parts.append(f"<rect x='{x}' y='{y}' width='{CELL_WIDTH}' height='{CELL_HEIGHT}' "
+                             f"fill='{fill}' stroke='#999'/><text x='{x + CELL_WIDTH // 2}' y='{y + 17}' "
+                             f"{FONT}>{escape(str(labels[p, b, r]))}</text>")
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def cached_room_svg(plan, version, room_index):
+    from django.core.cache import cache
+
+    key = f"seat-map:{version}:{room_index}"
+    svg = cache.get(key)
+    if svg is None:
+        svg = room_svg(plan, room_index)
+        cache.set(key, svg, None)
+    return svg
+
+
+def room_json(plan, room_index):
+    """JSON object of one room with every seated student, by seat position, bench and row, and their group."""
+    from seat_plan import SEAT_POSITIONS
+
+    room = plan.rooms[room_index]
+    ids = plan.grid(room_index)
+    p, b, r = np.nonzero(ids >= 0)
+    rolls = plan.roll_numbers[ids[p, b, r]]
+    groups = np.searchsorted(plan.offsets, ids[p, b, r], side='right')
+    seats = [{'roll_number': str(roll), 'position': SEAT_POSITIONS[pos], 'bench': int(bench) + 1, 'row': int(row) + 1,
+              'group': int(group)}
+             for roll, pos, bench, row, group in zip(rolls, p, b, r, groups)]
+    return json.dumps({'room': str(room.number), 'benches': room.benches, 'rows': room.rows,
+                       'seats_per_bench': room.seats_per_bench, 'usable_seats': room.usable_seats,
+                       'seated': len(seats), 'seats': seats})
+
+
+def cached_room_json(plan, version, room_index):
+    from django.core.cache import cache
+
+    key = f"seat-json:{version}:{room_index}"
+    text = cache.get(key)
+    if text is None:
+        text = room_json(plan, room_index)
+        cache.set(key, text, None)
+    return text
@@ -1,3 +1,107 @@
-from django.test import TestCase
+import os
+import tempfile
 
-# Create your tests here.
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from .admission import AdmissionController, QueueFull
+from .seat_map import PlanUnavailable, current_plan, job_cost
+
+
+class AdmissionTests(SimpleTestCase):
+    def test_users_take_turns(self):
+        controller = AdmissionController(max_concurrent=1)
+        running = controller._enqueue("a", 1)
+        a2, a3 = controller._enqueue("a", 1), controller._enqueue("a", 1)
+        b1 = controller._enqueue("b", 1)
+        self.assertTrue(running.granted)
+        controller._release(running)
+        self.assertTrue(a2.granted)
+        controller._release(a2)
+        self.assertTrue(b1.granted)
+        self.assertFalse(a3.granted)
+
+    def test_running_cost_is_capped(self):
+        controller = AdmissionController(max_concurrent=4, max_cost=100)
+        first, second = controller._enqueue("a", 60), controller._enqueue("b", 60)
+        self.assertTrue(first.granted)
+        self.assertFalse(second.granted)
+        small = controller._enqueue("c", 30)
+        self.assertFalse(small.granted)  # no overtaking the head of the queue
+        controller._release(first)
+        self.assertTrue(second.granted)
+        self.assertTrue(small.granted)
+
+    def test_job_over_the_budget_runs_alone(self):
+        controller = AdmissionController(max_concurrent=2, max_cost=100)
+        big = controller._enqueue("a", 500)
+        self.assertTrue(big.granted)
+        self.assertFalse(controller._enqueue("b", 1).granted)
+
+    def test_full_user_queue_is_refused(self):
+        controller = AdmissionController(max_concurrent=1, max_queue_per_user=1)
+        controller._enqueue("a", 1)
+        controller._enqueue("a", 1)
+        with self.assertRaises(QueueFull) as caught:
+            controller._enqueue("a", 1)
+        self.assertEqual(caught.exception.position, 2)
+
+
+class JobCostTests(SimpleTestCase):
+    def test_cost_is_estimated_peak_memory(self):
+        from size_estimator import estimate
+
+        plan, _ = current_plan()
+        estimated = estimate(plan.rooms, plan.rosters, pattern=plan.pattern)
+        self.assertEqual(job_cost(), -(-estimated.peak_bytes[estimated.engine] // 1024 ** 2))
+
+    def test_malformed_roster_still_runs_the_job(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bad, script = os.path.join(tmp, "bad.xlsx"), os.path.join(tmp, "generate.py")
+            pd.DataFrame({'Name': ["A", "B"]}).to_excel(bad, index=False)
+            with open(script, "w") as f:
+                f.write("import sys\nsys.exit('bad.xlsx: missing roll numbers')\n")
+            with override_settings(SEATING_ROLL_FILES=[bad] * 3, SEATING_SCRIPT=script, SEATING_WORKER_POOL_SIZE=0):
+                with self.assertRaises(PlanUnavailable):
+                    job_cost()
+                response = self.client.post(reverse('run_script'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("missing roll numbers", response.json()['error'])
+
+
+class ConditionalGetTests(SimpleTestCase):
+    def room(self):
+        plan, _ = current_plan()
+        return str(plan.rooms[0].number)
+
+    def assert_revalidates(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_room_svg(self):
+        self.assert_revalidates(reverse('room_svg', args=[self.room()]))
+
+    def test_room_api(self):
+        self.assert_revalidates(reverse('room_api', args=[self.room()]))
+
+    def test_plan_api_etag_follows_the_query(self):
+        url = reverse('plan_api')
+        etag = self.client.get(url, {'page_size': 1})['ETag']
+        self.assertEqual(self.client.get(url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, {'page_size': 2}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class PlanUnavailableTests(SimpleTestCase):
+    def test_malformed_roster_is_a_503(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bad = os.path.join(tmp, "bad.xlsx")
+            pd.DataFrame({'Name': ["A", "B"]}).to_excel(bad, index=False)
+            with override_settings(SEATING_ROLL_FILES=[bad] * 3):
+                for name in ('plan_api', 'seat_map'):
+                    response = self.client.get(reverse(name))
+                    self.assertEqual(response.status_code, 503)
+                    self.assertIn("missing 'Roll Number' column", response.json()['error'])
@@ -2,10 +2,14 @@
 
 from django.urls import path
 from . import views
-from .views import seating_view, run_script
+from .views import seating_view, run_script, seat_map_view, room_svg_view, plan_api, room_api
 
 urlpatterns = [
     path('', views.seating_view, name='seating-home'),  
     path('run-script/', run_script, name='run_script'),  
+    path('seat-map/', seat_map_view, name='seat_map'),
+    path('seat-map/<str:room>.svg', room_svg_view, name='room_svg'),
+    path('api/plan/', plan_api, name='plan_api'),
+    path('api/rooms/<str:room>/', room_api, name='room_api'),
 
 ]
@@ -1,22 +1,163 @@
 # seating/views.py
 import subprocess
+import sys
+import zlib
+from concurrent.futures import TimeoutError
+from functools import wraps
+from django.conf import settings
+from django.core.paginator import Paginator
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from .admission import QueueFull, get_controller
+from .seat_map import PlanUnavailable, cached_room_json, cached_room_svg, current_plan, job_cost, plan_modified
+from .worker_pool import get_pool
 
 def seating_view(request):
     return render(request, 'seating/index.html') 
 
+def _requester(request):
+    """Key used for per-user fairness: the username, or the client address."""
+    if request.user.is_authenticated:
+        return request.user.get_username()
+    return request.META.get('REMOTE_ADDR', '')
+
+def _run_generation():
+    timeout = settings.SEATING_JOB_TIMEOUT
+    pool = get_pool()
+    try:
+        if pool is not None:
+            return JsonResponse(pool.run(settings.SEATING_SCRIPT, args=settings.SEATING_SCRIPT_ARGS,
+                                         cwd=str(settings.BASE_DIR), timeout=timeout))
+        result = subprocess.run(
+            [sys.executable, str(settings.SEATING_SCRIPT)] + list(settings.SEATING_SCRIPT_ARGS),
+            cwd=str(settings.BASE_DIR),
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=timeout
+        )
+        return JsonResponse({'output': result.stdout, 'error': None})
+    except subprocess.CalledProcessError as e:
+        return JsonResponse({'output': None, 'error': e.stderr})
+    except (TimeoutError, subprocess.TimeoutExpired):
+        return JsonResponse({'output': None, 'error': f"Generation did not finish within {timeout}s"}, status=504)
+
 def run_script(request):
     if request.method == "POST":
         try:
-           
-            result = subprocess.run(
-                ['python', 'aarna.py'],  
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return JsonResponse({'output': result.stdout, 'error': None})
-        except subprocess.CalledProcessError as e:
-            return JsonResponse({'output': None, 'error': e.stderr})
\ No newline at end of file
+            cost = job_cost()
+        except PlanUnavailable:
+            cost = 1  # unreadable inputs: the job itself reports why
+        try:
+            with get_controller().admit(_requester(request), cost=cost,
+                                        timeout=settings.SEATING_QUEUE_TIMEOUT):
+                return _run_generation()
+        except QueueFull as e:
+            response = JsonResponse({'output': None, 'error': str(e),
+                                     'queue_position': e.position, 'retry_after': e.retry_after},
+                                    status=429)
+            response['Retry-After'] = str(e.retry_after)
+            return response
+
+def _plan_required(view):
+    """Answer 503 with the reason when the seating inputs cannot be read, ETag checks included."""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except PlanUnavailable as e:
+            return JsonResponse({'error': str(e)}, status=503)
+    return wrapped
+
+def _seat_map_etag(request):
+    _, version = current_plan()
+    return f"{version}-{request.GET.get('page', '1')}-{settings.SEATING_MAP_ROOMS_PER_PAGE}"
+
+def _room_svg_etag(request, room):
+    _, version = current_plan()
+    return f"{version}-{room}"
+
+def _room_index(plan, room):
+    for i, candidate in enumerate(plan.rooms):
+        if str(candidate.number) == room:
+            return i
+    raise Http404(f"No room {room} in the current seating plan")
+
+@_plan_required
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_seat_map_etag)
+def seat_map_view(request):
+    """Seat maps of a page of rooms; clients revalidate with the plan's ETag."""
+    plan, version = current_plan()
+    page = Paginator(range(len(plan.rooms)), settings.SEATING_MAP_ROOMS_PER_PAGE).get_page(request.GET.get('page'))
+    rooms = [{'number': plan.rooms[i].number, 'svg': cached_room_svg(plan, version, i)} for i in page]
+    return render(request, 'seating/seat_map.html',
+                  {'page': page, 'rooms': rooms, 'all_rooms': [room.number for room in plan.rooms]})
+
+@_plan_required
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_room_svg_etag)
+def room_svg_view(request, room):
+    plan, version = current_plan()
+    return HttpResponse(cached_room_svg(plan, version, _room_index(plan, room)), content_type='image/svg+xml')
+
+def _last_modified(request, *args, **kwargs):
+    return plan_modified()
+
+def _api_etag(request, room=None):
+    _, version = current_plan()
+    if room is not None:
+        return f"{version}-{room}"
+    query = "&".join(f"{key}={request.GET[key]}" for key in sorted(request.GET))
+    return f"{version}-{zlib.crc32(query.encode()):08x}"
+
+def _api_rooms(request, plan):
+    """Room indices selected by ?from=<room>&to=<room> (inclusive, layout order)."""
+    first = _room_index(plan, request.GET['from']) if 'from' in request.GET else 0
+    last = _room_index(plan, request.GET['to']) if 'to' in request.GET else len(plan.rooms) - 1
+    return range(first, last + 1)
+
+def _stream_rooms(plan, version, indices):
+    yield f'{{"version": "{version}", "count": {len(indices)}, "rooms": ['
+    for n, i in enumerate(indices):
+        yield ("," if n else "") + cached_room_json(plan, version, i)
+    yield "]}"
+
+@_plan_required
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_api_etag, last_modified_func=_last_modified)
+def plan_api(request):
+    """Rooms of the current plan as JSON, a page at a time, or all of them with ?all=1.
+
+    ?from=<room>&to=<room> limits the result to a range of rooms in layout order;
+    ?page and ?page_size (up to SEATING_API_MAX_PAGE_SIZE) pick the page.
+    """
+    plan, version = current_plan()
+    indices = _api_rooms(request, plan)
+    if request.GET.get('all') == '1':
+        return StreamingHttpResponse(_stream_rooms(plan, version, indices), content_type='application/json')
+    try:
+        page_size = min(int(request.GET.get('page_size', settings.SEATING_API_PAGE_SIZE)),
+                        settings.SEATING_API_MAX_PAGE_SIZE)
+    except ValueError:
+        page_size = settings.SEATING_API_PAGE_SIZE
+    page = Paginator(indices, max(page_size, 1)).get_page(request.GET.get('page'))
+    rooms = ",".join(cached_room_json(plan, version, i) for i in page)
+    body = (f'{{"version": "{version}", "count": {len(indices)}, "page": {page.number}, '
+            f'"num_pages": {page.paginator.num_pages}, "rooms": [{rooms}]}}')
+    return HttpResponse(body, content_type='application/json')
+
+@_plan_required
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_api_etag, last_modified_func=_last_modified)
+def room_api(request, room):
+    plan, version = current_plan()
+    return HttpResponse(cached_room_json(plan, version, _room_index(plan, room)), content_type='application/json')
@@ -0,0 +1,251 @@
+# seating/worker_pool.py
+"""Long-lived generation workers for the run-script view.
+
+Starting `python seating_cli.py` per request pays for importing numpy,
+pandas, openpyxl and the seating modules every time. A GenerationPool keeps
+SEATING_WORKER_POOL_SIZE worker processes alive with those modules already
+imported and runs the script in-process with runpy. Scripts must be
+headless: a GUI's mainloop would hold its worker until the job times out. The parent hands each job to an idle worker over that
+worker's own pipe and records which job it holds, so a worker that dies,
+whenever it dies, fails exactly its own job. A worker retires after
+SEATING_WORKER_MAX_JOBS jobs and is replaced, which keeps memory growth in
+check. run() gives up on a job after its timeout and stops the worker
+holding it.
+
+Workers are started with the "spawn" method so the pool behaves the same on
+Windows and Linux, and this module must not import Django at top level:
+spawned children import it before Django is configured.
+"""
+
+import atexit
+import contextlib
+import importlib
+import io
+import itertools
+import multiprocessing as mp
+import multiprocessing.connection as mp_connection
+import os
+import runpy
+import sys
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+
+DEFAULT_PRELOAD = ["numpy", "pandas", "openpyxl", "seat_plan", "chart_render", "size_estimator", "seating_cli"]
+
+
+def _run_script(script, args, cwd):
+    """Run a generation script as __main__ and capture what it prints."""
+    out, err = io.StringIO(), io.StringIO()
+    saved_argv, saved_cwd = sys.argv, os.getcwd()
+    sys.argv = [script] + list(args)
+    try:
+        if cwd:
+            os.chdir(cwd)
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            err.write(f"{e.code}\n" if not isinstance(e.code, int) else f"exit status {e.code}\n")
+    except BaseException:
+        err.write(traceback.format_exc())
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+    error = err.getvalue()
+    return {'output': out.getvalue(), 'error': error or None}
+
+
+def _worker_main(conn, preload, max_jobs):
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    try:
+        for _ in range(max_jobs):
+            job = conn.recv()
+            if job is None:
+                break
+            job_id, script, args, cwd = job
+            conn.send(("done", job_id, _run_script(script, args, cwd)))
+        conn.send(("exit", None, None))
+    except (EOFError, OSError):
+        pass
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "job_id", "served")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.job_id = None
+        self.served = 0
+
+
+class GenerationPool:
+    def __init__(self, size=2, max_jobs_per_worker=50, preload=DEFAULT_PRELOAD, context="spawn"):
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.preload = list(preload)
+        self._ctx = mp.get_context(context)
+        self._workers = {}
+        self._pending = deque()
+        self._futures = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._collector = None
+
+    def start(self):
+        with self._lock:
+            for _ in range(self.size - len(self._workers)):
+                self._spawn()
+        self._collector = threading.Thread(target=self._collect, name="generation-pool", daemon=True)
+        self._collector.start()
+        return self
+
+    def submit(self, script, args=(), cwd=None):
+        """Queue a script run; the Future resolves to {'output': ..., 'error': ...}."""
+        if self._closed:
+            raise RuntimeError("Generation pool is shut down")
+        future = Future()
+        future.job_id = next(self._ids)
+        with self._lock:
+            self._futures[future.job_id] = future
+            self._pending.append((future.job_id, str(script), list(args), cwd))
+            self._dispatch()
+        return future
+
+    def run(self, script, args=(), cwd=None, timeout=None):
+        """submit() and wait; after timeout seconds the job is dropped and TimeoutError raised."""
+        future = self.submit(script, args, cwd)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            self._abandon(future.job_id)
+            raise
+
+    def shutdown(self, timeout=5):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers.values())
+            pending, self._pending = self._pending, deque()
+            for job_id, *_ in pending:
+                self._fail(job_id, "Generation pool is shut down")
+        for worker in workers:
+            with contextlib.suppress(OSError):
+                worker.conn.send(None)
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def _spawn(self):
+        # One pipe per worker: a worker that dies mid-send can only break its own pipe,
+        # where a shared queue's lock would be left held for every other worker.
+        worker_id = next(self._ids)
+        conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=_worker_main, name=f"generation-worker-{worker_id}", daemon=True,
+                                    args=(child_conn, self.preload, self.max_jobs_per_worker))
+        process.start()
+        child_conn.close()
+        self._workers[worker_id] = _Worker(process, conn)
+
+    def _dispatch(self):
+        """Hand pending jobs to idle workers; called with the lock held."""
+        for worker in self._workers.values():
+            if not self._pending:
+                return
+            if worker.job_id is None and worker.served < self.max_jobs_per_worker:
+                job = self._pending.popleft()
+                try:
+                    worker.conn.send(job)
+                except OSError:
+                    self._pending.appendleft(job)  # the worker is gone; _reap replaces it
+                    continue
+                worker.job_id = job[0]
+                worker.served += 1
+
+    def _fail(self, job_id, error):
+        future = self._futures.pop(job_id, None)
+        if future:
+            future.set_result({'output': None, 'error': error})
+
+    def _abandon(self, job_id):
+        """Forget a job run() gave up on, stopping the worker that holds it."""
+        with self._lock:
+            self._futures.pop(job_id, None)
+            for k, job in enumerate(self._pending):
+                if job[0] == job_id:
+                    del self._pending[k]
+                    return
+            for worker in self._workers.values():
+                if worker.job_id == job_id:
+                    worker.process.terminate()
+                    return
+
+    def _collect(self):
+        while not self._closed:
+            with self._lock:
+                waitables = {}
+                for worker_id, worker in self._workers.items():
+                    waitables[worker.conn] = worker_id
+                    waitables[worker.process.sentinel] = worker_id
+            ready = mp_connection.wait(list(waitables), timeout=0.5)
+            with self._lock:
+                for worker_id in {waitables[r] for r in ready}:
+                    self._receive(worker_id)
+                self._dispatch()
+
+    def _receive(self, worker_id):
+        """Handle what worker_id sent; replace it if it exited, failing the job it still held."""
+        worker = self._workers.get(worker_id)
+        if worker is None:
+            return
+        exited = False
+        try:
+            while worker.conn.poll():
+                kind, job_id, result = worker.conn.recv()
+                if kind == "exit":
+                    exited = True
+                    break
+                worker.job_id = None
+                future = self._futures.pop(job_id, None)
+                if future:
+                    future.set_result(result)
+        except (EOFError, OSError):
+            exited = True
+        if not exited and worker.process.is_alive():
+            return
+        del self._workers[worker_id]
+        worker.process.join(1)
+        worker.conn.close()
+        if worker.job_id is not None:
+            self._fail(worker.job_id, f"Generation worker exited with code {worker.process.exitcode}")
+        if not self._closed:
+            self._spawn()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide pool, started from settings on first use; None if disabled."""
+    global _pool
+    from django.conf import settings
+
+    size = getattr(settings, "SEATING_WORKER_POOL_SIZE", 0)
+    if size <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = GenerationPool(size=size,
+                                   max_jobs_per_worker=getattr(settings, "SEATING_WORKER_MAX_JOBS", 50),
+                                   preload=getattr(settings, "SEATING_WORKER_PRELOAD", DEFAULT_PRELOAD))
+            _pool.start()
+            atexit.register(_pool.shutdown)
+        return _pool
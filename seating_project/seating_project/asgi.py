@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "seating_project.settings")
 
 application = get_asgi_application()
+
+# Warm the generation pool with the server rather than on the first request.
+# Only server entry points do this (runserver loads this module too), so
+# management commands, tests and scripts calling django.setup() start no workers.
+from seating.worker_pool import get_pool  # noqa: E402
+
+get_pool()
@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The seat planning modules (seat_plan, chart_render, ...) live in the repository root.
+REPO_ROOT = BASE_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
@@ -123,3 +130,67 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Seating generation
+# Script run by the run-script view, and the warm worker pool that runs it
+# (seating.worker_pool). It runs with no display, so it must be headless; the
+# default generates the seat-map inputs below with seating_cli (see
+# SEATING_SCRIPT_ARGS). A pool size of 0 falls back to one subprocess per request.
+
+SEATING_SCRIPT = os.environ.get("SEATING_SCRIPT", REPO_ROOT / "seating_cli.py")
+
+SEATING_WORKER_POOL_SIZE = int(os.environ.get("SEATING_WORKER_POOL_SIZE", 2))
+
+SEATING_WORKER_MAX_JOBS = int(os.environ.get("SEATING_WORKER_MAX_JOBS", 50))
+
+# Seconds a generation may run before the request fails and its worker is stopped
+SEATING_JOB_TIMEOUT = int(os.environ.get("SEATING_JOB_TIMEOUT", 300))
+
+# Admission control for generation requests (seating.admission): concurrent
+# jobs, summed job cost, and how many requests may wait, overall and per user.
+# A job costs its estimated peak memory in MiB (seating.seat_map.job_cost), so
+# SEATING_MAX_RUNNING_COST is the memory running generations may take together.
+
+SEATING_MAX_CONCURRENT_JOBS = int(os.environ.get("SEATING_MAX_CONCURRENT_JOBS", SEATING_WORKER_POOL_SIZE or 2))
+
+SEATING_MAX_RUNNING_COST = int(os.environ.get("SEATING_MAX_RUNNING_COST", 2048))
+
+SEATING_MAX_QUEUE = int(os.environ.get("SEATING_MAX_QUEUE", 50))
+
+SEATING_MAX_QUEUE_PER_USER = int(os.environ.get("SEATING_MAX_QUEUE_PER_USER", 5))
+
+SEATING_QUEUE_TIMEOUT = int(os.environ.get("SEATING_QUEUE_TIMEOUT", 120))
+
+# Plan shown by the seat-map pages (seating.seat_map): reallocated whenever
+# one of these files changes. Roll number files are in seat position order.
+
+SEATING_LAYOUT_FILE = os.environ.get("SEATING_LAYOUT_FILE", REPO_ROOT / "excel sheet.xlsx")
+
+SEATING_ROLL_FILES = (os.environ["SEATING_ROLL_FILES"].split(os.pathsep) if "SEATING_ROLL_FILES" in os.environ
+                      else [REPO_ROOT / "Year 4.xlsx", REPO_ROOT / "Year 2.xlsx", REPO_ROOT / "Year 3.xlsx"])
+
+SEATING_FILL_STRATEGY = os.environ.get("SEATING_FILL_STRATEGY", "column-major")
+
+SEATING_SEED = int(os.environ.get("SEATING_SEED", 0))
+
+# How the roll number files share the seats: "positions" (one file per seat
+# position), "cycle", "diagonal" or a tile such as "1 2 3/4 5 6" (seat_plan).
+
+SEATING_GROUP_PATTERN = os.environ.get("SEATING_GROUP_PATTERN", "positions")
+
+SEATING_MAP_ROOMS_PER_PAGE = int(os.environ.get("SEATING_MAP_ROOMS_PER_PAGE", 5))
+
+# Command-line arguments for SEATING_SCRIPT (space separated in the environment).
+# The default seats the plan above and publishes it as a run under outputs/.
+
+SEATING_SCRIPT_ARGS = (os.environ["SEATING_SCRIPT_ARGS"].split() if "SEATING_SCRIPT_ARGS" in os.environ
+                       else [] if "SEATING_SCRIPT" in os.environ
+                       else [str(SEATING_LAYOUT_FILE)] + [str(path) for path in SEATING_ROLL_FILES]
+                       + ["--fill", SEATING_FILL_STRATEGY, "--seed", str(SEATING_SEED),
+                          "--pattern", SEATING_GROUP_PATTERN, "--workspace"])
+
+# JSON plan API (seating.views.plan_api): rooms per page by default and at most.
+
+SEATING_API_PAGE_SIZE = int(os.environ.get("SEATING_API_PAGE_SIZE", 50))
+
+SEATING_API_MAX_PAGE_SIZE = int(os.environ.get("SEATING_API_MAX_PAGE_SIZE", 500))
@@ -0,0 +1,219 @@
+"""Pre-flight size estimate, rendering engine choice and memory guard.
+
+estimate() works out from the layout and roster sizes alone how many cells a
+run writes, how large the workbook gets and how much memory each rendering
+engine needs, then picks one:
+
+    memory     build_workbook(): the whole workbook in memory (fastest)
+    streaming  stream_workbook(): write-only, one row in memory at a time
+    sharded    save_sharded(): streaming, split over several workbooks
+
+render() runs the chosen engine and, with guard=True, does so under a
+tracemalloc-based MemoryGuard that falls back to the next engine if the guard
+trips before the limit is hit. Tracing every allocation makes rendering
+several times slower, so the guard is only for runs given an explicit limit.
+"""
+
+import gc
+import os
+import tracemalloc
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from chart_render import INDEX_BLOCK_ROWS, build_workbook, save_sharded, stream_workbook
+from seat_plan import room_takes
+
+ENGINES = ["memory", "streaming", "sharded"]
+
+# Measured with tracemalloc on openpyxl 3.1 and roll numbers like 0808CS221001
+MEMORY_BYTES_PER_CELL = 400
+FILE_BYTES_PER_CELL = 8
+STRING_BYTES = 120
+BASE_BYTES = 32 * 1024 ** 2
+DEFAULT_MAX_FILE_BYTES = 200 * 1024 ** 2
+
+
+def parse_size(text):
+    """'512M', '2G', '1500000' -> bytes."""
+    text = str(text).strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def format_size(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def default_memory_limit():
+    """Half of physical memory, or None where the platform does not tell."""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+@dataclass
+class SizeEstimate:
+    rooms: int
+    seats: int
+    students: int
+    seated: int
+    cells: int
+    sheet_bytes: int
+    peak_bytes: dict
+    memory_limit: object
+    engine: str
+    shards: list = field(default_factory=list)
+
+    def summary(self):
+        limit = format_size(self.memory_limit) if self.memory_limit else "none"
+        lines = [
+            f"Rooms:            {self.rooms}",
+            f"Seats:            {self.seats}",
+            f"Students:         {self.students} ({self.seated} seated)",
+            f"Cells:            {self.cells}",
+            f"Workbook size:    ~{format_size(self.sheet_bytes)}",
+            f"Memory limit:     {limit}",
+        ]
+        for engine in ENGINES:
+            lines.append(f"Peak ({engine}):{' ' * (10 - len(engine))}~{format_size(self.peak_bytes[engine])}")
+        engine = self.engine if self.engine != "sharded" else f"sharded ({len(self.shards)} workbooks)"
+        lines.append(f"Engine:           {engine}")
+        return "\n".join(lines)
+
+
+def seated_per_room(rooms, rosters, pattern="positions"):
+    """Students each room will seat, following allocate()'s room-by-room fill."""
+    takes, _ = room_takes(rooms, rosters, pattern=pattern)
+    return takes.sum(axis=1)
+
+
+def estimate(rooms, rosters, memory_limit=None, max_file_bytes=DEFAULT_MAX_FILE_BYTES, pattern="positions",
+             index=False):
+    """Size a run and pick the rendering engine, without allocating or rendering."""
+    benches = np.array([room.benches for room in rooms], dtype=np.int64)
+    rows = np.array([room.rows for room in rooms], dtype=np.int64)
+    width = np.array([room.seats_per_bench for room in rooms], dtype=np.int64)
+    seated = seated_per_room(rooms, rosters, pattern)
+
+    # Seating sheet: title, names row, row headers, seat labels, then the grid;
+    # attendance sheet: title, header and four columns per seated student.
+    room_cells = 1 + benches * width * (rows + 2) + benches + 4 * (seated + 1) + 1
+    cells = int(room_cells.sum())
+    if index:
+        # Master index: title, then per block a heading, a header and five cells per student
+        total = int(seated.sum())
+        cells += 1 + 6 * -(-total // INDEX_BLOCK_ROWS) + 5 * total
+    largest_room = int(room_cells.max()) if len(rooms) else 0
+    students = sum(len(r) for r in rosters)
+
+    peak = {
+        "memory": BASE_BYTES + cells * MEMORY_BYTES_PER_CELL,
+        "streaming": BASE_BYTES + int(seated.sum()) * STRING_BYTES + largest_room * MEMORY_BYTES_PER_CELL,
+    }
+
+    # Shards are cut so each workbook stays under max_file_bytes and its
+    # shared-strings table under half the memory limit.
+    weight = room_cells * FILE_BYTES_PER_CELL / max_file_bytes
+    if memory_limit:
+        weight = np.maximum(weight, seated * STRING_BYTES / (memory_limit / 2))
+    shard_of = np.floor(np.cumsum(weight) - weight / 2).astype(np.int64) if len(rooms) else weight
+    shards = [np.flatnonzero(shard_of == s).tolist() for s in np.unique(shard_of)]
+    shard_seated = max((int(seated[s].sum()) for s in shards), default=0)
+    peak["sharded"] = BASE_BYTES + shard_seated * STRING_BYTES + largest_room * MEMORY_BYTES_PER_CELL
+
+    sheet_bytes = cells * FILE_BYTES_PER_CELL
+    if sheet_bytes > max_file_bytes:
+        engine = "sharded"
+    elif memory_limit is None or peak["memory"] <= memory_limit:
+        engine = "memory"
+    elif peak["streaming"] <= memory_limit:
+        engine = "streaming"
+    else:
+        engine = "sharded"
+
+    return SizeEstimate(rooms=len(rooms), seats=int((benches * rows * width).sum()), students=students,
+                        seated=int(seated.sum()), cells=cells, sheet_bytes=sheet_bytes, peak_bytes=peak,
+                        memory_limit=memory_limit, engine=engine, shards=shards)
+
+
+class MemoryLimitExceeded(MemoryError):
+    pass
+
+
+class MemoryGuard:
+    """Trace Python allocations and raise once they pass headroom x limit.
+
+    check() is cheap enough to call after every room; a guard without a limit
+    never trips and does not start tracemalloc.
+    """
+
+    def __init__(self, limit_bytes, headroom=0.9):
+        self.limit_bytes = limit_bytes
+        self.headroom = headroom
+        self._started = False
+
+    def __enter__(self):
+        if self.limit_bytes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def __exit__(self, *exc):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+        return False
+
+    def check(self):
+        if not self.limit_bytes or not tracemalloc.is_tracing():
+            return
+        current, _ = tracemalloc.get_traced_memory()
+        if current > self.limit_bytes * self.headroom:
+            raise MemoryLimitExceeded(
+                f"Rendering reached {format_size(current)} of the {format_size(self.limit_bytes)} limit")
+
+
+def render(plan, output_path, engine="auto", memory_limit=None,
+           max_file_bytes=DEFAULT_MAX_FILE_BYTES, on_room=None, index=False, guard=False):
+    """Write the plan to output_path with the chosen (or estimated) engine.
+
+    Returns (paths, engine): sharded runs write output_path's _partNN siblings.
+    memory_limit picks the engine; with guard=True allocations are also traced
+    against it, and if the guard trips the run is retried with the next,
+    leaner engine; when sharding trips too, MemoryLimitExceeded is raised.
+    index adds the master roll number index sheet (chart_render.INDEX_SHEET).
+    """
+    estimated = estimate(plan.rooms, plan.rosters, memory_limit, max_file_bytes, plan.pattern, index)
+    if engine == "auto":
+        engine = estimated.engine
+    guard = MemoryGuard(memory_limit if guard else None)
+
+    def progress(done, total):
+        guard.check()
+        if on_room:
+            on_room(done, total)
+
+    while True:
+        try:
+            with guard:
+                if engine == "memory":
+                    wb = build_workbook(plan, on_room=progress, index=index)
+                    guard.check()
+                    wb.save(output_path)
+                    return [output_path], engine
+                if engine == "streaming":
+                    return [stream_workbook(plan, output_path, on_room=progress, index=index)], engine
+                return save_sharded(plan, output_path, estimated.shards, on_room=progress, index=index), engine
+        except MemoryLimitExceeded:
+            if engine == ENGINES[-1]:
+                raise
+            engine = ENGINES[ENGINES.index(engine) + 1]
+            wb = None
+            gc.collect()
@@ -0,0 +1,81 @@
+import os
+import re
+import tempfile
+import unittest
+import zlib
+
+from chart_pdf import render_pdf
+from chart_render import build_workbook
+from seat_plan import Room, allocate
+
+
+def xref_offsets(data):
+    """Object number -> byte offset, from the file's one xref table."""
+    start = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    lines = data[start:].split(b"\n")
+    assert lines[0] == b"xref", lines[0]
+    first, count = map(int, lines[1].split())
+    return {first + k: int(line[:10]) for k, line in enumerate(lines[2:2 + count]) if line.endswith(b" n ")}
+
+
+def page_titles(data):
+    """The first string drawn on each page, in page order."""
+    kids = re.search(rb"/Type /Pages /Kids \[([^\]]*)\]", data).group(1)
+    offsets = xref_offsets(data)
+    titles = []
+    for page_id in map(int, re.findall(rb"(\d+) 0 R", kids)):
+        page = data[offsets[page_id]:data.index(b"endobj", offsets[page_id])]
+        content_id = int(re.search(rb"/Contents (\d+) 0 R", page).group(1))
+        stream = data[data.index(b"stream\n", offsets[content_id]) + 7:]
+        ops = zlib.decompressobj().decompress(stream).decode("latin-1")
+        title = re.search(r"\(((?:\\.|[^\\)])*)\) Tj", ops).group(1)
+        titles.append(re.sub(r"\\(.)", r"\1", title))
+    return titles
+
+
+class PdfTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "chart.pdf")
+        rooms = [Room(number=101 + i, benches=3, rows=4, seats_per_bench=2, names=("A", "B")) for i in range(3)]
+        self.plan = allocate(rooms, [[f"L{k:03d}" for k in range(30)], [f"R{k:03d}" for k in range(30)]])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_one_page_per_sheet(self):
+        for workers in (1, 2):
+            render_pdf(self.plan, self.path, workers=workers)
+            with open(self.path, "rb") as f:
+                data = f.read()
+            self.assertTrue(data.startswith(b"%PDF-"))
+            self.assertEqual(page_titles(data), ["ROOM 101", "Attendance Sheet - Room 101", "ROOM 102",
+                                                 "Attendance Sheet - Room 102", "ROOM 103",
+                                                 "Attendance Sheet - Room 103"])
+            self.assertEqual(len(page_titles(data)), len(build_workbook(self.plan).sheetnames))
+            self.assertEqual(os.listdir(self.tmp.name), ["chart.pdf"])
+
+    def test_xref_offsets_point_at_their_objects(self):
+        render_pdf(self.plan, self.path, workers=1)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        offsets = xref_offsets(data)
+        self.assertEqual(sorted(offsets), list(range(1, 5 + 2 * 6)))
+        for obj_id, offset in offsets.items():
+            self.assertTrue(data.startswith(f"{obj_id} 0 obj\n".encode(), offset), obj_id)
+        self.assertIn(f"/Size {5 + 2 * 6} ".encode(), data)
+
+    def test_long_attendance_runs_over_pages(self):
+        room = Room(number=201, benches=10, rows=5, seats_per_bench=2, names=("A", "B"))
+        plan = allocate([room], [[f"L{k:03d}" for k in range(50)], [f"R{k:03d}" for k in range(50)]])
+        render_pdf(plan, self.path, workers=1)
+        with open(self.path, "rb") as f:
+            titles = page_titles(f.read())
+        self.assertEqual(titles[0], "ROOM 201")
+        self.assertEqual(titles[1:], ["Attendance Sheet - Room 201  (page 1 of 3)",
+                                      "Attendance Sheet - Room 201  (page 2 of 3)",
+                                      "Attendance Sheet - Room 201  (page 3 of 3)"])
+
+
+if __name__ == "__main__":
+    unittest.main()
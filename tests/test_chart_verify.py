@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import openpyxl
+
+from chart_render import build_workbook, stream_workbook
+from chart_verify import verify
+from seat_plan import Room, allocate
+
+
+def replace_cell(path, title, old, new):
+    wb = openpyxl.load_workbook(path)
+    for row in wb[title].iter_rows():
+        for cell in row:
+            if cell.value == old:
+                cell.value = new
+                wb.save(path)
+                return
+    raise AssertionError(f"{old!r} not on {title}")
+
+
+class VerifyTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "chart.xlsx")
+        rooms = [Room(number=101 + i, benches=3, rows=4, seats_per_bench=2, names=("A", "B")) for i in range(3)]
+        self.rosters = [[f"L{k:03d}" for k in range(30)], [f"R{k:03d}" for k in range(30)]]
+        self.plan = allocate(rooms, self.rosters)
+        build_workbook(self.plan).save(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fresh_workbooks_are_clean(self):
+        report = verify(self.path, self.rosters)
+        self.assertTrue(report.ok, report.summary())
+        self.assertEqual((report.rooms, report.seated), (3, 60))
+        stream_workbook(self.plan, self.path)
+        self.assertTrue(verify(self.path, self.rosters).ok)
+
+    def test_edited_seat_is_reported(self):
+        replace_cell(self.path, "Room 101", "L005", "L006")
+        report = verify(self.path, self.rosters)
+        self.assertEqual(report.missing, ["L005"])
+        self.assertEqual(list(report.duplicated), ["L006"])
+        self.assertEqual(report.unknown, [])
+
+    def test_edited_attendance_is_reported(self):
+        replace_cell(self.path, "Attendance - Room 102", "R012", "R999")
+        report = verify(self.path, self.rosters)
+        self.assertEqual((report.missing, report.unknown, report.duplicated), ([], [], {}))
+        self.assertEqual(report.mismatched, ["R012: seated Room 102 S-1, attendance nowhere",
+                                             "R999: seated nowhere, attendance Room 102 S-1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+import openpyxl
+
+from chart_render import build_workbook
+from checkpoint import CheckpointedRun, fingerprint
+from seat_plan import Room
+
+
+def sheet_values(wb):
+    """Cell values by sheet; empty strings count as blank, as they do in Excel."""
+    return {ws.title: [[None if value == "" else value for value in row] for row in ws.iter_rows(values_only=True)]
+            for ws in wb.worksheets}
+
+
+class Interrupted(Exception):
+    pass
+
+
+class CheckpointTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rooms = [Room(number=101 + i, benches=3, rows=4, seats_per_bench=2, names=("A", "B")) for i in range(4)]
+        self.rosters = [[f"L{k:03d}" for k in range(40)], [f"R{k:03d}" for k in range(40)]]
+        self.output = os.path.join(self.tmp.name, "out.xlsx")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def checkpointed(self, **kwargs):
+        return CheckpointedRun(os.path.join(self.tmp.name, "runs"), self.rooms, self.rosters, **kwargs)
+
+    def test_interrupted_run_resumes(self):
+        def stop_after_two(done, total):
+            if done == 2:
+                raise Interrupted
+
+        with self.assertRaises(Interrupted):
+            self.checkpointed().run(self.output, on_room=stop_after_two)
+        run = self.checkpointed()
+        self.assertEqual(run.completed(), [0, 1])
+        self.assertFalse(os.path.exists(self.output))
+        first_part = os.stat(run.part_path(0)).st_mtime_ns
+
+        run.run(self.output)
+        self.assertEqual(run.completed(), [0, 1, 2, 3])
+        self.assertEqual(os.stat(run.part_path(0)).st_mtime_ns, first_part)
+        self.assertEqual(sorted(os.listdir(run.parts_dir)), [f"{i:05d}.xlsx" for i in range(4)])
+        self.assertTrue(openpyxl.load_workbook(self.output).sheetnames)
+
+    def test_changed_inputs_change_the_run_directory(self):
+        base = fingerprint(self.rooms, self.rosters)
+        self.assertEqual(fingerprint(self.rooms, [list(r) for r in self.rosters]), base)
+        self.assertNotEqual(fingerprint(self.rooms, [self.rosters[0][1:], self.rosters[1]]), base)
+        self.assertNotEqual(fingerprint(self.rooms, self.rosters, seed=1), base)
+        self.assertNotEqual(fingerprint(self.rooms, self.rosters, pattern="cycle"), base)
+        self.assertNotEqual(self.checkpointed().run_dir, self.checkpointed(strategy="row-major").run_dir)
+
+    def test_assembled_workbook_matches_a_single_pass_render(self):
+        plan = self.checkpointed().run(self.output, index=True)
+        assembled = openpyxl.load_workbook(self.output)
+        expected = build_workbook(plan, index=True)
+        self.assertEqual(assembled.sheetnames, expected.sheetnames)
+        self.assertEqual(sheet_values(assembled), sheet_values(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from exam_scheduler import Session, pick_rooms, schedule
+from seat_plan import Room
+
+
+def room(number, benches):
+    return Room(number=number, benches=benches, rows=2, seats_per_bench=2, names=("A", "B"))
+
+
+def session(name, start, end, size):
+    return Session(name=name, start=pd.Timestamp(f"2026-01-05 {start}"), end=pd.Timestamp(f"2026-01-05 {end}"),
+                   rosters=[[f"{name}L{k}" for k in range(size)], [f"{name}R{k}" for k in range(size)]])
+
+
+class ScheduleTests(unittest.TestCase):
+    def setUp(self):
+        self.rooms = [room(101, 2), room(102, 5), room(103, 10)]  # 4, 10 and 20 seats per position
+
+    def test_smallest_room_that_closes_the_gap(self):
+        seats = np.array([[4, 4], [10, 10], [20, 20]])
+        self.assertEqual(pick_rooms({0, 1, 2}, seats, [8, 8]), ([1], 0))
+        self.assertEqual(pick_rooms({0, 1, 2}, seats, [23, 23]), ([2, 0], 0))
+
+    def test_overlapping_sessions_never_share_a_room(self):
+        sessions = [session("A", "09:00", "12:00", 8), session("B", "11:00", "13:00", 8),
+                    session("C", "12:00", "15:00", 8)]
+        a, b, c = schedule(sessions, self.rooms)
+        self.assertFalse(set(a.room_indices) & set(b.room_indices))
+        self.assertFalse(set(b.room_indices) & set(c.room_indices))
+        self.assertEqual(c.room_indices, a.room_indices)  # A has ended when C starts
+        for result in (a, b, c):
+            self.assertEqual((result.shortfall, result.plan.seated_count), (0, 16))
+
+    def test_overflow_is_reported_as_a_shortfall(self):
+        (result,) = schedule([session("A", "09:00", "12:00", 40)], self.rooms)
+        self.assertEqual(result.room_indices, [0, 1, 2])
+        self.assertEqual(result.shortfall, 6)
+        self.assertEqual(result.plan.seated_count, 2 * 34)
+
+    def test_session_with_every_room_taken_gets_none(self):
+        sessions = [session("A", "09:00", "12:00", 34), session("B", "10:00", "11:00", 3)]
+        a, b = schedule(sessions, self.rooms)
+        self.assertEqual(a.shortfall, 0)
+        self.assertEqual(b.room_indices, [])
+        self.assertEqual(b.shortfall, 3)
+        self.assertEqual(b.plan.seated_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
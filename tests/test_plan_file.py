@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from plan_file import PREAMBLE, PlanFileError, load_plan, read_header, save_plan
+from seat_plan import Room, allocate, apply_masks
+
+
+class PlanFileTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "out.seatplan")
+        rooms = apply_masks([Room(number=101 + i, benches=3, rows=4, seats_per_bench=2, names=("A", "B"))
+                             for i in range(3)],
+                            pd.DataFrame({'Room Number': [101, 102], 'Bench': [1, 2], 'Row': [1, None],
+                                          'Seat Position': ["F-1", "S-1"], 'Reason': ["broken", "reserved"]}))
+        self.plan = allocate(rooms, [[1000 + k for k in range(30)], [f"R{k:03d}" for k in range(30)]],
+                             strategy="row-major", seed=7, pattern="cycle")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        save_plan(self.plan, self.path)
+        loaded = load_plan(self.path)
+        self.assertEqual((loaded.strategy, loaded.seed, loaded.pattern), ("row-major", 7, "cycle"))
+        self.assertEqual([(r.number, r.benches, r.rows, r.names, r.mask, r.reserved) for r in loaded.rooms],
+                         [(str(r.number), r.benches, r.rows, r.names, r.mask, r.reserved) for r in self.plan.rooms])
+        for saved, read in zip(self.plan.seats, loaded.seats):
+            np.testing.assert_array_equal(read, saved)
+        np.testing.assert_array_equal(loaded.offsets, self.plan.offsets)
+        self.assertEqual([list(r) for r in loaded.rosters], [list(r) for r in self.plan.rosters])
+        self.assertEqual(loaded.rosters[0].dtype.kind, "i")
+        self.assertEqual(loaded.seated_count, self.plan.seated_count)
+        self.assertEqual(os.listdir(self.tmp.name), ["out.seatplan"])
+
+    def test_other_files_are_rejected(self):
+        for content in (b"", b"PK\x03\x04" + bytes(40)):
+            with open(self.path, "wb") as f:
+                f.write(content)
+            with self.assertRaisesRegex(PlanFileError, "not a seat plan file"):
+                load_plan(self.path)
+        with open(self.path, "wb") as f:
+            f.write(PREAMBLE.pack(b"SEATPLAN", 99, 0))
+        with self.assertRaisesRegex(PlanFileError, "seat plan format 99"):
+            load_plan(self.path)
+
+    def test_truncated_files_are_rejected(self):
+        save_plan(self.plan, self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        seats = read_header(self.path)["arrays"]["seats"]["offset"]
+        for size in (PREAMBLE.size + 10, seats + 4, len(data) - 1):
+            with open(self.path, "wb") as f:
+                f.write(data[:size])
+            with self.assertRaisesRegex(PlanFileError, "truncated seat plan file"):
+                load_plan(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
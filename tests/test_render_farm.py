@@ -0,0 +1,75 @@
+import os
+import re
+import socket
+import tempfile
+import threading
+import unittest
+
+import openpyxl
+
+from chart_render import build_workbook
+from checkpoint import CheckpointedRun
+from render_farm import Farm, FarmError, recv_message, send_message, work
+from seat_plan import Room
+
+
+def sheet_values(wb):
+    """Cell values by sheet; empty strings count as blank, as they do in Excel."""
+    return {ws.title: [[None if value == "" else value for value in row] for row in ws.iter_rows(values_only=True)]
+            for ws in wb.worksheets}
+
+
+class FarmTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rooms = [Room(number=101 + i, benches=3, rows=4, seats_per_bench=2, names=("A", "B")) for i in range(5)]
+        rosters = [[f"L{k:03d}" for k in range(50)], [f"R{k:03d}" for k in range(50)]]
+        self.run = CheckpointedRun(self.tmp.name, rooms, rosters)
+        self.errors = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def drop_mid_lease(self, address, token):
+        """Take a batch like a worker, then disconnect without returning any room."""
+        with socket.create_connection(address) as sock:
+            send_message(sock, {"type": "hello", "token": token})
+            recv_message(sock)
+            message, _ = recv_message(sock)
+        return message["rooms"]
+
+    def start_workers(self, farm, port):
+        address = ("127.0.0.1", port)
+        with self.assertRaisesRegex(FarmError, "refused"):
+            work(address, "wrong token")
+        self.dropped = self.drop_mid_lease(address, farm.token)
+
+        def worker():
+            try:
+                self.rendered = work(address, farm.token)
+            except Exception as e:
+                self.errors.append(e)
+
+        self.worker = threading.Thread(target=worker)
+        self.worker.start()
+
+    def test_rooms_of_a_dropped_worker_are_requeued(self):
+        farm = None
+
+        def log(message):
+            if message.startswith("Coordinating"):
+                self.start_workers(farm, int(re.search(r":(\d+);", message).group(1)))
+
+        farm = Farm(self.run, ("127.0.0.1", 0), batch_size=2, log=log)
+        output = os.path.join(self.tmp.name, "farm.xlsx")
+        plan = farm.serve(output, idle_timeout=30)
+        self.worker.join(30)
+
+        self.assertEqual(self.errors, [])
+        self.assertEqual(self.dropped, [0, 1])
+        self.assertEqual(self.rendered, 5)  # the two dropped rooms came back to the queue
+        self.assertEqual(sheet_values(openpyxl.load_workbook(output)), sheet_values(build_workbook(plan)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from plan_file import load_plan, save_plan
+from replan import replan
+from seat_plan import Room, allocate
+
+
+def seat_of(plan):
+    """Roll number -> (room, position, slot) for every seated student."""
+    seats = {}
+    for i, room_seats in enumerate(plan.seats):
+        for p, slot in zip(*np.nonzero(room_seats >= 0)):
+            seats[str(plan.roll_numbers[room_seats[p, slot]])] = (i, int(p), int(slot))
+    return seats
+
+
+class ReplanTests(unittest.TestCase):
+    def setUp(self):
+        self.rooms = [Room(number=101 + i, benches=3, rows=4, seats_per_bench=2, names=("A", "B")) for i in range(2)]
+        self.left = [f"L{k:03d}" for k in range(20)]
+        self.right = [f"R{k:03d}" for k in range(20)]
+        self.previous = allocate(self.rooms, [self.left, self.right])
+
+    def test_withdrawal_moves_nobody_else(self):
+        left = self.left[:3] + self.left[4:] + ["L900"]
+        plan, changes = replan(self.previous, [left, self.right])
+        before, after = seat_of(self.previous), seat_of(plan)
+        for roll in left[:-1] + self.right:
+            self.assertEqual(before[roll], after[roll])
+        self.assertNotIn("L003", after)
+        self.assertEqual(after["L900"], before["L003"])
+        self.assertEqual(sorted((c.roll, c.change) for c in changes), [("L003", "withdrawn"), ("L900", "added")])
+
+    def test_unchanged_rosters_change_nothing(self):
+        plan, changes = replan(self.previous, [self.left, self.right])
+        self.assertEqual(changes, [])
+        self.assertEqual(seat_of(plan), seat_of(self.previous))
+
+    def test_second_replan_starts_from_the_saved_plan(self):
+        left = self.left[1:]
+        first, _ = replan(self.previous, [left, self.right])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "SeatingChart_Output.seatplan")
+            save_plan(first, path)
+            second, changes = replan(load_plan(path), [left, self.right])
+        self.assertEqual(changes, [])
+        self.assertEqual(seat_of(second), seat_of(first))
+
+    def test_nobody_is_seated_twice(self):
+        plan, _ = replan(self.previous, [self.left + ["L500", "L501"], ["R999"] + self.right])
+        seated = np.concatenate([s[s >= 0] for s in plan.seats])
+        self.assertEqual(len(seated), len(np.unique(seated)))
+
+
+if __name__ == "__main__":
+    unittest.main()
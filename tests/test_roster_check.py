@@ -0,0 +1,50 @@
+import unittest
+
+import pandas as pd
+
+from roster_check import check_rosters
+
+
+def column(values):
+    return pd.Series(values, dtype=object)
+
+
+class RosterCheckTests(unittest.TestCase):
+    def test_lateral_entries_pass_in_a_large_roster(self):
+        regular = [f"0808CS21{k:04d}" for k in range(200000)]
+        lateral = [f"0808CS223D{k:04d}" for k in range(1334)]
+        report = check_rosters({"Left": column(regular + lateral)})
+        self.assertEqual(report.malformed, [])
+
+    def test_lone_typo_is_malformed(self):
+        rolls = [f"0808CS21{k:04d}" for k in range(50)] + ["0808CS21O01"]
+        report = check_rosters({"Left": column(rolls)})
+        self.assertEqual(report.malformed, ["Left row 52: '0808CS21O01'"])
+
+    def test_a_few_lateral_entries_pass_in_a_small_roster(self):
+        rolls = [f"0808CS21{k:04d}" for k in range(40)] + ["0808CS223D01", "0808CS223D02"]
+        self.assertEqual(check_rosters({"Left": column(rolls)}).malformed, [])
+
+    def test_tiny_rosters_skip_the_shape_check(self):
+        report = check_rosters({"Left": column(["0808CS211001"]), "Right": column(["0808EC223D01"])})
+        self.assertEqual(report.malformed, [])
+        self.assertEqual(check_rosters({"Left": column(["0808CS21 1001"])}).malformed, ["Left row 2: '0808CS21 1001'"])
+
+    def test_float_roll_numbers_compare_as_integers(self):
+        left = column([float(1001 + k) for k in range(30)])
+        report = check_rosters({"Left": left, "Right": column([1005, "1031"])})
+        self.assertEqual(report.malformed, [])
+        self.assertEqual(report.overlaps, ["1005: Left row 6; Right row 2"])
+
+    def test_duplicates_overlaps_and_blanks(self):
+        left = column(["0808CS211001", "0808cs211001 ", None, "0808CS211002"])
+        right = column(["0808CS211002", "0808CS211003", "0808CS211004"])
+        report = check_rosters({"Left": left, "Right": right})
+        self.assertEqual(report.duplicates, ["0808CS211001: Left rows 2, 3"])
+        self.assertEqual(report.overlaps, ["0808CS211002: Left row 5; Right row 2"])
+        self.assertEqual(report.blanks, ["Left row 4"])
+        self.assertFalse(report.ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
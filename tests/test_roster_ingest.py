@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import openpyxl
+import pandas as pd
+
+from roster_ingest import RosterFormatError, chunked, read_roster, roll_cells
+
+
+class RosterIngestTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def workbook(self, sheets):
+        """Write {title: rows} to an .xlsx and return its path."""
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        for title, rows in sheets.items():
+            ws = wb.create_sheet(title)
+            for row in rows:
+                ws.append(row)
+        path = os.path.join(self.tmp.name, "roster.xlsx")
+        wb.save(path)
+        return path
+
+    def test_xlsx_reads_only_the_roll_column(self):
+        path = self.workbook({"Notes": [["Term"], ["Spring"]],
+                              "Students": [["Name", " Roll Number "], ["Ann", 1001], ["Bo", None], ["Cy", 1003.0],
+                                           ["Di", "A-17"], ["Ed", None]]})
+        self.assertEqual(list(roll_cells(path)), [(2, 1001), (3, None), (4, 1003), (5, "A-17")])
+        roster = read_roster(path)
+        self.assertEqual(roster.rolls(), [1001, 1003, "A-17"])
+        self.assertEqual(roster.column().tolist(), [1001, None, 1003, "A-17"])
+
+    def test_chunks_are_reported_as_they_arrive(self):
+        path = self.workbook({"Students": [["Roll Number"]] + [[1000 + k] for k in range(10)]})
+        seen = []
+        roster = read_roster(path, on_chunk=lambda buffer: seen.append(buffer.rows), chunk_rows=4)
+        self.assertEqual(seen, [4, 8, 10])
+        self.assertEqual(roster.rolls(), list(range(1000, 1010)))
+        self.assertEqual([len(chunk) for chunk in chunked(range(9), 4)], [4, 4, 1])
+
+    def test_xls_floats_come_back_as_integers(self):
+        path = os.path.join(self.tmp.name, "roster.xls")
+        column = pd.DataFrame({"Roll Number": [1001.0, float("nan"), 1003.0, 1003.5]})
+        with mock.patch("roster_ingest.pd.read_excel", return_value=column) as read_excel:
+            roster = read_roster(path)
+        read_excel.assert_called_once_with(path, usecols=["Roll Number"])
+        self.assertEqual(roster.rolls(), [1001, 1003, 1003.5])
+        self.assertEqual([type(value) for value in roster.rolls()[:2]], [int, int])
+
+    def test_missing_column_is_reported(self):
+        path = self.workbook({"Students": [["Name", "Roll"], ["Ann", 1001]]})
+        with self.assertRaisesRegex(RosterFormatError, "roster.xlsx: missing 'Roll Number' column"):
+            read_roster(path)
+        xls = os.path.join(self.tmp.name, "roster.xls")
+        with mock.patch("roster_ingest.pd.read_excel", side_effect=ValueError("Usecols do not match columns")):
+            with self.assertRaisesRegex(RosterFormatError, "roster.xls: missing 'Roll Number' column"):
+                read_roster(xls)
+
+
+if __name__ == "__main__":
+    unittest.main()
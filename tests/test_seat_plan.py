@@ -0,0 +1,100 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from seat_plan import (BLOCKED_LABEL, FILL_STRATEGIES, RESERVED_LABEL, Room, allocate, apply_masks, balanced_limits,
+                       rooms_from_layout)
+
+
+def rooms(count=2, benches=3, rows=4, width=2):
+    return [Room(number=101 + i, benches=benches, rows=rows, seats_per_bench=width, names=("A", "B")[:width])
+            for i in range(count)]
+
+
+def rolls(prefix, count):
+    return [f"{prefix}{k:04d}" for k in range(count)]
+
+
+def seated_ids(plan):
+    return np.concatenate([seats[seats >= 0] for seats in plan.seats])
+
+
+class AllocateTests(unittest.TestCase):
+    def mixed_rooms(self):
+        return rooms(2) + [Room(number=201, benches=2, rows=5, seats_per_bench=3, names=("A", "B", "C"))]
+
+    def test_nobody_is_seated_twice(self):
+        rosters = [rolls("L", 30), rolls("M", 5), rolls("R", 30)]
+        for strategy in FILL_STRATEGIES:
+            plan = allocate(self.mixed_rooms(), rosters, strategy=strategy, seed=7)
+            seated = seated_ids(plan)
+            self.assertEqual(len(seated), len(np.unique(seated)))
+            self.assertEqual(len(seated), 30 + 5 + 10)  # only room 201 has a third seat
+
+    def test_each_roster_keeps_its_seat_position(self):
+        plan = allocate(self.mixed_rooms(), [rolls("L", 30), rolls("M", 5), rolls("R", 30)])
+        for seats in plan.seats:
+            for p in range(seats.shape[0]):
+                ids = seats[p][seats[p] >= 0]
+                self.assertTrue(((ids >= plan.offsets[p]) & (ids < plan.offsets[p + 1])).all())
+
+    def test_overflow_stays_unseated_in_roster_order(self):
+        plan = allocate(rooms(), [rolls("L", 30), rolls("R", 30)])
+        self.assertEqual(plan.seated_count, 48)
+        self.assertEqual(sorted(seated_ids(plan)), list(range(24)) + list(range(30, 54)))
+
+    def test_balanced_limits_spread_every_roster(self):
+        rosters = [rolls("L", 10), rolls("R", 7)]
+        limits = balanced_limits(rooms(3), rosters)
+        self.assertEqual(limits.sum(axis=0).tolist(), [10, 7])
+        self.assertLessEqual(np.ptp(limits, axis=0).max(), 1)
+        self.assertEqual(allocate(rooms(3), rosters, limits=limits).seated_count, 17)
+
+
+class MaskTests(unittest.TestCase):
+    def masked_rooms(self):
+        return apply_masks(rooms(), pd.DataFrame({
+            'Room Number': [101, 101, 102],
+            'Bench': [1, 2, None],
+            'Row': [1, 3, 2],
+            'Seat Position': ["F-1", None, "S-1"],
+            'Reason': ["broken", "reserved for scribe", None],
+        }))
+
+    def test_masked_seats_stay_empty(self):
+        masked = self.masked_rooms()
+        for pattern in ("positions", "cycle"):
+            plan = allocate(masked, [rolls("L", 40), rolls("R", 40)], pattern=pattern)
+            for room, seats in zip(masked, plan.seats):
+                self.assertTrue((seats[room.masked()] < 0).all())
+
+    def test_capacity_drops_by_the_masked_seats(self):
+        masked = self.masked_rooms()
+        self.assertEqual([room.usable_seats for room in masked], [24 - 3, 24 - 3])
+        plan = allocate(masked, [rolls("L", 40), rolls("R", 40)])
+        self.assertEqual(plan.seated_count, 42)
+
+    def test_labels_name_the_mask(self):
+        masked = self.masked_rooms()
+        labels = allocate(masked, [rolls("L", 5), rolls("R", 5)]).seat_labels(0)
+        self.assertEqual(labels[0, 0, 0], BLOCKED_LABEL)
+        self.assertEqual(labels[1, 1, 2], RESERVED_LABEL)
+
+    def test_seat_label_beyond_the_bench_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "T-1 is outside 1..2"):
+            apply_masks(rooms(), pd.DataFrame({'Room Number': [101], 'Seat Position': ["T-1"]}))
+
+    def test_float_room_numbers_match_their_masks(self):
+        layout = pd.DataFrame({'Room Number': [101.0, 102.0], 'Number of Bench': [3, 3], 'Number of Rows': [4, 4],
+                               'Number of Student per Bench': [2, 2]})
+        masked = rooms_from_layout(layout, masks=pd.DataFrame({'Room Number': ["102"], 'Bench': [1], 'Row': [1]}))
+        self.assertEqual([room.usable_seats for room in masked], [24, 22])
+
+    def test_unknown_room_is_rejected(self):
+        with self.assertRaises(ValueError):
+            apply_masks(rooms(), pd.DataFrame({'Room Number': [999], 'Bench': [1]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import chart_render
+from chart_verify import verify
+from seat_plan import Room, allocate
+from size_estimator import MemoryLimitExceeded, render
+
+
+class RenderFallbackTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "chart.xlsx")
+        rooms = [Room(number=101 + i, benches=6, rows=8, seats_per_bench=2, names=("A", "B")) for i in range(30)]
+        self.rosters = [[f"L{k:05d}" for k in range(1440)], [f"R{k:05d}" for k in range(1440)]]
+        self.plan = allocate(rooms, self.rosters)
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, memory_limit, **kwargs):
+        """render() from the memory engine with the guard on, recording which engine functions ran."""
+        def spy(name):
+            original = getattr(chart_render, name)
+            return mock.patch(f"size_estimator.{name}",
+                              side_effect=lambda *a, **k: self.calls.append(name) or original(*a, **k))
+
+        with spy("build_workbook"), spy("stream_workbook"), spy("save_sharded"):
+            return render(self.plan, self.output, engine="memory", memory_limit=memory_limit, guard=True, **kwargs)
+
+    def test_small_budget_falls_back_engine_by_engine(self):
+        # Both whole-workbook engines trace several MiB over 30 rooms; one room per shard stays far below 2 MiB.
+        paths, engine = self.render(2 * 2 ** 20, max_file_bytes=1)
+        self.assertEqual(self.calls, ["build_workbook", "stream_workbook", "save_sharded"])
+        self.assertEqual((engine, len(paths)), ("sharded", 30))
+        self.assertTrue(verify(self.output, self.rosters).ok)
+
+    def test_tiny_budget_fails_after_every_engine(self):
+        with self.assertRaises(MemoryLimitExceeded):
+            self.render(1)
+        self.assertEqual(self.calls, ["build_workbook", "stream_workbook", "save_sharded"])
+
+    def test_without_the_guard_the_budget_only_picks_the_engine(self):
+        self.assertEqual(render(self.plan, self.output, engine="memory", memory_limit=1)[1], "memory")
+
+
+if __name__ == "__main__":
+    unittest.main()
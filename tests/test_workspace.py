@@ -0,0 +1,76 @@
+import os
+import tempfile
+import time
+import unittest
+
+from workspace import STALE_STAGING_SECONDS, cleanup, copy_out, publishing, runs, save_published
+
+
+def write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+class WorkspaceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_run(self, size, age_days=0):
+        with publishing(self.root) as workspace:
+            write(workspace.path("SeatingChart_Output.xlsx"), size)
+        stamp = time.time() - age_days * 86400
+        os.utime(workspace.directory, (stamp, stamp))
+        return workspace.name
+
+    def test_run_appears_only_once_published(self):
+        with publishing(self.root) as workspace:
+            write(workspace.path("a.xlsx"), 10)
+            self.assertEqual(runs(self.root), [])
+        self.assertEqual([name for name, _, _ in runs(self.root)], [workspace.name])
+        self.assertTrue(os.path.exists(workspace.path("a.xlsx")))
+
+    def test_failed_run_leaves_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with publishing(self.root) as workspace:
+                write(workspace.path("a.xlsx"), 10)
+                raise RuntimeError("render failed")
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_save_published(self):
+        path = save_published(lambda p: write(p, 5), "out.xlsx", self.root)
+        self.assertEqual(os.path.getsize(path), 5)
+        self.assertEqual(os.path.dirname(os.path.dirname(path)), self.root)
+
+    def test_old_runs_expire_but_the_newest_stays(self):
+        old = self.make_run(10, age_days=40)
+        recent = self.make_run(10, age_days=1)
+        self.assertEqual(cleanup(self.root, keep_days=30, keep_bytes=None), [old])
+        self.assertEqual(cleanup(self.root, keep_days=0, keep_bytes=None), [])
+        self.assertEqual([name for name, _, _ in runs(self.root)], [recent])
+
+    def test_oldest_runs_go_first_past_the_size_limit(self):
+        names = [self.make_run(100, age_days=3 - k) for k in range(3)]
+        self.assertEqual(cleanup(self.root, keep_days=None, keep_bytes=150), names[:2])
+
+    def test_stale_staging_is_removed(self):
+        with publishing(self.root) as workspace:
+            stamp = time.time() - STALE_STAGING_SECONDS - 60
+            os.utime(workspace.staging_dir, (stamp, stamp))
+            self.assertEqual(cleanup(self.root), ["." + workspace.name])
+            os.mkdir(workspace.staging_dir)
+
+    def test_copy_out(self):
+        src, dst = os.path.join(self.root, "src"), os.path.join(self.root, "dst")
+        write(src, 1000)
+        copy_out(src, dst)
+        with open(src, "rb") as a, open(dst, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertEqual(sorted(os.listdir(self.root)), ["dst", "src"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+"""One output directory per run, published atomically, with old runs cleaned up.
+
+Runs used to write SeatingChart_Output.xlsx into the working directory, so
+two runs at once (operators, or the web app's workers) overwrote each
+other. A Workspace is a fresh directory under the output root:
+
+    outputs/
+        .Seating_20250515_122119_4f2a9c/   while the run is writing
+        Seating_20250515_122119_4f2a9c/    once published
+            SeatingChart_Output.xlsx
+            SeatingChart_Output.seatplan
+
+Outputs are written into the hidden staging directory and published with
+one rename of the directory, so a published run is always complete. The
+root defaults to ./outputs and can be moved with SEATING_OUTPUT_ROOT.
+
+    with publishing() as workspace:          # discarded if the block raises
+        wb.save(workspace.path("SeatingChart_Output.xlsx"))
+
+save_published() does the same for a single file and then applies the
+retention policy.
+
+cleanup() applies the retention policy: published runs older than
+SEATING_KEEP_DAYS (30) go first, then the oldest runs until the root holds
+at most SEATING_KEEP_BYTES (2G); the newest run is always kept. copy_out()
+copies a published file elsewhere with shutil.copyfile, which uses the
+kernel's zero-copy path (sendfile, fcopyfile or CopyFile), through a temp
+file and a rename.
+
+    python workspace.py --list
+    python workspace.py --cleanup --keep-days 7
+"""
+
+import argparse
+import os
+import secrets
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+from size_estimator import parse_size
+
+DEFAULT_ROOT = os.environ.get("SEATING_OUTPUT_ROOT", os.path.join(os.getcwd(), "outputs"))
+DEFAULT_KEEP_DAYS = float(os.environ.get("SEATING_KEEP_DAYS", 30))
+DEFAULT_KEEP_BYTES = parse_size(os.environ.get("SEATING_KEEP_BYTES", "2G"))
+PREFIX = "Seating_"
+STAGING = "."
+# Staging directories this old belong to runs that crashed
+STALE_STAGING_SECONDS = 24 * 3600
+
+
+def _size(path):
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+@dataclass
+class Workspace:
+    root: str
+    name: str
+    published: bool = False
+
+    @classmethod
+    def create(cls, root=None):
+        root = root or DEFAULT_ROOT
+        os.makedirs(root, exist_ok=True)
+        while True:
+            name = f"{PREFIX}{datetime.now():%Y%m%d_%H%M%S}_{secrets.token_hex(3)}"
+            try:
+                os.mkdir(os.path.join(root, STAGING + name))
+                return cls(root=root, name=name)
+            except FileExistsError:
+                continue
+
+    @property
+    def staging_dir(self):
+        return os.path.join(self.root, STAGING + self.name)
+
+    @property
+    def directory(self):
+        """Where the run's files are: the staging directory until publish(), then the run directory."""
+        return os.path.join(self.root, self.name) if self.published else self.staging_dir
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def publish(self):
+        """Make the run visible under its final name; returns the run directory."""
+        if not self.published:
+            os.replace(self.staging_dir, os.path.join(self.root, self.name))
+            self.published = True
+        return self.directory
+
+    def published_path(self, staged_path):
+        """Where a file written under the staging directory is once published."""
+        return os.path.join(self.root, self.name, os.path.relpath(staged_path, self.staging_dir))
+
+    def discard(self):
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+@contextmanager
+def publishing(root=None):
+    """A new Workspace, published when the block completes and discarded if it raises."""
+    workspace = Workspace.create(root)
+    try:
+        yield workspace
+        workspace.publish()
+    except BaseException:
+        workspace.discard()
+        raise
+
+
+def save_published(save, filename, root=None):
+    """save(path) one file into a new run, publish it and clean up old runs; returns the published path."""
+    with publishing(root) as workspace:
+        save(workspace.path(filename))
+    cleanup(root)
+    return workspace.path(filename)
+
+
+def copy_out(src, dst):
+    """Copy src to dst without reading it into memory; dst appears only once complete."""
+    tmp_path = f"{dst}.{secrets.token_hex(3)}.tmp"
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return dst
+
+
+def runs(root=None):
+    """(name, mtime, bytes) of every published run under root, oldest first."""
+    root = root or DEFAULT_ROOT
+    if not os.path.isdir(root):
+        return []
+    found = []
+    for entry in os.scandir(root):
+        if entry.is_dir() and entry.name.startswith(PREFIX):
+            found.append((entry.name, entry.stat().st_mtime, _size(entry.path)))
+    return sorted(found, key=lambda run: run[1])
+
+
+def cleanup(root=None, keep_days=None, keep_bytes=None, now=None):
+    """Remove runs past the retention policy and stale staging directories; returns the names removed."""
+    root = root or DEFAULT_ROOT
+    keep_days = DEFAULT_KEEP_DAYS if keep_days is None else keep_days
+    keep_bytes = DEFAULT_KEEP_BYTES if keep_bytes is None else keep_bytes
+    now = time.time() if now is None else now
+    removed = []
+    if not os.path.isdir(root):
+        return removed
+
+    for entry in os.scandir(root):
+        if (entry.is_dir() and entry.name.startswith(STAGING + PREFIX)
+                and now - entry.stat().st_mtime > STALE_STAGING_SECONDS):
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed.append(entry.name)
+
+    published = runs(root)
+    newest = published[-1:] if published else []
+    candidates = published[:-1]
+    kept = []
+    for name, mtime, size in candidates:
+        if keep_days is not None and now - mtime > keep_days * 86400:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            removed.append(name)
+        else:
+            kept.append((name, mtime, size))
+    total = sum(size for _, _, size in kept + newest)
+    for name, _, size in kept:
+        if keep_bytes is None or total <= keep_bytes:
+            break
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        removed.append(name)
+        total -= size
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List or clean up per-run output directories")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="output root; defaults to $SEATING_OUTPUT_ROOT or ./outputs")
+    parser.add_argument("--list", action="store_true", help="list the published runs")
+    parser.add_argument("--cleanup", action="store_true", help="apply the retention policy now")
+    parser.add_argument("--keep-days", type=float, default=DEFAULT_KEEP_DAYS)
+    parser.add_argument("--keep-size", type=parse_size, default=DEFAULT_KEEP_BYTES, help="e.g. 500M")
+    args = parser.parse_args(argv)
+    if args.cleanup:
+        for name in cleanup(args.root, args.keep_days, args.keep_size):
+            print(f"Removed {name}")
+    if args.list or not args.cleanup:
+        for name, mtime, size in runs(args.root):
+            print(f"{name}  {datetime.fromtimestamp(mtime):%Y-%m-%d %H:%M}  {size / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())